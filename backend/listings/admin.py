@@ -1,7 +1,8 @@
 from django.contrib import admin
 
 from django.contrib import admin
-from .models import Category, Listing, ListingImage, PricingPlan, RatingReview, Favorite, ReportMisconduct
+from .locations import resolve_location
+from .models import Category, Location, Listing, ListingImage, PricingPlan, RatingReview, Favorite, ReportMisconduct
 
 
 @admin.register(Category)
@@ -12,6 +13,16 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('cat_name',)}
 
 
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ['location_id', 'name', 'level', 'path', 'is_active']
+    list_filter = ['level', 'is_active']
+    search_fields = ['name', 'slug']
+    prepopulated_fields = {'slug': ('name',)}
+    readonly_fields = ['path']
+    raw_id_fields = ['parent']
+
+
 class ListingImageInline(admin.TabularInline):
     model = ListingImage
     extra = 1
@@ -24,7 +35,7 @@ class ListingAdmin(admin.ModelAdmin):
                     'listing_status', 'is_featured', 'views', 'createdat']
     list_filter = ['listing_status', 'is_featured', 'cat_id', 'createdat']
     search_fields = ['listing_title', 'list_description', 'list_location']
-    readonly_fields = ['views', 'createdat', 'updatedat']
+    readonly_fields = ['views', 'location', 'createdat', 'updatedat']
     inlines = [ListingImageInline]
     
     fieldsets = (
@@ -32,7 +43,7 @@ class ListingAdmin(admin.ModelAdmin):
             'fields': ('userid', 'cat_id', 'listing_title', 'list_description')
         }),
         ('Pricing & Location', {
-            'fields': ('listing_price', 'list_location')
+            'fields': ('listing_price', 'list_location', 'location', 'latitude', 'longitude')
         }),
         ('Status & Visibility', {
             'fields': ('listing_status', 'is_featured', 'expiration_date')
@@ -42,6 +53,11 @@ class ListingAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        if 'list_location' in form.changed_data:
+            obj.location_id, obj.location_path = resolve_location(obj.list_location)
+        super().save_model(request, obj, form, change)
+
 
 @admin.register(ListingImage)
 class ListingImageAdmin(admin.ModelAdmin):
@@ -0,0 +1,119 @@
+from django.db import transaction
+
+from umuhuza_api.cache import tiered_cache
+from .models import Listing
+
+
+# ============================================================================
+# RESPONSE CACHE TAGS
+# ============================================================================
+# Cached listing reads (listings/views.py) are tagged with what they show;
+# listings/signals.py maps model changes to the same tags.
+
+CATEGORY_LIST = 'category-list'
+# Any listing change may reorder or recount browse pages
+LISTING_BROWSE = 'listing-browse'
+FEATURED_LISTINGS = 'featured-listings'
+PRICING_PLANS = 'pricing-plans'
+LOCATION_LIST = 'location-list'
+# The per-process index locations.get_index() matches typed places against
+LOCATION_INDEX = 'location-index'
+
+
+def listing_tag(listing_id):
+    return f'listing:{listing_id}'
+
+
+def seller_tag(user_id):
+    return f'seller:{user_id}'
+
+
+def category_tag(cat_id):
+    """The category row itself (name, slug, description)"""
+    return f'category:{cat_id}'
+
+
+def category_listings_tag(cat_id):
+    """Which listings a category holds (similar_listings result sets)"""
+    return f'category-listings:{cat_id}'
+
+
+def geo_tile_tag(tile):
+    """A map cluster tile (listings/clusters.py), named by its geohash"""
+    return f'geo-tile:{tile}'
+
+
+def geo_tile_tags(geohash):
+    """Tags of every cluster tile holding a position, at any zoom"""
+    return [geo_tile_tag(geohash[:length]) for length in range(1, len(geohash or '') + 1)]
+
+
+def listing_tags(listing_id, cat_id, is_featured, geohash):
+    """Tags of every cached read a change to this listing may alter"""
+    return [
+        listing_tag(listing_id),
+        LISTING_BROWSE,
+        category_listings_tag(cat_id),
+        FEATURED_LISTINGS if is_featured else None,
+        *geo_tile_tags(geohash),
+    ]
+
+
+def card_tags(cards):
+    """Tags for a list of ListingCardSerializer dicts"""
+    tags = set()
+    for card in cards:
+        tags.add(listing_tag(card['listing_id']))
+        if card.get('seller'):
+            tags.add(seller_tag(card['seller']['userid']))
+        if card.get('category'):
+            tags.add(category_tag(card['category']['cat_id']))
+    return tags
+
+
+def invalidate(*tags):
+    """Evict entries carrying any of tags once the current transaction commits"""
+    tags = [tag for tag in tags if tag]
+    if tags:
+        transaction.on_commit(lambda: tiered_cache.invalidate_tags(tags))
+
+
+# Tag functions for @cache_response (called with request, data, **view kwargs)
+
+def category_list_tags(request, data):
+    return [CATEGORY_LIST] + [category_tag(category['cat_id']) for category in data]
+
+
+def category_detail_tags(request, data, pk):
+    return [category_tag(pk)]
+
+
+def pricing_plans_tags(request, data):
+    return [PRICING_PLANS]
+
+
+def location_list_tags(request, data):
+    return [LOCATION_LIST]
+
+
+def listing_browse_tags(request, data):
+    # Page-number responses wrap cards in 'results'; keyset pages too
+    return {LISTING_BROWSE} | card_tags(data['results'])
+
+
+def listing_facets_tags(request, data):
+    return {LISTING_BROWSE} | {category_tag(category['cat_id']) for category in data['categories']}
+
+
+def featured_listings_tags(request, data):
+    return {FEATURED_LISTINGS} | card_tags(data)
+
+
+def similar_listings_tags(request, data, pk):
+    # The source listing decides the category and price band; any listing
+    # joining its category may join the result
+    tags = {listing_tag(pk)} | card_tags(data)
+    cat_id = Listing.objects.filter(pk=pk).values_list('cat_id', flat=True).first()
+    if cat_id:
+        tags.add(category_listings_tag(cat_id))
+    return tags
@@ -0,0 +1,136 @@
+import hashlib
+import math
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min, Q
+from django.db.models.functions import Substr
+
+from umuhuza_api.cache import tiered_cache
+from .cache_tags import geo_tile_tag
+from .geo import cell_bits, cell_bounds, cells_at, cell_count
+
+
+# ============================================================================
+# MAP CLUSTERS
+# ============================================================================
+# Listings are grouped by geohash prefix in the database: at a given zoom
+# every listing whose geohash starts with the same `precision` characters
+# falls in one cluster. Results are computed and cached per tile, a geohash
+# cell TILE_LEVELS characters shorter than the clusters (up to 32 x 32
+# clusters), so panning reuses the tiles already seen and a listing change
+# only evicts the tiles holding it.
+
+MAX_PRECISION = 8  # ~40 m clusters, zoom 18 and closer
+TILE_LEVELS = 2
+
+# Target cluster width on screen, out of a 256 px map tile
+CLUSTER_PIXELS = 64
+
+# A viewport usually needs 1-4 tiles; a box needing many more is rejected
+MAX_TILES = 64
+
+CACHE_NAMESPACE = 'listing-clusters'
+CACHE_SECONDS = 300
+
+
+def zoom_precision(zoom):
+    """Geohash length whose cells are closest to CLUSTER_PIXELS wide at zoom"""
+    target_width = 360 / (1 << zoom) * CLUSTER_PIXELS / 256
+
+    def distance(length):
+        lng_bits, _ = cell_bits(length)
+        return abs(math.log((360 / (1 << lng_bits)) / target_width))
+
+    return min(range(1, MAX_PRECISION + 1), key=distance)
+
+
+def tile_precision(precision):
+    return max(1, precision - TILE_LEVELS)
+
+
+def count_tiles(bbox, zoom):
+    return cell_count(*bbox, tile_precision(zoom_precision(zoom)))
+
+
+def tile_cache_key(signature, tile, precision):
+    return hashlib.md5(f'{signature}|{tile}|{precision}'.encode()).hexdigest()
+
+
+def aggregate_tiles(queryset, tiles, precision):
+    """{tile: [cluster, ...]} for tiles, from one GROUP BY query"""
+    in_tiles = Q()
+    for tile in tiles:
+        in_tiles |= Q(geohash__startswith=tile)
+
+    rows = queryset.filter(in_tiles).order_by().annotate(
+        cell=Substr('geohash', 1, precision)
+    ).values('cell').annotate(
+        count=Count('*'),
+        latitude=Avg('latitude'),
+        longitude=Avg('longitude'),
+        min_price=Min('listing_price'),
+        max_price=Max('listing_price'),
+        # Single-listing clusters are drawn as that listing's marker
+        listing_id=Min('listing_id'),
+    )
+
+    by_tile = {tile: [] for tile in tiles}
+    for row in rows:
+        by_tile[row['cell'][:tile_precision(precision)]].append({
+            'geohash': row['cell'],
+            'count': row['count'],
+            'latitude': round(row['latitude'], 6),
+            'longitude': round(row['longitude'], 6),
+            'min_price': str(row['min_price']),
+            'max_price': str(row['max_price']),
+            'listing_id': row['listing_id'] if row['count'] == 1 else None,
+        })
+    return by_tile
+
+
+def listing_clusters(queryset, bbox, zoom, signature):
+    """
+    (response data, tiles served from cache, tiles) for the clusters of
+    queryset overlapping bbox at zoom. `signature` identifies the other
+    filters applied to queryset and is part of each tile's cache key.
+    """
+    precision = zoom_precision(zoom)
+    tiles = cells_at(*bbox, tile_precision(precision))
+
+    use_cache = settings.RESPONSE_CACHE_ENABLED
+
+    clusters, missing = [], []
+    for tile in tiles:
+        cached = None
+        if use_cache:
+            cached = tiered_cache.get(CACHE_NAMESPACE, tile_cache_key(signature, tile, precision))
+        if cached is None:
+            missing.append(tile)
+        else:
+            clusters.extend(cached)
+
+    if missing:
+        generation = tiered_cache.generation() if use_cache else None
+        for tile, tile_clusters in aggregate_tiles(queryset, missing, precision).items():
+            if use_cache:
+                tiered_cache.set(
+                    CACHE_NAMESPACE, tile_cache_key(signature, tile, precision), tile_clusters,
+                    CACHE_SECONDS, tags=[geo_tile_tag(tile)], since=generation
+                )
+            clusters.extend(tile_clusters)
+
+    # Tiles overhang the viewport; keep the clusters that overlap it
+    min_lat, min_lng, max_lat, max_lng = bbox
+    visible = []
+    for cluster in clusters:
+        south, west, north, east = cell_bounds(cluster['geohash'])
+        if south <= max_lat and north >= min_lat and west <= max_lng and east >= min_lng:
+            visible.append(cluster)
+    visible.sort(key=lambda cluster: -cluster['count'])
+
+    return {
+        'zoom': zoom,
+        'precision': precision,
+        'total': sum(cluster['count'] for cluster in visible),
+        'clusters': visible,
+    }, len(tiles) - len(missing), len(tiles)
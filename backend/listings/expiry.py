@@ -0,0 +1,101 @@
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.models import Notification
+from .cache_tags import invalidate, listing_tags
+from .models import Listing, UserSubscription
+
+
+# ============================================================================
+# EXPIRY SWEEPS
+# ============================================================================
+# Listings past expiration_date and subscriptions past expires_at are moved
+# to 'expired' in chunks. Each chunk locks its rows with SKIP LOCKED, flips
+# them with one UPDATE and inserts the owners' notifications with one
+# bulk_create, so overlapping sweeps never notify twice. The partial indexes
+# listings_active_expiry_idx and user_subscr_active_expiry_idx only cover
+# 'active' rows, so a sweep doesn't walk through rows it already expired.
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _sweep(queryset, fields, expire, build_notifications, chunk_size):
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.select_for_update(skip_locked=True, of=('self',)).order_by().values(*fields)[:chunk_size]
+            )
+            if not rows:
+                break
+            expire(rows)
+            Notification.objects.bulk_create(build_notifications(rows))
+        total += len(rows)
+        if len(rows) < chunk_size:
+            break
+    return total
+
+
+def expire_listings(now=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Expire active listings past their expiration date; returns rows expired"""
+    now = now or timezone.now()
+
+    def expire(rows):
+        Listing.objects.filter(pk__in=[row['listing_id'] for row in rows]).update(
+            listing_status='expired', updatedat=now
+        )
+        invalidate(*{
+            tag
+            for row in rows
+            for tag in listing_tags(row['listing_id'], row['cat_id'], row['is_featured'], row['geohash'])
+        })
+
+    def build_notifications(rows):
+        return [
+            Notification(
+                userid_id=row['userid'],
+                notif_title='Listing Expired',
+                notif_message=f'Your listing "{row["listing_title"]}" has expired and is no longer visible to buyers',
+                notif_type='listing',
+                link_url=f'/listings/{row["listing_id"]}'
+            )
+            for row in rows
+        ]
+
+    return _sweep(
+        Listing.objects.filter(listing_status='active', expiration_date__lt=now),
+        ('listing_id', 'userid', 'cat_id', 'is_featured', 'listing_title', 'geohash'),
+        expire,
+        build_notifications,
+        chunk_size
+    )
+
+
+def expire_subscriptions(now=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Expire active subscriptions past expires_at; returns rows expired"""
+    now = now or timezone.now()
+
+    def expire(rows):
+        UserSubscription.objects.filter(pk__in=[row['subscription_id'] for row in rows]).update(
+            subscription_status='expired', updatedat=now
+        )
+
+    def build_notifications(rows):
+        return [
+            Notification(
+                userid_id=row['userid'],
+                notif_title='Subscription Expired',
+                notif_message=f'Your {row["pricing_id__pricing_name"]} subscription has expired. Renew it to keep creating listings.',
+                notif_type='payment',
+                link_url='/pricing'
+            )
+            for row in rows
+        ]
+
+    return _sweep(
+        UserSubscription.objects.filter(subscription_status='active', expires_at__lt=now),
+        ('subscription_id', 'userid', 'pricing_id__pricing_name'),
+        expire,
+        build_notifications,
+        chunk_size
+    )
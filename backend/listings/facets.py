@@ -0,0 +1,114 @@
+from django.db import connection
+from django.db.models import BooleanField, ExpressionWrapper, F, Value
+
+
+# ============================================================================
+# BROWSE FACETS
+# ============================================================================
+
+# Lower bounds of the price bands (BIF); the last band is open-ended
+PRICE_BUCKETS = [0, 100_000, 500_000, 1_000_000, 5_000_000, 20_000_000, 100_000_000]
+
+# Free-text locations can be numerous; only the most common are returned
+MAX_LOCATIONS = 20
+
+# Each facet's counts ignore its own selection (a listing counts for its
+# category when it matches every other selected facet), so one query
+# computes one count column per facet and the total
+FACETS_SQL = '''
+    SELECT
+        GROUPING(f.cat_id, f.list_location, f.is_featured, f.price_bucket) AS grouping_id,
+        f.cat_id, MAX(f.cat_name), f.list_location, f.is_featured, f.price_bucket,
+        COUNT(*) FILTER (WHERE f.in_locations AND f.in_featured AND f.in_price_ranges),
+        COUNT(*) FILTER (WHERE f.in_categories AND f.in_featured AND f.in_price_ranges),
+        COUNT(*) FILTER (WHERE f.in_categories AND f.in_locations AND f.in_price_ranges),
+        COUNT(*) FILTER (WHERE f.in_categories AND f.in_locations AND f.in_featured),
+        COUNT(*) FILTER (WHERE f.in_categories AND f.in_locations AND f.in_featured AND f.in_price_ranges)
+    FROM (
+        SELECT
+            l.facet_cat_id AS cat_id, l.facet_cat_name AS cat_name,
+            l.facet_location AS list_location, l.facet_featured AS is_featured,
+            width_bucket(l.facet_price, %s::numeric[]) AS price_bucket,
+            l.in_categories, l.in_locations, l.in_featured, l.in_price_ranges
+        FROM ({listings}) l
+    ) f
+    GROUP BY GROUPING SETS (
+        (f.cat_id), (f.list_location), (f.is_featured), (f.price_bucket), ()
+    )
+'''
+
+FACETS = ('categories', 'locations', 'featured', 'price_ranges')
+
+# GROUPING() bit masks (first argument = highest bit) of each grouping set
+GROUPED_BY_CATEGORY = 0b0111
+GROUPED_BY_LOCATION = 0b1011
+GROUPED_BY_FEATURED = 0b1101
+GROUPED_BY_PRICE = 0b1110
+GROUPED_TOTAL = 0b1111
+
+
+def facet_selection(condition):
+    if not condition:
+        return Value(True)
+    return ExpressionWrapper(condition, output_field=BooleanField())
+
+
+def listing_facets(queryset, selections=None):
+    """
+    Category, location, featured and price band counts for a filtered
+    listing queryset, computed with one GROUP BY GROUPING SETS query.
+    `selections` maps facets (FACETS) to a Q of the listings selected
+    within that facet: the total and the other facets' counts apply it,
+    the facet's own counts do not.
+    """
+    selections = selections or {}
+    listings = queryset.order_by().values(
+        facet_cat_id=F('cat_id'),
+        facet_cat_name=F('cat_id__cat_name'),
+        facet_location=F('list_location'),
+        facet_featured=F('is_featured'),
+        facet_price=F('listing_price'),
+        **{f'in_{facet}': facet_selection(selections.get(facet)) for facet in FACETS}
+    )
+    listings_sql, listings_params = listings.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            FACETS_SQL.format(listings=listings_sql),
+            [PRICE_BUCKETS, *listings_params]
+        )
+        rows = cursor.fetchall()
+
+    facets = {
+        'total': 0,
+        'categories': [],
+        'locations': [],
+        'featured': {'true': 0, 'false': 0},
+        'price_ranges': [
+            {
+                'min': low,
+                'max': PRICE_BUCKETS[index + 1] if index + 1 < len(PRICE_BUCKETS) else None,
+                'count': 0,
+            }
+            for index, low in enumerate(PRICE_BUCKETS)
+        ],
+    }
+
+    for grouping_id, cat_id, cat_name, location, is_featured, bucket, *counts in rows:
+        by_category, by_location, by_featured, by_price, total = counts
+        if grouping_id == GROUPED_TOTAL:
+            facets['total'] = total
+        elif grouping_id == GROUPED_BY_CATEGORY and by_category:
+            facets['categories'].append({'cat_id': cat_id, 'cat_name': cat_name, 'count': by_category})
+        elif grouping_id == GROUPED_BY_LOCATION and by_location:
+            facets['locations'].append({'list_location': location, 'count': by_location})
+        elif grouping_id == GROUPED_BY_FEATURED:
+            facets['featured']['true' if is_featured else 'false'] = by_featured
+        elif grouping_id == GROUPED_BY_PRICE and bucket:
+            # width_bucket() is 0 below the first bound (negative prices)
+            facets['price_ranges'][bucket - 1]['count'] = by_price
+
+    facets['categories'].sort(key=lambda entry: (-entry['count'], entry['cat_name'] or ''))
+    facets['locations'].sort(key=lambda entry: (-entry['count'], entry['list_location'] or ''))
+    del facets['locations'][MAX_LOCATIONS:]
+    return facets
@@ -0,0 +1,135 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Q
+from django_filters.rest_framework import FilterSet
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .geo import MAX_RADIUS_KM, parse_bbox, parse_point, within_bbox, within_radius
+from .locations import find_location
+from .models import SEARCH_CONFIG, SEARCH_CONFIG_SIMPLE, Listing
+
+
+def price_range_filter(params):
+    """Q for ?min_price= / ?max_price="""
+    condition = Q()
+    if params.get('min_price'):
+        condition &= Q(listing_price__gte=params['min_price'])
+    if params.get('max_price'):
+        condition &= Q(listing_price__lte=params['max_price'])
+    return condition
+
+
+class ListingFacetSelectionFilterSet(FilterSet):
+    """ListingListView filters that pick values within a browse facet"""
+    class Meta:
+        model = Listing
+        fields = ['cat_id', 'list_location', 'is_featured']
+
+
+def build_search_query(terms):
+    """
+    Match either the French-stemmed or the plain (Kirundi) form of the terms.
+    websearch syntax lets users write "quoted phrases", `or` and -exclusions.
+    """
+    return (
+        SearchQuery(terms, config=SEARCH_CONFIG, search_type='websearch')
+        | SearchQuery(terms, config=SEARCH_CONFIG_SIMPLE, search_type='websearch')
+    )
+
+
+def search_listings(queryset, terms):
+    """Filter to listings matching terms, annotated with search_rank"""
+    query = build_search_query(terms)
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    )
+
+
+class ListingSearchFilter(BaseFilterBackend):
+    """
+    Full-text search over Listing.search_vector (GIN indexed)
+    GET /api/listings/?search=maison rohero
+
+    Results are ranked by relevance unless the client asks for an explicit
+    ?ordering=, so this backend must run after OrderingFilter.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def get_search_terms(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        queryset = search_listings(queryset, terms)
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', '-createdat')
+
+        return queryset
+
+
+class ListingLocationFilter(BaseFilterBackend):
+    """
+    Listings in a place or anywhere under it
+    GET /api/listings/?location=bujumbura           (slug)
+    GET /api/listings/?location=bujumbura/mukaza    (path)
+    GET /api/listings/?location=12                  (location_id)
+
+    Matches on the location_path copied onto each listing, a prefix range
+    scan of listings_active_location_idx. An unknown place matches nothing.
+    """
+    location_param = 'location'
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.location_param, '').strip()
+        if not value:
+            return queryset
+
+        location = find_location(value)
+        if location is None:
+            return queryset.none()
+        return queryset.filter(location_path__startswith=location.path)
+
+
+class ListingGeoFilter(BaseFilterBackend):
+    """
+    Listings near a point or inside the visible map area
+    GET /api/listings/?near=-3.3822,29.3644&radius_km=5
+    GET /api/listings/?bbox=29.30,-3.42,29.40,-3.34   (min_lng,min_lat,max_lng,max_lat)
+
+    Both prefilter on geohash cells (listings_active_geohash_idx) and then
+    check the exact coordinates; ?near= keeps listings within the haversine
+    radius and sorts them nearest first unless ?ordering= is given (a
+    ?search= still ranks by relevance, so this runs before it).
+    """
+    default_radius_km = 10
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        near = params.get('near', '').strip()
+        bbox = params.get('bbox', '').strip()
+
+        if bbox:
+            try:
+                queryset = within_bbox(queryset, *parse_bbox(bbox))
+            except ValueError:
+                raise ValidationError({'bbox': 'Expected min_lng,min_lat,max_lng,max_lat'})
+
+        if near:
+            try:
+                lat, lng = parse_point(near)
+                radius_km = float(params.get('radius_km', self.default_radius_km))
+            except ValueError:
+                raise ValidationError({'near': 'Expected near=lat,lng and a numeric radius_km'})
+            if not 0 < radius_km <= MAX_RADIUS_KM:
+                raise ValidationError({'radius_km': f'Must be between 0 and {MAX_RADIUS_KM}'})
+
+            queryset = within_radius(queryset, lat, lng, radius_km)
+            if not params.get(api_settings.ORDERING_PARAM):
+                queryset = queryset.order_by('distance_km', 'listing_id')
+
+        return queryset
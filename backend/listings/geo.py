@@ -0,0 +1,179 @@
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+
+# ============================================================================
+# GEO SEARCH
+# ============================================================================
+# Listings store latitude/longitude plus their geohash (Listing.save). A
+# radius or bounding-box search first keeps the listings whose geohash
+# starts with one of a few cells covering the area (prefix range scans of
+# listings_active_geohash_idx), then refines on the exact coordinates.
+# No PostGIS needed.
+
+EARTH_RADIUS_KM = 6371.0088
+# Same sphere as the haversine distance, so radius boxes always enclose the circle
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+GEOHASH_PRECISION = 9  # ~5 m cells
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Cells in a prefilter; more cells hug the area closer but cost more scans
+MAX_COVER_CELLS = 16
+
+MAX_RADIUS_KM = 200
+
+
+def cell_bits(precision):
+    """(longitude bits, latitude bits) of a geohash of this length"""
+    bits = precision * 5
+    return (bits + 1) // 2, bits // 2
+
+
+def grid_index(lat, lng, precision):
+    """(latitude row, longitude column) of the cell holding a point"""
+    lng_bits, lat_bits = cell_bits(precision)
+    row = int((lat + 90) / 180 * (1 << lat_bits))
+    col = int((lng + 180) / 360 * (1 << lng_bits))
+    return min(row, (1 << lat_bits) - 1), min(col, (1 << lng_bits) - 1)
+
+
+def cell_hash(row, col, precision):
+    """Geohash of a grid cell; bits interleave longitude first"""
+    lng_bits, lat_bits = cell_bits(precision)
+    value = 0
+    for bit in range(precision * 5):
+        if bit % 2 == 0:
+            lng_bits -= 1
+            value = (value << 1) | ((col >> lng_bits) & 1)
+        else:
+            lat_bits -= 1
+            value = (value << 1) | ((row >> lat_bits) & 1)
+    return ''.join(
+        GEOHASH_ALPHABET[(value >> shift) & 31]
+        for shift in range((precision - 1) * 5, -1, -5)
+    )
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    return cell_hash(*grid_index(lat, lng, precision), precision)
+
+
+def cell_bounds(cell):
+    """(min_lat, min_lng, max_lat, max_lng) of a geohash cell"""
+    value = 0
+    for char in cell:
+        value = (value << 5) | GEOHASH_ALPHABET.index(char)
+    row = col = 0
+    for bit in range(len(cell) * 5 - 1, -1, -1):
+        # The first (highest) bit is a longitude bit
+        if (len(cell) * 5 - 1 - bit) % 2 == 0:
+            col = (col << 1) | ((value >> bit) & 1)
+        else:
+            row = (row << 1) | ((value >> bit) & 1)
+    lng_bits, lat_bits = cell_bits(len(cell))
+    height, width = 180 / (1 << lat_bits), 360 / (1 << lng_bits)
+    return row * height - 90, col * width - 180, (row + 1) * height - 90, (col + 1) * width - 180
+
+
+def cell_count(min_lat, min_lng, max_lat, max_lng, precision):
+    low_row, low_col = grid_index(min_lat, min_lng, precision)
+    high_row, high_col = grid_index(max_lat, max_lng, precision)
+    return (high_row - low_row + 1) * (high_col - low_col + 1)
+
+
+def cells_at(min_lat, min_lng, max_lat, max_lng, precision):
+    """Every geohash cell of this length overlapping a bounding box"""
+    low_row, low_col = grid_index(min_lat, min_lng, precision)
+    high_row, high_col = grid_index(max_lat, max_lng, precision)
+    return [
+        cell_hash(row, col, precision)
+        for row in range(low_row, high_row + 1)
+        for col in range(low_col, high_col + 1)
+    ]
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_COVER_CELLS):
+    """
+    The finest geohash cells covering a bounding box, at most max_cells of
+    them (a box spanning a cell boundary at the coarsest level may need up
+    to four).
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        if precision == 1 or cell_count(min_lat, min_lng, max_lat, max_lng, precision) <= max_cells:
+            return cells_at(min_lat, min_lng, max_lat, max_lng, precision)
+
+
+def radius_bbox(lat, lng, radius_km):
+    """(min_lat, min_lng, max_lat, max_lng) enclosing a circle"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlng = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return (
+        max(lat - dlat, -90.0), max(lng - dlng, -180.0),
+        min(lat + dlat, 90.0), min(lng + dlng, 180.0),
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = (math.sin(dlat / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_expression(lat, lng):
+    """Great-circle distance in km from (lat, lng) to each row, in SQL"""
+    lat_value = Value(lat, output_field=FloatField())
+    half_dlat = Radians(F('latitude') - lat_value) / 2
+    half_dlng = Radians(F('longitude') - Value(lng, output_field=FloatField())) / 2
+    a = (
+        Power(Sin(half_dlat), 2)
+        + Cos(Radians(lat_value)) * Cos(Radians(F('latitude'))) * Power(Sin(half_dlng), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def in_cells(cells):
+    """Q matching geohashes inside any of cells"""
+    condition = Q()
+    for cell in cells:
+        condition |= Q(geohash__startswith=cell)
+    return condition
+
+
+def within_bbox(queryset, min_lat, min_lng, max_lat, max_lng):
+    """Listings inside a bounding box: geohash prefilter, then exact bounds"""
+    return queryset.filter(
+        in_cells(covering_cells(min_lat, min_lng, max_lat, max_lng)),
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lng, max_lng),
+    )
+
+
+def within_radius(queryset, lat, lng, radius_km):
+    """Listings within radius_km of a point, annotated with distance_km"""
+    return within_bbox(queryset, *radius_bbox(lat, lng, radius_km)).annotate(
+        distance_km=haversine_expression(lat, lng)
+    ).filter(distance_km__lte=radius_km)
+
+
+def parse_point(value):
+    """(lat, lng) from 'lat,lng'; ValueError if malformed or out of range"""
+    lat, lng = (float(part) for part in value.split(','))
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('coordinates out of range')
+    return lat, lng
+
+
+def parse_bbox(value):
+    """
+    (min_lat, min_lng, max_lat, max_lng) from 'min_lng,min_lat,max_lng,max_lat'
+    (GeoJSON order, as map SDKs report their bounds)
+    """
+    min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+        raise ValueError('invalid bounds')
+    return min_lat, min_lng, max_lat, max_lng
@@ -0,0 +1,76 @@
+"""
+Code that runs inside image pipeline worker processes.
+
+Workers are spawned from a clean interpreter and unpickle these functions
+before Django is set up, so this module must not import models.
+"""
+
+import os
+import uuid
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+
+# Derivative sizes by max width, smallest first. 'full' is also the
+# ListingImage.image_url kept for older clients.
+IMAGE_SIZES = [
+    ('thumb', 320),
+    ('card', 640),
+    ('full', 1920),
+]
+IMAGE_FORMATS = [
+    ('jpeg', 'JPEG', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+    ('webp', 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+]
+
+
+def init_worker():
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'umuhuza_api.settings')
+    django.setup()
+
+
+def build_derivatives(source_path, listing_id):
+    """
+    Render every size in IMAGE_SIZES as JPEG and WebP from a raw upload.
+
+    Runs inside a pipeline worker process: it only touches storage, never the
+    database, and returns {size: {'width', 'height', 'jpeg', 'webp'}} with
+    stored paths for the parent to record. Images are never upscaled.
+    """
+    with default_storage.open(source_path, 'rb') as source:
+        img = Image.open(source)
+        try:
+            # Convert to RGB if necessary
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            else:
+                img.load()
+
+            stem = f"listings/{listing_id}/{uuid.uuid4().hex}"
+            derivatives = {}
+            # Largest first, each size resampled from the previous one
+            current = img
+            for size, max_width in reversed(IMAGE_SIZES):
+                if current.width > max_width:
+                    ratio = max_width / current.width
+                    current = current.resize(
+                        (max_width, max(1, int(current.height * ratio))),
+                        Image.Resampling.LANCZOS
+                    )
+                entry = {'width': current.width, 'height': current.height}
+                for key, pil_format, ext, save_options in IMAGE_FORMATS:
+                    output = BytesIO()
+                    current.save(output, format=pil_format, **save_options)
+                    entry[key] = default_storage.save(
+                        f"{stem}_{size}.{ext}",
+                        ContentFile(output.getvalue())
+                    )
+                derivatives[size] = entry
+        finally:
+            img.close()
+
+    return derivatives
@@ -0,0 +1,206 @@
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, models, transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
+
+from .cache_tags import invalidate, listing_tag
+from .image_worker import build_derivatives, init_worker
+from .models import Listing, ListingImage
+
+
+ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp']
+MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
+
+
+def image_summary_expressions():
+    """
+    Subqueries computing a listing's card image (the primary, or first, image
+    and its thumbnail URL) and image count, for use in Listing UPDATEs.
+    """
+    images = ListingImage.objects.filter(listing_id=OuterRef('pk'))
+    primary = images.order_by('-is_primary', 'display_order', 'listimage_id').annotate(
+        card_url=Coalesce(KT('variants__thumb__jpeg'), 'image_url', output_field=models.CharField())
+    )
+    count = images.order_by().values('listing_id').annotate(total=Count('*')).values('total')
+    return {
+        'primary_image': Subquery(primary.values('listimage_id')[:1]),
+        'primary_image_url': Subquery(primary.values('card_url')[:1]),
+        'image_count': Coalesce(Subquery(count), Value(0)),
+    }
+
+
+def refresh_image_summary(listing_id):
+    """Recompute Listing.primary_image/primary_image_url/image_count in one UPDATE"""
+    Listing.objects.filter(pk=listing_id).update(**image_summary_expressions())
+    # update() sends no signals; cached cards show the primary image
+    invalidate(listing_tag(listing_id))
+
+
+def validate_upload(image_file):
+    """Return an error message for an unacceptable upload, else None"""
+    if image_file.content_type not in ALLOWED_IMAGE_TYPES:
+        return 'Invalid file type. Only JPEG, PNG, and WebP are allowed'
+    if image_file.size > MAX_IMAGE_SIZE:
+        return 'File too large. Maximum size is 5MB'
+    return None
+
+
+def store_upload(listing, image_file, display_order, is_primary):
+    """
+    Save the raw upload and return an unsaved ListingImage in 'processing'
+    state. The raw file is served as a placeholder until the pipeline
+    replaces it, then deleted.
+    """
+    ext = os.path.splitext(image_file.name)[1].lower() or '.img'
+    source_path = default_storage.save(
+        f"listings/{listing.listing_id}/originals/{uuid.uuid4().hex}{ext}",
+        image_file
+    )
+    return ListingImage(
+        listing_id=listing,
+        image_url=default_storage.url(source_path),
+        source_path=source_path,
+        processing_status='processing',
+        is_primary=is_primary,
+        display_order=display_order
+    )
+
+
+def record_result(image_id, listing_id, source_path, derivatives=None, error=None):
+    """Store the outcome of build_derivatives on the ListingImage row"""
+    if error is not None:
+        ListingImage.objects.filter(pk=image_id).update(
+            processing_status='failed',
+            processing_error=str(error)[:1000]
+        )
+        return
+
+    variants = {
+        size: {
+            'width': entry['width'],
+            'height': entry['height'],
+            'jpeg': default_storage.url(entry['jpeg']),
+            'webp': default_storage.url(entry['webp']),
+        }
+        for size, entry in derivatives.items()
+    }
+    updated = ListingImage.objects.filter(pk=image_id).update(
+        image_url=variants['full']['jpeg'],
+        variants=variants,
+        processing_status='ready',
+        processing_error=None,
+        source_path=None
+    )
+    # The image was deleted while processing; don't leave the output behind
+    if not updated:
+        for entry in derivatives.values():
+            default_storage.delete(entry['jpeg'])
+            default_storage.delete(entry['webp'])
+    else:
+        refresh_image_summary(listing_id)
+    default_storage.delete(source_path)
+
+
+def storage_name(url):
+    """Map a stored image URL back to its storage name"""
+    base_url = default_storage.base_url or ''
+    if base_url and url.startswith(base_url):
+        return url[len(base_url):]
+    return url
+
+
+def delete_image_files(image):
+    """Remove an image's raw upload, derivatives and legacy single file"""
+    urls = {image.image_url}
+    for entry in (image.variants or {}).values():
+        urls.update([entry['jpeg'], entry['webp']])
+    names = {storage_name(url) for url in urls if url}
+    if image.source_path:
+        names.add(image.source_path)
+    for name in names:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def process_image_now(image):
+    """Run the pipeline for one image in the current process"""
+    try:
+        derivatives = build_derivatives(image.source_path, image.listing_id_id)
+    except Exception as e:
+        record_result(image.pk, image.listing_id_id, image.source_path, error=e)
+    else:
+        record_result(image.pk, image.listing_id_id, image.source_path, derivatives=derivatives)
+
+
+class ImagePipeline:
+    """
+    Background image optimisation on a process pool.
+
+    Views store the raw upload, create ListingImage rows in 'processing'
+    state and call enqueue(). After the transaction commits, each image's
+    size/format derivatives are rendered in a worker process, so Pillow
+    work runs in parallel and outside the request, and the parent records
+    the result from the future callback.
+    Rows left in 'processing' by a crash are picked up again by the
+    process_listing_images command.
+    """
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.IMAGE_PIPELINE_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker
+                )
+            return self._executor
+
+    def enqueue(self, images):
+        jobs = [(image.pk, image.source_path, image.listing_id_id) for image in images]
+        if not jobs:
+            return
+        if settings.IMAGE_PIPELINE_EAGER:
+            transaction.on_commit(lambda: [process_image_now(image) for image in images])
+        else:
+            transaction.on_commit(lambda: self.submit(jobs))
+
+    def submit(self, jobs):
+        for image_id, source_path, listing_id in jobs:
+            try:
+                future = self.get_executor().submit(build_derivatives, source_path, listing_id)
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool and retry once
+                with self._lock:
+                    self._executor = None
+                future = self.get_executor().submit(build_derivatives, source_path, listing_id)
+            future.add_done_callback(
+                lambda f, job=(image_id, listing_id, source_path): self._complete(*job, f)
+            )
+
+    def _complete(self, image_id, listing_id, source_path, future):
+        try:
+            try:
+                derivatives = future.result()
+            except Exception as e:
+                record_result(image_id, listing_id, source_path, error=e)
+            else:
+                record_result(image_id, listing_id, source_path, derivatives=derivatives)
+        except Exception as e:
+            print(f"Error recording image {image_id}: {e}")
+        finally:
+            close_old_connections()
+
+
+image_pipeline = ImagePipeline()
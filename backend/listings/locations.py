@@ -0,0 +1,146 @@
+import re
+import unicodedata
+
+from django.db.models.functions import Length
+from django.utils.text import slugify
+
+from umuhuza_api.cache import LocalLRU, tiered_cache
+from .cache_tags import LISTING_BROWSE, LOCATION_INDEX, invalidate
+from .models import Location
+
+
+# ============================================================================
+# LOCATION NORMALISATION
+# ============================================================================
+# Sellers type places freely ("Bujumbura, Rohero", "ROHERO", "Kinindo - Buja").
+# resolve_location() maps that text onto the LOCATIONS hierarchy so listings
+# can be filtered by place; list_location keeps what the seller wrote.
+
+# Separators between the parts of a typed location
+PART_SEPARATORS = re.compile(r'[,;/|()\-]+')
+
+# The LOCATIONS table is small and read on every listing write; each process
+# keeps an index of it for this long. The index is keyed on the shared
+# version of the LOCATION_INDEX tag, which location changes bump, so every
+# process rebuilds it within RESPONSE_CACHE_VERSION_SECONDS of an edit.
+INDEX_SECONDS = 300
+
+_index_cache = LocalLRU(1)
+
+LEVEL_DEPTH = {'province': 1, 'commune': 2, 'zone': 3}
+
+
+def normalize_place(text):
+    """Lowercase, accents stripped, punctuation collapsed to single spaces"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', text.lower()).split())
+
+
+def build_index(locations):
+    """
+    {normalized name: [location, ...]} from (location_id, name, path, level)
+    rows. Migration 0014 keeps a frozen copy of this and match_location().
+    """
+    index = {}
+    for location_id, name, path, level in locations:
+        index.setdefault(normalize_place(name), []).append(
+            {'location_id': location_id, 'path': path, 'depth': LEVEL_DEPTH.get(level, 0)}
+        )
+    return index
+
+
+def get_index():
+    key = ('index', tiered_cache.get_versions([LOCATION_INDEX])[LOCATION_INDEX])
+    index = _index_cache.get(key)
+    if index is None:
+        index = build_index(
+            Location.objects.filter(is_active=True).values_list('location_id', 'name', 'path', 'level')
+        )
+        _index_cache.set(key, index, INDEX_SECONDS)
+    return index
+
+
+def match_location(index, text):
+    """
+    Best location for text in index, or None.
+
+    The whole text, else each part of it (split on commas, dashes...),
+    else each word is looked up by name. A candidate scores one point for every
+    matched part it lies under (itself included), so "Bujumbura, Cibitoke"
+    picks the zone inside Bujumbura over the province of the same name.
+    Ties go to the broader place, which never claims more than was typed.
+    """
+    whole = normalize_place(text)
+    if whole in index:
+        matches = [index[whole]]
+    else:
+        parts = [normalize_place(part) for part in PART_SEPARATORS.split(text or '')]
+        parts = [part for part in parts if part]
+        matches = [index[part] for part in parts if part in index]
+        if not matches:
+            matches = [index[word] for part in parts for word in part.split() if word in index]
+        if not matches:
+            return None
+
+    def score(candidate):
+        support = sum(
+            1 for others in matches
+            if any(candidate['path'].startswith(other['path']) for other in others)
+        )
+        return (support, -candidate['depth'], -candidate['location_id'])
+
+    return max((candidate for candidates in matches for candidate in candidates), key=score)
+
+
+def resolve_location(text):
+    """(location_id, path) of the canonical place for free text, or (None, '')"""
+    match = match_location(get_index(), text)
+    if match is None:
+        return None, ''
+    return match['location_id'], match['path']
+
+
+def find_location(value):
+    """
+    Location named by a ?location= value: an id, a path
+    ('bujumbura/mukaza'), a slug or free text. None if nothing matches.
+    """
+    value = (value or '').strip()
+    if not value:
+        return None
+    locations = Location.objects.filter(is_active=True)
+
+    if value.isdigit():
+        return locations.filter(pk=value).first()
+
+    if '/' in value:
+        slugs = [slugify(part) for part in value.split('/') if part.strip()]
+        if slugs:
+            return locations.filter(path=f'/{"/".join(slugs)}/').first()
+        return None
+
+    # The broadest place first when a slug repeats (Gitega province and commune)
+    location = locations.filter(slug=slugify(value)).order_by(Length('path')).first()
+    if location is not None:
+        return location
+
+    location_id, _ = resolve_location(value)
+    return locations.filter(pk=location_id).first() if location_id else None
+
+
+def resolve_listing_locations(listings):
+    """
+    Re-run resolve_location() over listings (after places were added or
+    renamed), one UPDATE per distinct typed location. Returns rows changed.
+    """
+    updated = 0
+    typed = listings.order_by().values_list('list_location', flat=True).distinct()
+    for text in list(typed):
+        location_id, path = resolve_location(text)
+        updated += listings.filter(list_location=text).exclude(
+            location_id=location_id, location_path=path
+        ).update(location_id=location_id, location_path=path)
+    if updated:
+        invalidate(LISTING_BROWSE)
+    return updated
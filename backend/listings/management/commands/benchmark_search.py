@@ -0,0 +1,176 @@
+"""
+Django management command to compare listing search strategies.
+
+Usage:
+    python manage.py seed_listings --count 500000
+    python manage.py benchmark_search [--runs 20] [--explain] [terms ...]
+    python manage.py benchmark_search --suggest [prefixes ...]
+    python manage.py benchmark_search --geo
+
+Times the legacy ILIKE scan (what DRF SearchFilter generated) against the
+ranked full-text query used by ListingListView, fetching one page each time.
+With --suggest, times the uncached /api/listings/suggest/ queries instead
+(the budget is 20 ms per keystroke). With --geo, times ?near= and ?bbox=
+with the geohash prefilter against an exact haversine scan of every active
+listing (seed_listings scatters listings around Burundi's towns).
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from listings.clusters import aggregate_tiles, tile_precision, zoom_precision
+from listings.filters import search_listings
+from listings.geo import cells_at, haversine_expression, within_bbox, within_radius
+from listings.models import Listing
+from listings.suggest import suggest_categories, suggest_locations, suggest_titles
+
+
+DEFAULT_TERMS = ['maison', 'voiture toyota', 'inzu nziza', 'rohero', 'terrain à vendre']
+DEFAULT_PREFIXES = ['ma', 'mai', 'mais', 'voit', 'toy', 'buj', 'roh', 'gite']
+# (label, latitude, longitude, radius km)
+GEO_SEARCHES = [
+    ('Rohero 1 km', -3.3870, 29.3700, 1),
+    ('Bujumbura 5 km', -3.3822, 29.3644, 5),
+    ('Gitega 20 km', -3.4271, 29.9246, 20),
+    ('Ngozi 50 km', -2.9075, 29.8306, 50),
+]
+# (label, min_lat, min_lng, max_lat, max_lng, map zoom)
+GEO_BOXES = [
+    ('Bujumbura centre', -3.40, 29.34, -3.37, 29.38, 15),
+    ('Bujumbura city', -3.45, 29.30, -3.30, 29.42, 13),
+    ('Burundi', -4.47, 28.99, -2.31, 30.85, 8),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ILIKE search against the full-text search backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*')
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--explain', action='store_true', help='Print EXPLAIN ANALYZE for each query')
+        parser.add_argument('--suggest', action='store_true', help='Benchmark autocomplete queries')
+        parser.add_argument('--geo', action='store_true', help='Benchmark radius and bounding-box queries')
+
+    def handle(self, *args, **options):
+        total = Listing.objects.filter(listing_status='active').count()
+        self.stdout.write(self.style.HTTP_INFO(f'📊 {total:,} active listings\n'))
+
+        if options['suggest']:
+            self.benchmark_suggest(options['terms'] or DEFAULT_PREFIXES, options)
+            return
+
+        if options['geo']:
+            self.benchmark_geo(options)
+            return
+
+        for terms in options['terms'] or DEFAULT_TERMS:
+            self.stdout.write(self.style.SUCCESS(f'🔎 "{terms}"'))
+            for label, queryset in (
+                ('ilike', self.ilike_queryset(terms)),
+                ('fts', self.fts_queryset(terms)),
+            ):
+                page = queryset[:options['page_size']]
+                timings = self.time_query(page, options['runs'])
+                self.stdout.write(
+                    f'  {label:<6} p50={statistics.median(timings):8.2f} ms  '
+                    f'p95={self.percentile(timings, 95):8.2f} ms  rows={len(list(page))}'
+                )
+                if options['explain']:
+                    self.stdout.write(page.explain(analyze=True))
+            self.stdout.write('')
+
+    def benchmark_suggest(self, prefixes, options):
+        for prefix in prefixes:
+            timings = []
+            for _ in range(options['runs']):
+                start = time.perf_counter()
+                suggest_titles(prefix, 8)
+                suggest_locations(prefix, 8)
+                suggest_categories(prefix, 8)
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(
+                f'  {prefix!r:<8} p50={statistics.median(timings):8.2f} ms  '
+                f'p95={self.percentile(timings, 95):8.2f} ms'
+            )
+
+    def benchmark_geo(self, options):
+        active = Listing.objects.filter(listing_status='active')
+        page_size = options['page_size']
+
+        for label, lat, lng, radius_km in GEO_SEARCHES:
+            self.stdout.write(self.style.SUCCESS(f'📍 {label}'))
+            scan = active.annotate(distance_km=haversine_expression(lat, lng)).filter(distance_km__lte=radius_km)
+            indexed = within_radius(active, lat, lng, radius_km)
+            self.report_geo(
+                options,
+                ('scan', scan.order_by('distance_km', 'listing_id')[:page_size], scan),
+                ('geohash', indexed.order_by('distance_km', 'listing_id')[:page_size], indexed),
+            )
+
+        for label, min_lat, min_lng, max_lat, max_lng, zoom in GEO_BOXES:
+            self.stdout.write(self.style.SUCCESS(f'🗺️  {label}'))
+            scan = active.filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng))
+            indexed = within_bbox(active, min_lat, min_lng, max_lat, max_lng)
+            self.report_geo(
+                options,
+                ('scan', scan.order_by('-createdat')[:page_size], scan),
+                ('geohash', indexed.order_by('-createdat')[:page_size], indexed),
+            )
+            self.benchmark_clusters(active, (min_lat, min_lng, max_lat, max_lng), zoom, options)
+
+    def benchmark_clusters(self, active, bbox, zoom, options):
+        precision = zoom_precision(zoom)
+        tiles = cells_at(*bbox, tile_precision(precision))
+        timings = []
+        for _ in range(options['runs']):
+            start = time.perf_counter()
+            clusters = aggregate_tiles(active, tiles, precision)
+            timings.append((time.perf_counter() - start) * 1000)
+        self.stdout.write(
+            f'  clusters p50={statistics.median(timings):8.2f} ms  '
+            f'p95={self.percentile(timings, 95):8.2f} ms  zoom={zoom} tiles={len(tiles)} '
+            f'clusters={sum(len(tile) for tile in clusters.values()):,}\n'
+        )
+
+    def report_geo(self, options, *variants):
+        for label, page, matches in variants:
+            timings = self.time_query(page, options['runs'])
+            self.stdout.write(
+                f'  {label:<8} p50={statistics.median(timings):8.2f} ms  '
+                f'p95={self.percentile(timings, 95):8.2f} ms  matches={matches.count():,}'
+            )
+            if options['explain']:
+                self.stdout.write(page.explain(analyze=True))
+        self.stdout.write('')
+
+    def ilike_queryset(self, terms):
+        queryset = Listing.objects.filter(listing_status='active')
+        for term in terms.split():
+            queryset = queryset.filter(
+                Q(listing_title__icontains=term)
+                | Q(list_description__icontains=term)
+                | Q(list_location__icontains=term)
+            )
+        return queryset.order_by('-createdat')
+
+    def fts_queryset(self, terms):
+        queryset = Listing.objects.filter(listing_status='active')
+        return search_listings(queryset, terms).order_by('-search_rank', '-createdat')
+
+    def time_query(self, queryset, runs):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def percentile(self, values, pct):
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+        return ordered[index]
@@ -0,0 +1,61 @@
+"""
+Django management command to expire listings and subscriptions.
+
+Usage:
+    python manage.py expire_listings                    # one sweep (cron)
+    python manage.py expire_listings --chunk-size 1000
+    python manage.py expire_listings --interval 300     # keep sweeping
+
+Moves active listings past expiration_date and active subscriptions past
+expires_at to 'expired' and notifies their owners. Schedule it every few
+minutes so expired listings drop out of browse results promptly.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from listings.expiry import DEFAULT_CHUNK_SIZE, expire_listings, expire_subscriptions
+
+
+class Command(BaseCommand):
+    help = 'Expire listings and subscriptions past their expiry date'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Rows expired per UPDATE',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Keep running, sweeping every INTERVAL seconds',
+        )
+
+    def handle(self, *args, **options):
+        if not options['interval']:
+            self.sweep(options['chunk_size'])
+            return
+
+        self.stdout.write(f'⏰ Expiry sweeper started (every {options["interval"]:g}s)')
+        try:
+            while True:
+                try:
+                    self.sweep(options['chunk_size'])
+                except Exception as e:
+                    self.stderr.write(f'Error sweeping expired rows: {e}')
+                finally:
+                    close_old_connections()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('✅ Expiry sweeper stopped'))
+
+    def sweep(self, chunk_size):
+        listings = expire_listings(chunk_size=chunk_size)
+        subscriptions = expire_subscriptions(chunk_size=chunk_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Expired {listings} listings and {subscriptions} subscriptions'
+        ))
@@ -0,0 +1,51 @@
+"""
+Django management command to (re)process listing images in this process.
+
+Usage:
+    python manage.py process_listing_images [--stale-minutes 10] [--retry-failed]
+
+Picks up images the background pipeline never finished (worker crash or
+restart while 'processing') and, optionally, images that failed.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from listings.images import process_image_now
+from listings.models import ListingImage
+
+
+class Command(BaseCommand):
+    help = 'Process listing images stuck in the background image pipeline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=10,
+            help='Only pick up images that have been processing for this long',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry images whose processing failed',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        condition = Q(processing_status='processing', uploadedat__lt=cutoff)
+        if options['retry_failed']:
+            condition |= Q(processing_status='failed')
+
+        images = ListingImage.objects.filter(condition).exclude(source_path=None)
+
+        processed = 0
+        for image in images.iterator():
+            process_image_now(image)
+            processed += 1
+            self.stdout.write(f'  ✓ Image {image.pk} (listing {image.listing_id_id})')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Processed {processed} images'))
@@ -0,0 +1,37 @@
+"""
+Django management command to backfill the seller rating aggregates.
+
+Usage:
+    python manage.py rebuild_rating_aggregates [--user 42]
+
+Recomputes User.rating_count, User.rating_sum and User.rating_avg from the
+visible rows in RATINGS_N_REVIEWS. Run it once after migrating, and again
+if reviews were changed with queryset.update() or raw SQL (which skip the
+signals that keep the aggregates current).
+"""
+
+from django.core.management.base import BaseCommand
+
+from listings.ratings import rebuild_rating_aggregates
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user rating count, sum and average from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='Only rebuild the aggregates of this user id',
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options['user']:
+            users = User.objects.filter(pk=options['user'])
+
+        self.stdout.write('🔄 Rebuilding rating aggregates...')
+        updated = rebuild_rating_aggregates(users=users)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt rating aggregates for {updated} users'))
@@ -0,0 +1,36 @@
+"""
+Django management command to attach listings to the location hierarchy.
+
+Usage:
+    python manage.py resolve_listing_locations [--all]
+
+Matches each listing's typed list_location against LOCATIONS again. New
+listings are resolved when they are saved through the API; run this after
+adding or renaming places in the admin so older listings pick them up.
+"""
+
+from django.core.management.base import BaseCommand
+
+from listings.locations import resolve_listing_locations
+from listings.models import Listing
+
+
+class Command(BaseCommand):
+    help = 'Resolve listing locations onto the province > commune > zone hierarchy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-resolve every listing, not only those without a location',
+        )
+
+    def handle(self, *args, **options):
+        listings = Listing.objects.all()
+        if not options['all']:
+            listings = listings.filter(location__isnull=True)
+
+        self.stdout.write('🔄 Resolving listing locations...')
+        updated = resolve_listing_locations(listings)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Updated the location of {updated} listings'))
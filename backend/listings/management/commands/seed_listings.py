@@ -0,0 +1,147 @@
+"""
+Django management command to seed synthetic listings for benchmarking.
+
+Usage:
+    python manage.py seed_listings [--count 500000] [--batch-size 5000] [--seed 42]
+
+Listings are created with bulk_create under a dedicated benchmark seller so
+they can be removed again with --purge. Never run this against production.
+"""
+
+import math
+import random
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import slugify
+
+from listings.geo import KM_PER_DEGREE_LAT, encode_geohash
+from listings.locations import resolve_location
+from listings.models import Category, Listing
+from users.models import User
+
+
+BENCH_EMAIL = 'bench-seed@umuhuza.local'
+
+# Mixed French / Kirundi / English vocabulary, as our sellers actually write
+ITEMS = [
+    'maison', 'villa', 'appartement', 'terrain', 'parcelle', 'boutique',
+    'voiture', 'camion', 'moto', 'minibus', 'inzu', 'itongo', 'imodoka',
+    'ipikipiki', 'igare', 'house', 'plot', 'car', 'truck', 'apartment',
+]
+QUALIFIERS = [
+    'à vendre', 'à louer', 'neuve', 'occasion', 'meublée', 'avec jardin',
+    'nziza', 'ngurisha', 'ikodeshwa', 'for sale', 'for rent', 'clean',
+    'Toyota', 'RAV4', 'Hilux', 'Corolla', 'Suzuki', '3 chambres', '4 bedrooms',
+]
+# Typed location -> (latitude, longitude, spread in km) of its seeded map positions
+LOCATIONS = {
+    'Bujumbura': (-3.3822, 29.3644, 4),
+    'Bujumbura, Rohero': (-3.3870, 29.3700, 1),
+    'Bujumbura, Kinindo': (-3.4100, 29.3480, 1),
+    'Bujumbura, Kinama': (-3.3300, 29.3800, 1),
+    'Bujumbura, Ngagara': (-3.3500, 29.3700, 1),
+    'Bujumbura, Kanyosha': (-3.4300, 29.3700, 1),
+    'Gitega': (-3.4271, 29.9246, 6),
+    'Ngozi': (-2.9075, 29.8306, 6),
+    'Muyinga': (-2.8451, 30.3414, 6),
+    'Rumonge': (-3.9736, 29.4386, 6),
+    'Makamba': (-4.1348, 29.8040, 6),
+    'Kayanza': (-2.9221, 29.6293, 6),
+    'Bubanza': (-3.0804, 29.3910, 6),
+    'Cibitoke': (-2.8869, 29.1248, 6),
+    'Kirundo': (-2.5845, 30.0959, 6),
+    'Ruyigi': (-3.4764, 30.2486, 6),
+}
+
+
+class Command(BaseCommand):
+    help = 'Seed synthetic active listings for search and browse benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help='Delete previously seeded benchmark listings and exit',
+        )
+
+    def handle(self, *args, **options):
+        seller = self.get_seller()
+
+        if options['purge']:
+            deleted, _ = Listing.objects.filter(userid=seller).delete()
+            self.stdout.write(self.style.WARNING(f'  ✓ Deleted {deleted} seeded rows'))
+            return
+
+        rng = random.Random(options['seed'])
+        categories = list(Category.objects.filter(is_active=True))
+        if not categories:
+            category, _ = Category.objects.get_or_create(
+                slug=slugify('Benchmark'),
+                defaults={'cat_name': 'Benchmark'}
+            )
+            categories = [category]
+
+        count = options['count']
+        batch_size = options['batch_size']
+        created = 0
+
+        self.stdout.write(self.style.HTTP_INFO(f'🌱 Seeding {count:,} listings...'))
+        while created < count:
+            size = min(batch_size, count - created)
+            batch = [self.build_listing(rng, seller, categories) for _ in range(size)]
+            with transaction.atomic():
+                Listing.objects.bulk_create(batch, batch_size=batch_size)
+            created += size
+            self.stdout.write(f'  ✓ {created:,}/{count:,}')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Seeded {created:,} listings'))
+
+    def get_seller(self):
+        seller = User.objects.filter(email=BENCH_EMAIL).first()
+        if seller is None:
+            seller = User.objects.create_user(
+                email=BENCH_EMAIL,
+                phone_number='+25700000000',
+                user_firstname='Bench',
+                user_lastname='Seed',
+                is_seller=True,
+            )
+        return seller
+
+    def build_listing(self, rng, seller, categories):
+        item = rng.choice(ITEMS)
+        title = f'{item.capitalize()} {rng.choice(QUALIFIERS)} {rng.choice(QUALIFIERS)}'
+        location = rng.choice(list(LOCATIONS))
+        latitude, longitude = self.scatter(rng, *LOCATIONS[location])
+        description = ' '.join(
+            rng.choice(ITEMS + QUALIFIERS) for _ in range(rng.randint(20, 60))
+        )
+        location_id, location_path = resolve_location(location)
+        return Listing(
+            userid=seller,
+            cat_id=rng.choice(categories),
+            listing_title=title,
+            list_description=f'{description}. Situé à {location}.',
+            listing_price=Decimal(rng.randrange(50000, 500000000, 1000)),
+            list_location=location,
+            location_id=location_id,
+            location_path=location_path,
+            latitude=latitude,
+            longitude=longitude,
+            # bulk_create() skips Listing.save(), which derives it otherwise
+            geohash=encode_geohash(latitude, longitude),
+            listing_status='active',
+            views=rng.randint(0, 5000),
+            is_featured=rng.random() < 0.02,
+        )
+
+    def scatter(self, rng, latitude, longitude, spread_km):
+        """A random point around a town, normally distributed"""
+        dlat = rng.gauss(0, spread_km) / KM_PER_DEGREE_LAT
+        dlng = rng.gauss(0, spread_km) / (KM_PER_DEGREE_LAT * math.cos(math.radians(latitude)))
+        return round(latitude + dlat, 6), round(longitude + dlng, 6)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations, models
+
+
+# French stemming for most listings, plus an unstemmed variant so Kirundi
+# words and place names still match exactly. Both fold accents.
+CREATE_SEARCH_CONFIGS = """
+CREATE TEXT SEARCH CONFIGURATION umuhuza (COPY = french);
+ALTER TEXT SEARCH CONFIGURATION umuhuza
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+CREATE TEXT SEARCH CONFIGURATION umuhuza_simple (COPY = simple);
+ALTER TEXT SEARCH CONFIGURATION umuhuza_simple
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+"""
+
+DROP_SEARCH_CONFIGS = """
+DROP TEXT SEARCH CONFIGURATION IF EXISTS umuhuza;
+DROP TEXT SEARCH CONFIGURATION IF EXISTS umuhuza_simple;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0006_alter_listing_listing_price_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunSQL(CREATE_SEARCH_CONFIGS, DROP_SEARCH_CONFIGS),
+        migrations.AddField(
+            model_name='listing',
+            name='search_vector',
+            field=models.GeneratedField(db_column='SEARCH_VECTOR', db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('listing_title', config='umuhuza', weight='A'), '||', django.contrib.postgres.search.SearchVector('list_description', config='umuhuza', weight='B'), django.contrib.postgres.search.SearchConfig('umuhuza')), '||', django.contrib.postgres.search.SearchVector('list_location', config='umuhuza', weight='C'), django.contrib.postgres.search.SearchConfig('umuhuza')), '||', django.contrib.postgres.search.SearchVector('listing_title', config='umuhuza_simple', weight='A'), django.contrib.postgres.search.SearchConfig('umuhuza')), '||', django.contrib.postgres.search.SearchVector('list_description', config='umuhuza_simple', weight='B'), django.contrib.postgres.search.SearchConfig('umuhuza')), '||', django.contrib.postgres.search.SearchVector('list_location', config='umuhuza_simple', weight='C'), django.contrib.postgres.search.SearchConfig('umuhuza')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='listings_search_vector_gin'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0007_listing_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='LISTINGS_LISTING_a164ef_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='LISTINGS_CREATED_5f490a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['listing_price', 'listing_id'], name='LISTINGS_LISTING_abc138_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['createdat', 'listing_id'], name='LISTINGS_CREATED_263a88_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['views', 'listing_id'], name='LISTINGS_VIEWS_3aea93_idx'),
+        ),
+    ]
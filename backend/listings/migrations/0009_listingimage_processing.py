@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0008_listing_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingimage',
+            name='processing_error',
+            field=models.TextField(blank=True, db_column='PROCESSING_ERROR', null=True),
+        ),
+        migrations.AddField(
+            model_name='listingimage',
+            name='processing_status',
+            field=models.CharField(choices=[('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_column='PROCESSING_STATUS', default='ready', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='listingimage',
+            name='source_path',
+            field=models.CharField(blank=True, db_column='SOURCE_PATH', max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='listingimage',
+            index=models.Index(condition=models.Q(('processing_status', 'ready'), _negated=True), fields=['uploadedat'], name='listing_images_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0009_listingimage_processing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingimage',
+            name='variants',
+            field=models.JSONField(blank=True, db_column='VARIANTS', default=dict),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
+
+
+def backfill_image_summary(apps, schema_editor):
+    """Fill primary_image_url/image_count for existing listings in one UPDATE"""
+    Listing = apps.get_model('listings', 'Listing')
+    ListingImage = apps.get_model('listings', 'ListingImage')
+
+    images = ListingImage.objects.filter(listing_id=OuterRef('pk'))
+    primary = images.order_by('-is_primary', 'display_order', 'listimage_id').annotate(
+        card_url=Coalesce(KT('variants__thumb__jpeg'), 'image_url', output_field=models.CharField())
+    )
+    count = images.order_by().values('listing_id').annotate(total=Count('*')).values('total')
+    Listing.objects.update(
+        primary_image_url=Subquery(primary.values('card_url')[:1]),
+        image_count=Coalesce(Subquery(count), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0010_listingimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='image_count',
+            field=models.IntegerField(db_column='IMAGE_COUNT', default=0),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='primary_image_url',
+            field=models.CharField(blank=True, db_column='PRIMARY_IMAGE_URL', max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_image_summary, migrations.RunPython.noop),
+    ]
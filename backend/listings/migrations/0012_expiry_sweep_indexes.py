@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0011_listing_image_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('listing_status', 'active')), fields=['expiration_date'], name='listings_active_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubscription',
+            index=models.Index(condition=models.Q(('subscription_status', 'active')), fields=['expires_at'], name='user_subscr_active_expiry_idx'),
+        ),
+    ]
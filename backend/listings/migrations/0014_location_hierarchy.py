@@ -0,0 +1,177 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:16
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+# Provinces, and the communes and zones of Bujumbura where most listings
+# are. More places are added in the admin; run resolve_listing_locations
+# afterwards to attach existing listings to them.
+BURUNDI_LOCATIONS = {
+    'Bubanza': {},
+    'Bujumbura': {
+        'Muha': ['Kanyosha', 'Kinindo', 'Musaga'],
+        'Mukaza': ['Bwiza', 'Buyenzi', 'Nyakabiga', 'Rohero'],
+        'Ntahangwa': ['Buterere', 'Cibitoke', 'Gihosha', 'Kamenge', 'Kinama', 'Ngagara'],
+    },
+    'Bujumbura Rural': {},
+    'Bururi': {},
+    'Cankuzo': {},
+    'Cibitoke': {},
+    'Gitega': {},
+    'Karuzi': {},
+    'Kayanza': {},
+    'Kirundo': {},
+    'Makamba': {},
+    'Muramvya': {},
+    'Muyinga': {},
+    'Mwaro': {},
+    'Ngozi': {},
+    'Rumonge': {},
+    'Rutana': {},
+    'Ruyigi': {},
+}
+
+
+# Frozen copy of the matching in listings/locations.py as of this migration,
+# so later changes there cannot alter what the backfill does
+
+PART_SEPARATORS = re.compile(r'[,;/|()\-]+')
+
+LEVEL_DEPTH = {'province': 1, 'commune': 2, 'zone': 3}
+
+
+def normalize_place(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', text.lower()).split())
+
+
+def build_index(locations):
+    index = {}
+    for location_id, name, path, level in locations:
+        index.setdefault(normalize_place(name), []).append(
+            {'location_id': location_id, 'path': path, 'depth': LEVEL_DEPTH.get(level, 0)}
+        )
+    return index
+
+
+def match_location(index, text):
+    whole = normalize_place(text)
+    if whole in index:
+        matches = [index[whole]]
+    else:
+        parts = [normalize_place(part) for part in PART_SEPARATORS.split(text or '')]
+        parts = [part for part in parts if part]
+        matches = [index[part] for part in parts if part in index]
+        if not matches:
+            matches = [index[word] for part in parts for word in part.split() if word in index]
+        if not matches:
+            return None
+
+    def score(candidate):
+        support = sum(
+            1 for others in matches
+            if any(candidate['path'].startswith(other['path']) for other in others)
+        )
+        return (support, -candidate['depth'], -candidate['location_id'])
+
+    return max((candidate for candidates in matches for candidate in candidates), key=score)
+
+
+def seed_locations(apps, schema_editor):
+    """
+    Create the location hierarchy and attach existing listings to it
+    """
+    Location = apps.get_model('listings', 'Location')
+    Listing = apps.get_model('listings', 'Listing')
+
+    def add(name, level, parent=None):
+        slug = slugify(name)
+        path = f'{parent.path if parent else "/"}{slug}/'
+        location, _ = Location.objects.get_or_create(
+            path=path,
+            defaults={'name': name, 'slug': slug, 'level': level, 'parent': parent}
+        )
+        return location
+
+    for province_name, communes in BURUNDI_LOCATIONS.items():
+        province = add(province_name, 'province')
+        for commune_name, zones in communes.items():
+            commune = add(commune_name, 'commune', province)
+            for zone_name in zones:
+                add(zone_name, 'zone', commune)
+
+    index = build_index(Location.objects.values_list('location_id', 'name', 'path', 'level'))
+    typed = Listing.objects.order_by().values_list('list_location', flat=True).distinct()
+    for text in typed.iterator():
+        match = match_location(index, text)
+        if match:
+            Listing.objects.filter(list_location=text).update(
+                location_id=match['location_id'],
+                location_path=match['path']
+            )
+
+
+def unseed_locations(apps, schema_editor):
+    Listing = apps.get_model('listings', 'Listing')
+    Location = apps.get_model('listings', 'Location')
+    Listing.objects.update(location=None, location_path='')
+    for level in ('zone', 'commune', 'province'):
+        Location.objects.filter(level=level).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0013_trigram_suggest_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='location_path',
+            field=models.CharField(blank=True, db_column='LOCATION_PATH', default='', max_length=255),
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('location_id', models.AutoField(db_column='LOCATION_ID', primary_key=True, serialize=False)),
+                ('name', models.CharField(db_column='NAME', max_length=100)),
+                ('slug', models.SlugField(db_column='SLUG', max_length=100)),
+                ('level', models.CharField(choices=[('province', 'Province'), ('commune', 'Commune'), ('zone', 'Zone')], db_column='LEVEL', max_length=10)),
+                ('path', models.CharField(db_column='PATH', editable=False, max_length=255, unique=True)),
+                ('is_active', models.BooleanField(db_column='IS_ACTIVE', default=True)),
+                ('createdat', models.DateTimeField(auto_now_add=True, db_column='CREATEDAT')),
+                ('parent', models.ForeignKey(blank=True, db_column='PARENT_ID', null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='children', to='listings.location')),
+            ],
+            options={
+                'db_table': 'LOCATIONS',
+                'ordering': ['path'],
+            },
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='location',
+            field=models.ForeignKey(blank=True, db_column='LOCATION_ID', null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='listings', to='listings.location'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('listing_status', 'active')), fields=['location_path'], name='listings_active_location_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['path'], name='locations_path_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddConstraint(
+            model_name='location',
+            constraint=models.UniqueConstraint(fields=('parent', 'slug'), name='locations_parent_slug_uniq'),
+        ),
+        migrations.RunPython(seed_locations, unseed_locations),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0015_listing_coordinates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='listings_active_geohash_idx',
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('listing_status', 'active')), fields=['geohash'], include=('latitude', 'longitude', 'listing_price', 'listing_id'), name='listings_active_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
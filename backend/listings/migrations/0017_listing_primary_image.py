@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_primary_image(apps, schema_editor):
+    """Point every listing at its card image (primary, else first) in one UPDATE"""
+    Listing = apps.get_model('listings', 'Listing')
+    ListingImage = apps.get_model('listings', 'ListingImage')
+
+    primary = ListingImage.objects.filter(listing_id=OuterRef('pk')).order_by(
+        '-is_primary', 'display_order', 'listimage_id'
+    )
+    Listing.objects.filter(image_count__gt=0).update(
+        primary_image=Subquery(primary.values('listimage_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0016_cluster_covering_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, db_column='PRIMARY_IMAGE_ID', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='listings.listingimage'),
+        ),
+        migrations.RunPython(backfill_primary_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:39
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0017_listing_primary_image'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='listings_location_trgm',
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('listing_title'), name='text_pattern_ops'), name='listings_title_prefix_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-17 13:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0018_suggest_prefix_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='category',
+            name='categories_name_trgm',
+        ),
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='listings_title_trgm',
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('cat_name'), name='gin_trgm_ops'), name='categories_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('listing_title'), name='gin_trgm_ops'), name='listings_title_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('list_location'), name='gin_trgm_ops'), name='listings_location_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('list_location'), name='text_pattern_ops'), name='listings_location_prefix_idx'),
+        ),
+    ]
@@ -1,10 +1,31 @@
-from django.db import models
+from django.db import connection, models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db.models.functions import Concat, Substr, Upper
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import uuid
 
 from users.models import User
+from .geo import encode_geohash
+
+# Text search configurations created in migration 0007: 'umuhuza' stems French
+# after stripping accents, 'umuhuza_simple' only lowercases and strips accents
+# so Kirundi words and place names are matched as written.
+SEARCH_CONFIG = 'umuhuza'
+SEARCH_CONFIG_SIMPLE = 'umuhuza_simple'
+
+
+def listing_search_vector():
+    """Weighted document: title (A) above description (B) above location (C)"""
+    vector = None
+    for config in (SEARCH_CONFIG, SEARCH_CONFIG_SIMPLE):
+        for field, weight in (('listing_title', 'A'), ('list_description', 'B'), ('list_location', 'C')):
+            part = SearchVector(field, weight=weight, config=config)
+            vector = part if vector is None else vector + part
+    return vector
+
 
 # ============================================================================
 # CATEGORIES
@@ -22,6 +43,11 @@ class Category(models.Model):
     class Meta:
         db_table = 'CATEGORIES'
         verbose_name_plural = 'Categories'
+        indexes = [
+            # Substring matching for /api/listings/suggest/, on the UPPER() that
+            # ICONTAINS compiles to
+            GinIndex(OpClass(Upper('cat_name'), name='gin_trgm_ops'), name='categories_name_trgm'),
+        ]
     
     def __str__(self):
         return self.cat_name
@@ -100,6 +126,12 @@ class UserSubscription(models.Model):
             models.Index(fields=['userid']),
             models.Index(fields=['subscription_status']),
             models.Index(fields=['expires_at']),
+            # Expiry sweep (listings/expiry.py) only scans active rows
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(subscription_status='active'),
+                name='user_subscr_active_expiry_idx'
+            ),
         ]
 
     def __str__(self):
@@ -124,6 +156,113 @@ class UserSubscription(models.Model):
         """Check if user still has listing quota available"""
         return self.remaining_listings > 0
 
+    # Takes one listing slot from the user's active subscription in a single
+    # statement; the WHERE clause makes the quota check and the increment atomic
+    RESERVE_LISTING_SQL = '''
+        UPDATE "USER_SUBSCRIPTIONS" s
+        SET "LISTINGS_USED" = s."LISTINGS_USED" + 1, "UPDATEDAT" = NOW()
+        FROM "PRICING_PLANS" p
+        WHERE s."SUBSCRIPTION_ID" = (
+                SELECT "SUBSCRIPTION_ID" FROM "USER_SUBSCRIPTIONS"
+                WHERE "USERID" = %s AND "SUBSCRIPTION_STATUS" = 'active'
+                ORDER BY "SUBSCRIPTION_ID"
+                LIMIT 1
+            )
+            AND p."PRICING_ID" = s."PRICING_ID"
+            AND s."LISTINGS_USED" < p."MAX_LISTINGS"
+        RETURNING s."SUBSCRIPTION_ID", s."LISTINGS_USED", p."PRICING_NAME",
+                  p."MAX_LISTINGS", p."MAX_IMAGES_PER_LISTING", p."DURATION_DAYS"
+    '''
+
+    @classmethod
+    def reserve_listing(cls, user):
+        """
+        Reserve a listing slot for user. Returns a dict with the updated usage
+        and plan limits, or None when there is no active subscription or its
+        quota is used up. Call inside the transaction that creates the listing
+        so the slot is given back if that fails.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(cls.RESERVE_LISTING_SQL, [user.pk])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+
+        keys = (
+            'subscription_id', 'listings_used', 'pricing_name',
+            'max_listings', 'max_images_per_listing', 'duration_days'
+        )
+        return dict(zip(keys, row))
+
+
+# ============================================================================
+# LOCATIONS
+# ============================================================================
+
+class Location(models.Model):
+    """
+    Canonical place hierarchy: province > commune > zone. `path` holds the
+    slugs from the root ('/bujumbura/mukaza/rohero/') and is copied onto
+    listings, so filtering on a place and everything under it is a single
+    prefix range scan.
+    """
+    LEVELS = [
+        ('province', 'Province'),
+        ('commune', 'Commune'),
+        ('zone', 'Zone'),
+    ]
+
+    location_id = models.AutoField(primary_key=True, db_column='LOCATION_ID')
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        db_column='PARENT_ID',
+        related_name='children'
+    )
+    name = models.CharField(max_length=100, db_column='NAME')
+    slug = models.SlugField(max_length=100, db_column='SLUG')
+    level = models.CharField(max_length=10, choices=LEVELS, db_column='LEVEL')
+    path = models.CharField(max_length=255, unique=True, editable=False, db_column='PATH')
+    is_active = models.BooleanField(default=True, db_column='IS_ACTIVE')
+    createdat = models.DateTimeField(auto_now_add=True, db_column='CREATEDAT')
+
+    class Meta:
+        db_table = 'LOCATIONS'
+        ordering = ['path']
+        constraints = [
+            models.UniqueConstraint(fields=['parent', 'slug'], name='locations_parent_slug_uniq'),
+        ]
+        indexes = [
+            # LIKE 'prefix%' on path regardless of the database collation
+            models.Index(fields=['path'], opclasses=['varchar_pattern_ops'], name='locations_path_prefix_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def build_path(self):
+        return f'{self.parent.path if self.parent else "/"}{self.slug}/'
+
+    def save(self, *args, **kwargs):
+        old_path = self.path
+        self.path = self.build_path()
+        super().save(*args, **kwargs)
+
+        if old_path and old_path != self.path:
+            # Renamed or moved: rewrite the paths of the subtree and its listings
+            new_prefix = models.Value(self.path)
+            rest = Substr('path', len(old_path) + 1)
+            Location.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(new_prefix, rest, output_field=models.CharField())
+            )
+            Listing.objects.filter(location_path__startswith=old_path).update(
+                location_path=Concat(
+                    new_prefix, Substr('location_path', len(old_path) + 1), output_field=models.CharField()
+                )
+            )
+
 
 # ============================================================================
 # LISTINGS
@@ -145,6 +284,21 @@ class Listing(models.Model):
     list_description = models.TextField(db_column='LIST_DESCRIPTION')
     listing_price = models.DecimalField(max_digits=15, decimal_places=2, db_column='LISTING_PRICE')
     list_location = models.CharField(max_length=255, db_column='LIST_LOCATION')
+    # Canonical place resolved from list_location (listings.locations), and a
+    # copy of its path so ancestor filters need no join
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        db_column='LOCATION_ID',
+        related_name='listings'
+    )
+    location_path = models.CharField(max_length=255, blank=True, default='', db_column='LOCATION_PATH')
+    # Map position; geohash is derived from it in save() for ?near=/?bbox= (listings.geo)
+    latitude = models.FloatField(null=True, blank=True, db_column='LATITUDE')
+    longitude = models.FloatField(null=True, blank=True, db_column='LONGITUDE')
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False, db_column='GEOHASH')
     listing_status = models.CharField(
         max_length=10, 
         choices=LISTING_STATUS, 
@@ -153,7 +307,26 @@ class Listing(models.Model):
     )
     views = models.IntegerField(default=0, db_column='VIEWS')
     is_featured = models.BooleanField(default=False, db_column='IS_FEATURED')
+    # Card fields denormalized from LISTING_IMAGES so list endpoints skip the images
+    # prefetch; maintained by listings.images.refresh_image_summary()
+    primary_image = models.ForeignKey(
+        'ListingImage',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        db_column='PRIMARY_IMAGE_ID'
+    )
+    primary_image_url = models.CharField(max_length=255, null=True, blank=True, db_column='PRIMARY_IMAGE_URL')
+    image_count = models.IntegerField(default=0, db_column='IMAGE_COUNT')
     expiration_date = models.DateTimeField(null=True, blank=True, db_column='EXPIRATION_DATE')
+    # Maintained by PostgreSQL on every INSERT/UPDATE, including bulk writes
+    search_vector = models.GeneratedField(
+        expression=listing_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        db_column='SEARCH_VECTOR'
+    )
     createdat = models.DateTimeField(auto_now_add=True, db_column='CREATEDAT')
     updatedat = models.DateTimeField(auto_now=True, db_column='UPDATEDAT')
     
@@ -165,17 +338,67 @@ class Listing(models.Model):
             models.Index(fields=['listing_status']),
             models.Index(fields=['is_featured']),
             models.Index(fields=['list_location']),
-            models.Index(fields=['listing_price']),
-            models.Index(fields=['createdat']),
+            # (sort field, listing_id) pairs back keyset pagination on each ordering
+            models.Index(fields=['listing_price', 'listing_id']),
+            models.Index(fields=['createdat', 'listing_id']),
+            models.Index(fields=['views', 'listing_id']),
+            GinIndex(fields=['search_vector'], name='listings_search_vector_gin'),
+            # Substring (ICONTAINS) matching for /api/listings/suggest/, on the
+            # UPPER() the lookup compiles to
+            GinIndex(OpClass(Upper('listing_title'), name='gin_trgm_ops'), name='listings_title_trgm'),
+            GinIndex(OpClass(Upper('list_location'), name='gin_trgm_ops'), name='listings_location_trgm'),
+            # Prefix (ISTARTSWITH) matches, including queries too short for
+            # trigrams. Not partial, so the planner gets statistics for UPPER()
+            models.Index(
+                OpClass(Upper('listing_title'), name='text_pattern_ops'),
+                name='listings_title_prefix_idx'
+            ),
+            models.Index(
+                OpClass(Upper('list_location'), name='text_pattern_ops'),
+                name='listings_location_prefix_idx'
+            ),
+            # Expiry sweep (listings/expiry.py) only scans active rows
+            models.Index(
+                fields=['expiration_date'],
+                condition=models.Q(listing_status='active'),
+                name='listings_active_expiry_idx'
+            ),
+            # ?location= ancestor filter: one range scan over active listings
+            models.Index(
+                fields=['location_path'],
+                opclasses=['varchar_pattern_ops'],
+                condition=models.Q(listing_status='active'),
+                name='listings_active_location_idx'
+            ),
+            # ?near= / ?bbox= prefilter: prefix range scans over active listings.
+            # The included columns let map clusters aggregate from the index alone
+            models.Index(
+                fields=['geohash'],
+                opclasses=['varchar_pattern_ops'],
+                include=['latitude', 'longitude', 'listing_price', 'listing_id'],
+                condition=models.Q(listing_status='active'),
+                name='listings_active_geohash_idx'
+            ),
         ]
         ordering = ['-createdat']
     
     def __str__(self):
         return self.listing_title
-    
-    def increment_views(self):
-        self.views += 1
-        self.save(update_fields=['views'])
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored geohash, so moving the listing needs no extra query (listings.signals)
+        instance._loaded_geohash = instance.__dict__.get('geohash')
+        return instance
+
+    def save(self, *args, **kwargs):
+        has_position = self.latitude is not None and self.longitude is not None
+        self.geohash = encode_geohash(self.latitude, self.longitude) if has_position else ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'}.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
 
 
 # ============================================================================
@@ -183,6 +406,12 @@ class Listing(models.Model):
 # ============================================================================
 
 class ListingImage(models.Model):
+    PROCESSING_STATUS = [
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
     listimage_id = models.AutoField(primary_key=True, db_column='LISTIMAGE_ID')
     listing_id = models.ForeignKey(
         Listing, 
@@ -193,11 +422,29 @@ class ListingImage(models.Model):
     image_url = models.CharField(max_length=255, db_column='IMAGE_URL')
     is_primary = models.BooleanField(default=False, db_column='IS_PRIMARY')
     display_order = models.IntegerField(default=0, db_column='DISPLAY_ORDER')
+    processing_status = models.CharField(
+        max_length=10,
+        choices=PROCESSING_STATUS,
+        default='ready',
+        db_column='PROCESSING_STATUS'
+    )
+    # {size: {'width', 'height', 'jpeg': url, 'webp': url}} for thumb/card/full
+    variants = models.JSONField(default=dict, blank=True, db_column='VARIANTS')
+    # Raw upload awaiting optimisation; cleared once processed
+    source_path = models.CharField(max_length=255, null=True, blank=True, db_column='SOURCE_PATH')
+    processing_error = models.TextField(null=True, blank=True, db_column='PROCESSING_ERROR')
     uploadedat = models.DateTimeField(auto_now_add=True, db_column='UPLOADEDAT')
     
     class Meta:
         db_table = 'LISTING_IMAGES'
         ordering = ['display_order']
+        indexes = [
+            models.Index(
+                fields=['uploadedat'],
+                condition=~models.Q(processing_status='ready'),
+                name='listing_images_pending_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"Image for {self.listing_id.listing_title}"
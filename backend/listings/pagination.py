@@ -0,0 +1,162 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class ListingKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination for listing browse
+    GET /api/listings/?pagination=cursor&ordering=-listing_price&cursor=...
+
+    Pages are fetched with WHERE (field, listing_id) < (value, id) instead of
+    OFFSET, and no COUNT(*) is run, so deep pages cost the same as the first.
+    The sort field comes from the view's ordering_fields; listing_id breaks
+    ties so every row has a unique position. Cursors are opaque to clients.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    tiebreak_field = 'listing_id'
+    default_ordering = '-createdat'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, view)
+        self.field = self.ordering.lstrip('-')
+        page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor['r'] if cursor else False
+        # Walking backwards from a "previous" cursor flips the scan direction
+        descending = self.ordering.startswith('-') != reverse
+
+        if cursor:
+            queryset = queryset.filter(self.get_seek_filter(queryset.model, cursor, descending))
+
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}{self.tiebreak_field}')
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, request, view):
+        """First valid ?ordering= term, falling back to the view's default"""
+        allowed = getattr(view, 'ordering_fields', None) or []
+        param = request.query_params.get(api_settings.ORDERING_PARAM, '')
+
+        for term in param.split(','):
+            term = term.strip()
+            if term and term.lstrip('-') in allowed:
+                return term
+
+        view_ordering = getattr(view, 'ordering', None)
+        if view_ordering:
+            return view_ordering[0]
+        return self.default_ordering
+
+    def get_seek_filter(self, model, cursor, descending):
+        field = model._meta.get_field(self.field)
+        try:
+            value = field.to_python(cursor['v'])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+        op = 'lt' if descending else 'gt'
+        # The redundant inclusive bound keeps the (field, listing_id) index range scan
+        return Q(**{f'{self.field}__{op}e': value}) & (
+            Q(**{f'{self.field}__{op}': value})
+            | Q(**{self.field: value, f'{self.tiebreak_field}__{op}': cursor['id']})
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.build_link(self.page[0], reverse=True)
+
+    def build_link(self, obj, reverse):
+        value = getattr(obj, self.field)
+        payload = {
+            'o': self.ordering,
+            'v': value if isinstance(value, int) else str(value),
+            'id': getattr(obj, self.tiebreak_field),
+            'r': reverse,
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            cursor = {
+                'o': str(payload['o']),
+                'v': payload['v'],
+                'id': int(payload['id']),
+                'r': bool(payload['r']),
+            }
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        # A cursor is only meaningful for the ordering it was issued under
+        if cursor['o'] != self.ordering:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
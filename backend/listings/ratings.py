@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+from users.models import User
+from .models import RatingReview
+
+
+# ============================================================================
+# SELLER RATING AGGREGATES
+# ============================================================================
+# User.rating_count / rating_sum / rating_avg summarise the visible reviews a
+# user has received. The RatingReview signals (listings/signals.py) apply
+# each change as a delta in the same transaction as the review write.
+
+def _average(count, total, has_reviews):
+    return Case(
+        When(has_reviews, then=Cast(total, DecimalField(max_digits=12, decimal_places=4)) / count),
+        default=Value(0),
+        output_field=DecimalField(max_digits=3, decimal_places=2)
+    )
+
+
+def review_contribution(review):
+    """(count, sum) a review adds to its reviewed user's aggregates"""
+    if review is None or not review.is_visible:
+        return 0, 0
+    return 1, review.rating
+
+
+def apply_rating_delta(user_id, count_delta, sum_delta):
+    """
+    Adjust a user's rating aggregates in one UPDATE. Everything is computed
+    from the row's current values, so concurrent reviews don't lose updates.
+    """
+    if not user_id or (not count_delta and not sum_delta):
+        return
+
+    new_count = F('rating_count') + count_delta
+    new_sum = F('rating_sum') + sum_delta
+    User.objects.filter(pk=user_id).update(
+        rating_count=new_count,
+        rating_sum=new_sum,
+        rating_avg=_average(new_count, new_sum, Q(rating_count__gt=-count_delta))
+    )
+
+
+def rebuild_rating_aggregates(users=None):
+    """
+    Recompute the aggregates from RATINGS_N_REVIEWS for `users` (a User
+    queryset, default all users). Returns the number of users updated.
+    """
+    if users is None:
+        users = User.objects.all()
+
+    visible = RatingReview.objects.filter(
+        reviewed_userid=OuterRef('pk'),
+        is_visible=True
+    ).order_by().values('reviewed_userid')
+
+    with transaction.atomic():
+        updated = users.update(
+            rating_count=Coalesce(
+                Subquery(visible.annotate(total=Count('*')).values('total')),
+                Value(0),
+                output_field=IntegerField()
+            ),
+            rating_sum=Coalesce(
+                Subquery(visible.annotate(total=Sum('rating')).values('total')),
+                Value(0),
+                output_field=IntegerField()
+            )
+        )
+        users.update(rating_avg=_average(
+            F('rating_count'), F('rating_sum'), Q(rating_count__gt=0)
+        ))
+    return updated
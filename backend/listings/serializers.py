@@ -3,8 +3,9 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
 from users.serializers import UserPublicSerializer
+from .locations import resolve_location
 from .models import (
-    User, Category, Listing, ListingImage,
+    User, Category, Location, Listing, ListingImage,
     PricingPlan, RatingReview, Favorite, ReportMisconduct, UserSubscription
 )
 
@@ -19,34 +20,99 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['cat_id', 'cat_name', 'slug', 'cat_description']
 
 
+# ============================================================================
+# LOCATION SERIALIZERS
+# ============================================================================
+
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Location
+        fields = ['location_id', 'name', 'slug', 'level', 'path', 'parent']
+
+
 # ============================================================================
 # LISTING SERIALIZERS
 # ============================================================================
 
 class ListingImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = ListingImage
-        fields = ['listimage_id', 'image_url', 'is_primary', 'display_order']
+        fields = [
+            'listimage_id', 'image_url', 'is_primary', 'display_order',
+            'processing_status', 'variants', 'srcset'
+        ]
 
-    def get_image_url(self, obj):
+    def build_url(self, url):
         """Return absolute URL for images"""
         request = self.context.get('request')
-        if obj.image_url:
+        if url:
             # If the URL is already absolute, return it as is
-            if obj.image_url.startswith('http://') or obj.image_url.startswith('https://'):
-                return obj.image_url
+            if url.startswith('http://') or url.startswith('https://'):
+                return url
             # Otherwise, build absolute URI
             if request:
-                return request.build_absolute_uri(obj.image_url)
+                return request.build_absolute_uri(url)
             # Fallback: return the relative URL if no request context
-            return obj.image_url
+            return url
         return None
 
+    def get_image_url(self, obj):
+        return self.build_url(obj.image_url)
+
+    def get_variants(self, obj):
+        """Per-size JPEG/WebP URLs (empty until the image is processed)"""
+        return {
+            size: {
+                'width': entry['width'],
+                'height': entry['height'],
+                'jpeg': self.build_url(entry['jpeg']),
+                'webp': self.build_url(entry['webp']),
+            }
+            for size, entry in (obj.variants or {}).items()
+        }
+
+    def get_srcset(self, obj):
+        """Ready-made srcset strings per format, e.g. {'webp': 'a.webp 320w, ...'}"""
+        if not obj.variants:
+            return None
+        # Images narrower than a size keep their width there (never upscaled);
+        # list each width once
+        by_width = {}
+        for entry in sorted(obj.variants.values(), key=lambda entry: entry['width']):
+            by_width.setdefault(entry['width'], entry)
+        return {
+            image_format: ', '.join(
+                f"{self.build_url(entry[image_format])} {entry['width']}w"
+                for entry in by_width.values()
+            )
+            for image_format in ('webp', 'jpeg')
+        }
+
+
+class ListingImageThumbnailSerializer(ListingImageSerializer):
+    """Thumbnail-only image for listing cards in list endpoints"""
+    webp_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ListingImage
+        fields = ['listimage_id', 'image_url', 'webp_url', 'is_primary', 'display_order']
+
+    def get_image_url(self, obj):
+        thumb = (obj.variants or {}).get('thumb')
+        # Images processed before derivatives existed only have image_url
+        return self.build_url(thumb['jpeg'] if thumb else obj.image_url)
+
+    def get_webp_url(self, obj):
+        thumb = (obj.variants or {}).get('thumb')
+        return self.build_url(thumb['webp']) if thumb else None
+
 
 class ListingSerializer(serializers.ModelSerializer):
-    images = ListingImageSerializer(many=True, read_only=True)
+    images = ListingImageThumbnailSerializer(many=True, read_only=True)
     category = CategorySerializer(source='cat_id', read_only=True)
     seller = UserPublicSerializer(source='userid', read_only=True)
     
@@ -54,13 +120,54 @@ class ListingSerializer(serializers.ModelSerializer):
         model = Listing
         fields = [
             'listing_id', 'listing_title', 'list_description', 
-            'listing_price', 'list_location', 'listing_status',
+            'listing_price', 'list_location', 'latitude', 'longitude', 'listing_status',
             'views', 'is_featured', 'expiration_date', 
             'createdat', 'updatedat', 'images', 'category', 'seller'
         ]
         read_only_fields = ['listing_id', 'views', 'createdat', 'updatedat']
 
 
+class ListingCardSerializer(serializers.ModelSerializer):
+    """
+    Listing card for list endpoints. Reads the denormalized
+    primary_image/primary_image_url/image_count columns, so no images prefetch
+    is needed: `images` holds just the card image (select_related('primary_image')).
+    """
+    primary_image_url = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
+    category = CategorySerializer(source='cat_id', read_only=True)
+    seller = UserPublicSerializer(source='userid', read_only=True)
+
+    class Meta:
+        model = Listing
+        fields = [
+            'listing_id', 'listing_title', 'list_description',
+            'listing_price', 'list_location', 'latitude', 'longitude', 'distance_km',
+            'listing_status', 'views', 'is_featured', 'expiration_date',
+            'createdat', 'updatedat', 'primary_image_url', 'image_count',
+            'images', 'category', 'seller'
+        ]
+        read_only_fields = fields
+
+    def get_primary_image_url(self, obj):
+        url = obj.primary_image_url
+        request = self.context.get('request')
+        if url and request and not url.startswith(('http://', 'https://')):
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_distance_km(self, obj):
+        # Only annotated on ?near= searches
+        distance = getattr(obj, 'distance_km', None)
+        return round(distance, 2) if distance is not None else None
+
+    def get_images(self, obj):
+        if obj.primary_image is None:
+            return []
+        return [ListingImageThumbnailSerializer(obj.primary_image, context=self.context).data]
+
+
 class ListingCreateSerializer(serializers.ModelSerializer):
     images = serializers.ListField(
         child=serializers.ImageField(),
@@ -72,27 +179,33 @@ class ListingCreateSerializer(serializers.ModelSerializer):
         model = Listing
         fields = [
             'cat_id', 'listing_title', 'list_description',
-            'listing_price', 'list_location', 'images'
+            'listing_price', 'list_location', 'latitude', 'longitude', 'images'
         ]
+        extra_kwargs = {
+            'latitude': {'min_value': -90, 'max_value': 90},
+            'longitude': {'min_value': -180, 'max_value': 180},
+        }
     
+    def validate(self, attrs):
+        # Normalise the typed place onto the location hierarchy
+        if 'list_location' in attrs:
+            attrs['location_id'], attrs['location_path'] = resolve_location(attrs['list_location'])
+
+        # A map position is set (or cleared) as a pair
+        if ('latitude' in attrs) != ('longitude' in attrs) or (
+                (attrs.get('latitude') is None) != (attrs.get('longitude') is None)):
+            raise serializers.ValidationError('latitude and longitude must be given together')
+        return attrs
+
     def create(self, validated_data):
-        images_data = validated_data.pop('images', [])
-        listing = Listing.objects.create(**validated_data)
-        
-        # Handle image uploads here (you'll need to implement file upload logic)
-        for idx, image in enumerate(images_data):
-            ListingImage.objects.create(
-                listing_id=listing,
-                image_url=f"uploads/listings/{listing.listing_id}/{image.name}",
-                is_primary=(idx == 0),
-                display_order=idx
-            )
-        
-        return listing
+        # Uploads are stored by the view (listings/images.py), not here
+        validated_data.pop('images', None)
+        return Listing.objects.create(**validated_data)
 
 
 class ListingDetailSerializer(serializers.ModelSerializer):
     images = ListingImageSerializer(many=True, read_only=True)
+    location = LocationSerializer(read_only=True)
     category = CategorySerializer(source='cat_id', read_only=True)
     seller = UserPublicSerializer(source='userid', read_only=True)
     is_favorited = serializers.SerializerMethodField()
@@ -101,7 +214,7 @@ class ListingDetailSerializer(serializers.ModelSerializer):
         model = Listing
         fields = [
             'listing_id', 'listing_title', 'list_description', 
-            'listing_price', 'list_location', 'listing_status',
+            'listing_price', 'list_location', 'location', 'latitude', 'longitude', 'listing_status',
             'views', 'is_featured', 'expiration_date', 
             'createdat', 'updatedat', 'images', 'category', 
             'seller', 'is_favorited'
@@ -181,7 +294,7 @@ class RatingReviewCreateSerializer(serializers.ModelSerializer):
 # ============================================================================
 
 class FavoriteSerializer(serializers.ModelSerializer):
-    listing = ListingSerializer(source='listing_id', read_only=True)
+    listing = ListingCardSerializer(source='listing_id', read_only=True)
     
     class Meta:
         model = Favorite
@@ -1,6 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .models import Listing
+
+from users.models import User
+from users.serializers import UserPublicSerializer
+from . import cache_tags
+from .models import Category, Listing, ListingImage, Location, PricingPlan, RatingReview
+from .ratings import apply_rating_delta, review_contribution
 
 
 @receiver(post_save, sender=Listing)
@@ -16,3 +21,115 @@ def set_user_as_seller(sender, instance, created, **kwargs):
             if user.user_role == 'buyer':
                 user.user_role = 'seller'
             user.save(update_fields=['is_seller', 'user_role'])
+
+
+# ============================================================================
+# SELLER RATING AGGREGATES
+# ============================================================================
+
+@receiver(pre_save, sender=RatingReview)
+def remember_review_state(sender, instance, **kwargs):
+    """Keep the stored version of an edited review to compute the delta"""
+    instance._stored_review = None
+    if instance.pk:
+        instance._stored_review = RatingReview.objects.filter(pk=instance.pk).only(
+            'reviewed_userid', 'rating', 'is_visible'
+        ).first()
+
+
+@receiver(post_save, sender=RatingReview)
+def update_rating_aggregates(sender, instance, **kwargs):
+    """
+    Apply a created/edited review (rating or visibility change) to the
+    reviewed user's rating_count/rating_sum/rating_avg
+    """
+    old = getattr(instance, '_stored_review', None)
+    old_count, old_sum = review_contribution(old)
+    new_count, new_sum = review_contribution(instance)
+
+    if old is not None and old.reviewed_userid_id != instance.reviewed_userid_id:
+        apply_rating_delta(old.reviewed_userid_id, -old_count, -old_sum)
+        cache_tags.invalidate(cache_tags.seller_tag(old.reviewed_userid_id))
+        old_count = old_sum = 0
+    apply_rating_delta(instance.reviewed_userid_id, new_count - old_count, new_sum - old_sum)
+    cache_tags.invalidate(cache_tags.seller_tag(instance.reviewed_userid_id))
+
+
+@receiver(post_delete, sender=RatingReview)
+def remove_from_rating_aggregates(sender, instance, **kwargs):
+    count, total = review_contribution(instance)
+    apply_rating_delta(instance.reviewed_userid_id, -count, -total)
+    cache_tags.invalidate(cache_tags.seller_tag(instance.reviewed_userid_id))
+
+
+# ============================================================================
+# RESPONSE CACHE INVALIDATION
+# ============================================================================
+# Each change evicts the cache tags (listings/cache_tags.py) of the cached
+# reads that show it, once the transaction commits. Changes made with
+# queryset.update() invalidate explicitly (refresh_image_summary, expiry sweep).
+
+# User fields shown on seller cards
+SELLER_CARD_FIELDS = frozenset(UserPublicSerializer.Meta.fields) - {'full_name'}
+
+
+@receiver(pre_save, sender=Listing)
+def remember_listing_geohash(sender, instance, update_fields=None, **kwargs):
+    """A moved listing leaves the map tiles of its previous position"""
+    instance._stored_geohash = ''
+    if not instance.pk or (update_fields is not None and 'geohash' not in update_fields):
+        # New listing, or a save that leaves the position alone (Listing.save
+        # adds geohash to update_fields along with latitude/longitude)
+        return
+    stored = getattr(instance, '_loaded_geohash', None)
+    if stored is None:
+        # Not loaded from the database, or geohash was deferred
+        stored = Listing.objects.filter(pk=instance.pk).values_list('geohash', flat=True).first()
+    instance._stored_geohash = stored or ''
+
+
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+def invalidate_listing_cache(sender, instance, **kwargs):
+    """Price, title, status or photo changes; new listings join their category"""
+    cache_tags.invalidate(
+        *cache_tags.listing_tags(instance.pk, instance.cat_id_id, instance.is_featured, instance.geohash),
+        *cache_tags.geo_tile_tags(getattr(instance, '_stored_geohash', ''))
+    )
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or 'geohash' in update_fields:
+        instance._loaded_geohash = instance.geohash
+
+
+@receiver(post_save, sender=ListingImage)
+@receiver(post_delete, sender=ListingImage)
+def invalidate_listing_image_cache(sender, instance, **kwargs):
+    cache_tags.invalidate(cache_tags.listing_tag(instance.listing_id_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    cache_tags.invalidate(cache_tags.CATEGORY_LIST, cache_tags.category_tag(instance.pk))
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_cache(sender, instance, **kwargs):
+    """Renames rewrite listing paths, so ?location= browse pages change too"""
+    cache_tags.invalidate(cache_tags.LOCATION_LIST, cache_tags.LOCATION_INDEX, cache_tags.LISTING_BROWSE)
+
+
+@receiver(post_save, sender=PricingPlan)
+@receiver(post_delete, sender=PricingPlan)
+def invalidate_pricing_cache(sender, instance, **kwargs):
+    cache_tags.invalidate(cache_tags.PRICING_PLANS)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_seller_cache(sender, instance, update_fields=None, **kwargs):
+    """Seller cards embed the public profile; last_login and similar saves don't matter"""
+    if update_fields is not None and not SELLER_CARD_FIELDS.intersection(update_fields):
+        return
+    cache_tags.invalidate(cache_tags.seller_tag(instance.pk))
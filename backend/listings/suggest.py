@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from umuhuza_api.cache import LocalLRU
+from .models import Category, Listing
+
+
+# ============================================================================
+# SEARCH-AS-YOU-TYPE SUGGESTIONS
+# ============================================================================
+# Titles starting with the query come first, most viewed first, from a range
+# scan of listings_title_prefix_idx; matches further in the title fill the
+# remaining slots through the pg_trgm index listings_title_trgm. Locations
+# follow the same split over listings_location_prefix_idx and
+# listings_location_trgm, ranked by how many active listings use them.
+# All of these indexes are on UPPER(column), which is what ISTARTSWITH and
+# ICONTAINS compile to on PostgreSQL.
+
+MIN_QUERY_LENGTH = 2
+
+# Trigram indexes cannot serve shorter fragments; below this only prefix
+# matches are suggested
+TRIGRAM_MIN_LENGTH = 3
+
+# Completions per normalized query, shared by all requests of this process.
+# Short prefixes are both the most requested and the most expensive, so
+# the LRU naturally keeps the popular ones.
+prefix_cache = LocalLRU(settings.SUGGEST_CACHE_MAX_ENTRIES)
+
+
+def normalize_query(q):
+    return ' '.join(q.lower().split())
+
+
+def _prefix_first(field, q):
+    """0 for values starting with q, 1 for matches further in"""
+    return Case(
+        When(**{f'{field}__istartswith': q}, then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField()
+    )
+
+
+def suggest_titles(q, limit):
+    active = Listing.objects.filter(listing_status='active').order_by('-views', 'listing_id')
+    titles = list(
+        active.filter(listing_title__istartswith=q).values('listing_id', 'listing_title')[:limit]
+    )
+    if len(titles) < limit and len(q) >= TRIGRAM_MIN_LENGTH:
+        titles += list(
+            active.filter(listing_title__icontains=q).exclude(
+                listing_title__istartswith=q
+            ).values('listing_id', 'listing_title')[:limit - len(titles)]
+        )
+    return titles
+
+
+def suggest_locations(q, limit):
+    active = Listing.objects.filter(listing_status='active').order_by()
+
+    def most_used(queryset, count):
+        return list(queryset.values_list('list_location', flat=True).annotate(
+            total=Count('*')
+        ).order_by('-total', 'list_location')[:count])
+
+    locations = most_used(active.filter(list_location__istartswith=q), limit)
+    if len(locations) < limit and len(q) >= TRIGRAM_MIN_LENGTH:
+        locations += most_used(
+            active.filter(list_location__icontains=q).exclude(list_location__istartswith=q),
+            limit - len(locations)
+        )
+    return locations
+
+
+def suggest_categories(q, limit):
+    return list(
+        Category.objects.filter(is_active=True, cat_name__icontains=q).annotate(
+            prefix_rank=_prefix_first('cat_name', q)
+        ).order_by('prefix_rank', 'cat_name').values('cat_id', 'cat_name')[:limit]
+    )
+
+
+def suggest(q, limit):
+    """Title, location and category completions for q (cached per process)"""
+    q = normalize_query(q)
+    if len(q) < MIN_QUERY_LENGTH:
+        return {'query': q, 'titles': [], 'locations': [], 'categories': []}
+
+    key = (q, limit)
+    cached = prefix_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = {
+        'query': q,
+        'titles': suggest_titles(q, limit),
+        'locations': suggest_locations(q, limit),
+        'categories': suggest_categories(q, limit),
+    }
+    prefix_cache.set(key, result, settings.SUGGEST_CACHE_SECONDS)
+    return result
@@ -1,3 +1,396 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from umuhuza_api.cache import LocalLRU, TieredCache, tiered_cache
+from umuhuza_api.tests import TEST_CACHES
+from . import expiry, locations
+from .cache_tags import (
+    LOCATION_INDEX, category_listings_tag, featured_listings_tags, geo_tile_tag, geo_tile_tags,
+    listing_facets_tags
+)
+from .clusters import MAX_PRECISION, count_tiles, tile_precision, zoom_precision
+from .facets import (
+    FACETS_SQL, GROUPED_BY_CATEGORY, GROUPED_BY_FEATURED, GROUPED_BY_LOCATION, GROUPED_BY_PRICE,
+    GROUPED_TOTAL, MAX_LOCATIONS, listing_facets
+)
+from .geo import (
+    cell_bounds, cell_count, covering_cells, encode_geohash, haversine_km, parse_bbox, parse_point, radius_bbox
+)
+from .locations import build_index, match_location, normalize_place
+from .models import Category, Listing
+from .pagination import ListingKeysetPagination
+
+
+# ============================================================================
+# GEO SEARCH
+# ============================================================================
+
+class GeohashTests(SimpleTestCase):
+    def test_encode_known_geohash(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(encode_geohash(42.6, -5.6, 5), 'ezs42')
+
+    def test_prefix_of_longer_geohash(self):
+        self.assertEqual(encode_geohash(-3.3822, 29.3644, 5), encode_geohash(-3.3822, 29.3644)[:5])
+
+    def test_cell_bounds_contain_point(self):
+        lat, lng = -3.3822, 29.3644
+        for precision in range(1, 10):
+            min_lat, min_lng, max_lat, max_lng = cell_bounds(encode_geohash(lat, lng, precision))
+            self.assertTrue(min_lat <= lat < max_lat)
+            self.assertTrue(min_lng <= lng < max_lng)
+
+    def test_cell_bounds_of_first_level_cell(self):
+        self.assertEqual(cell_bounds('0'), (-90.0, -180.0, -45.0, -135.0))
+        self.assertEqual(cell_bounds('z'), (45.0, 135.0, 90.0, 180.0))
+
+    def test_covering_cells_cover_the_box(self):
+        bbox = (-3.42, 29.30, -3.34, 29.40)
+        cells = covering_cells(*bbox)
+        self.assertLessEqual(len(cells), 16)
+        self.assertEqual(len(set(map(len, cells))), 1)
+
+        min_lat, min_lng, max_lat, max_lng = bbox
+        for lat in (min_lat, (min_lat + max_lat) / 2, max_lat):
+            for lng in (min_lng, (min_lng + max_lng) / 2, max_lng):
+                geohash = encode_geohash(lat, lng)
+                self.assertTrue(any(geohash.startswith(cell) for cell in cells), (lat, lng))
+
+    def test_covering_cells_use_finest_level_within_limit(self):
+        bbox = (-3.42, 29.30, -3.34, 29.40)
+        precision = len(covering_cells(*bbox)[0])
+        self.assertLessEqual(cell_count(*bbox, precision), 16)
+        self.assertGreater(cell_count(*bbox, precision + 1), 16)
+
+    def test_covering_cells_of_the_world(self):
+        self.assertEqual(len(covering_cells(-90, -180, 90, 180)), 32)
+
+    def test_radius_bbox_encloses_circle(self):
+        lat, lng, radius_km = -3.3822, 29.3644, 5
+        min_lat, min_lng, max_lat, max_lng = radius_bbox(lat, lng, radius_km)
+        self.assertGreaterEqual(haversine_km(lat, lng, max_lat, lng), radius_km - 1e-6)
+        self.assertGreaterEqual(haversine_km(lat, lng, lat, max_lng), radius_km - 1e-6)
+        self.assertGreaterEqual(haversine_km(lat, lng, min_lat, lng), radius_km - 1e-6)
+        self.assertGreaterEqual(haversine_km(lat, lng, lat, min_lng), radius_km - 1e-6)
+
+    def test_parse_point_and_bbox(self):
+        self.assertEqual(parse_point('-3.38,29.36'), (-3.38, 29.36))
+        self.assertEqual(parse_bbox('29.30,-3.42,29.40,-3.34'), (-3.42, 29.30, -3.34, 29.40))
+        for value in ('91,0', '0', 'a,b'):
+            with self.assertRaises(ValueError):
+                parse_point(value)
+        with self.assertRaises(ValueError):
+            parse_bbox('29.40,-3.42,29.30,-3.34')
+
+
+# ============================================================================
+# MAP CLUSTERS
+# ============================================================================
+
+class ClusterTileTests(SimpleTestCase):
+    def test_zoom_precision_grows_with_zoom(self):
+        precisions = [zoom_precision(zoom) for zoom in range(0, 23)]
+        self.assertEqual(precisions, sorted(precisions))
+        self.assertEqual(precisions[0], 1)
+        self.assertEqual(precisions[-1], MAX_PRECISION)
+
+    def test_tiles_are_coarser_than_clusters(self):
+        self.assertEqual(tile_precision(6), 4)
+        self.assertEqual(tile_precision(2), 1)
+        self.assertEqual(tile_precision(1), 1)
+
+    def test_city_viewport_needs_few_tiles(self):
+        self.assertLessEqual(count_tiles((-3.42, 29.30, -3.34, 29.40), 13), 4)
+
+    def test_listing_belongs_to_a_tile_at_every_zoom(self):
+        geohash = encode_geohash(-3.3822, 29.3644)
+        tags = geo_tile_tags(geohash)
+        self.assertEqual(len(tags), len(geohash))
+        for zoom in range(0, 23):
+            tile = geohash[:tile_precision(zoom_precision(zoom))]
+            self.assertIn(geo_tile_tag(tile), tags)
+
+
+# ============================================================================
+# LOCATION NORMALISATION
+# ============================================================================
+
+LOCATION_ROWS = [
+    (1, 'Bujumbura', '/bujumbura/', 'province'),
+    (2, 'Mukaza', '/bujumbura/mukaza/', 'commune'),
+    (3, 'Rohero', '/bujumbura/mukaza/rohero/', 'zone'),
+    (4, 'Ntahangwa', '/bujumbura/ntahangwa/', 'commune'),
+    (5, 'Cibitoke', '/bujumbura/ntahangwa/cibitoke/', 'zone'),
+    (6, 'Cibitoke', '/cibitoke/', 'province'),
+    (7, 'Gitega', '/gitega/', 'province'),
+    (8, 'Gitega', '/gitega/gitega/', 'commune'),
+]
+
+
+class MatchLocationTests(SimpleTestCase):
+    def setUp(self):
+        self.index = build_index(LOCATION_ROWS)
+
+    def match(self, text):
+        match = match_location(self.index, text)
+        return match and match['location_id']
+
+    def test_normalize_place(self):
+        self.assertEqual(normalize_place('  Ngozi — Centre-Ville! '), 'ngozi centre ville')
+        self.assertEqual(normalize_place('Kinindo, BUJA'), 'kinindo buja')
+        self.assertEqual(normalize_place('Réhéro'), 'rehero')
+
+    def test_whole_text(self):
+        self.assertEqual(self.match('ROHERO'), 3)
+        self.assertEqual(self.match('Rohéro'), 3)
+
+    def test_parts_pick_the_place_they_agree_on(self):
+        self.assertEqual(self.match('Bujumbura, Cibitoke'), 5)
+        self.assertEqual(self.match('Rohero - Bujumbura'), 3)
+
+    def test_ties_go_to_the_broader_place(self):
+        self.assertEqual(self.match('Cibitoke'), 6)
+        self.assertEqual(self.match('Gitega'), 7)
+
+    def test_words_when_no_part_matches(self):
+        self.assertEqual(self.match('quartier Rohero avenue 3'), 3)
+
+    def test_unknown_place(self):
+        self.assertIsNone(self.match('Kigali'))
+        self.assertIsNone(self.match(''))
+        self.assertIsNone(self.match(None))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LocationIndexTests(SimpleTestCase):
+    def setUp(self):
+        tiered_cache.shared.clear()
+        tiered_cache._versions = LocalLRU(100)
+        locations._index_cache.clear()
+
+    def test_index_is_rebuilt_after_another_process_changes_a_location(self):
+        with mock.patch.object(locations, 'Location') as model:
+            rows = model.objects.filter.return_value.values_list
+            rows.return_value = [(3, 'Rohero', '/1/2/3/', 'zone')]
+            index = locations.get_index()
+            self.assertIs(locations.get_index(), index)
+
+            rows.return_value = [(3, 'Rohero I', '/1/2/3/', 'zone')]
+            TieredCache().invalidate_tags([LOCATION_INDEX])
+            # This process re-reads versions once its copies expire
+            tiered_cache._versions.clear()
+            self.assertIn('rohero i', locations.get_index())
+            self.assertEqual(rows.call_count, 2)
+
+
+# ============================================================================
+# BROWSE FACETS
+# ============================================================================
+
+GROUPING_COLUMNS = ['cat_id', 'list_location', 'is_featured', 'price_bucket']
+
+
+def grouping_mask(*grouped):
+    """GROUPING() of a grouping set: one bit per argument left out, first argument highest"""
+    return sum(
+        1 << (len(GROUPING_COLUMNS) - 1 - position)
+        for position, column in enumerate(GROUPING_COLUMNS) if column not in grouped
+    )
+
+
+class ListingFacetsTests(SimpleTestCase):
+    def run_facets(self, rows, selections=None):
+        cursor = mock.MagicMock()
+        cursor.fetchall.return_value = rows
+        connection = mock.MagicMock()
+        connection.cursor.return_value.__enter__.return_value = cursor
+        with mock.patch('listings.facets.connection', connection):
+            facets = listing_facets(Listing.objects.filter(listing_status='active'), selections)
+        return facets, cursor.execute.call_args[0]
+
+    def test_grouping_masks_match_the_query(self):
+        self.assertIn(f'GROUPING({", ".join("f." + column for column in GROUPING_COLUMNS)})', FACETS_SQL)
+        self.assertEqual(GROUPED_BY_CATEGORY, grouping_mask('cat_id'))
+        self.assertEqual(GROUPED_BY_LOCATION, grouping_mask('list_location'))
+        self.assertEqual(GROUPED_BY_FEATURED, grouping_mask('is_featured'))
+        self.assertEqual(GROUPED_BY_PRICE, grouping_mask('price_bucket'))
+        self.assertEqual(GROUPED_TOTAL, grouping_mask())
+
+    def test_rows_use_their_facet_count(self):
+        rows = [
+            # grouping, cat_id, cat_name, location, featured, bucket, by category, location, featured, price, total
+            (GROUPED_TOTAL, None, None, None, None, None, 9, 9, 9, 9, 5),
+            (GROUPED_BY_CATEGORY, 1, 'Houses', None, None, None, 5, 0, 0, 0, 5),
+            (GROUPED_BY_CATEGORY, 2, 'Cars', None, None, None, 3, 0, 0, 0, 0),
+            (GROUPED_BY_CATEGORY, 3, 'Land', None, None, None, 0, 0, 0, 0, 0),
+            (GROUPED_BY_LOCATION, None, None, 'Rohero', None, None, 0, 4, 0, 0, 4),
+            (GROUPED_BY_FEATURED, None, None, None, True, None, 0, 0, 2, 0, 2),
+            (GROUPED_BY_FEATURED, None, None, None, False, None, 0, 0, 7, 0, 3),
+            (GROUPED_BY_PRICE, None, None, None, None, 2, 0, 0, 0, 6, 5),
+            (GROUPED_BY_PRICE, None, None, None, None, 0, 0, 0, 0, 1, 0),
+        ]
+        facets, _ = self.run_facets(rows)
+
+        self.assertEqual(facets['total'], 5)
+        self.assertEqual(
+            [(entry['cat_id'], entry['count']) for entry in facets['categories']], [(1, 5), (2, 3)]
+        )
+        self.assertEqual(facets['locations'], [{'list_location': 'Rohero', 'count': 4}])
+        self.assertEqual(facets['featured'], {'true': 2, 'false': 7})
+        self.assertEqual([band['count'] for band in facets['price_ranges']][:3], [0, 6, 0])
+
+    def test_locations_are_capped(self):
+        rows = [
+            (GROUPED_BY_LOCATION, None, None, f'Place {number}', None, None, 0, number, 0, 0, number)
+            for number in range(1, MAX_LOCATIONS + 6)
+        ]
+        facets, _ = self.run_facets(rows)
+        self.assertEqual(len(facets['locations']), MAX_LOCATIONS)
+        self.assertEqual(facets['locations'][0]['count'], MAX_LOCATIONS + 5)
+
+    def test_selections_become_facet_columns(self):
+        _, (sql, params) = self.run_facets([], {'categories': Q(cat_id=4)})
+        self.assertIn('"in_categories"', sql)
+        self.assertIn(4, params)
+        self.assertIn(True, params)
+
+
+# ============================================================================
+# KEYSET PAGINATION
+# ============================================================================
+
+class BrowseView:
+    ordering_fields = ['listing_price', 'createdat', 'views']
+    ordering = ['-createdat']
+
+
+class KeysetCursorTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def paginator_for(self, url):
+        request = Request(self.factory.get(url))
+        paginator = ListingKeysetPagination()
+        paginator.base_url = request.build_absolute_uri()
+        paginator.ordering = paginator.get_ordering(request, BrowseView())
+        paginator.field = paginator.ordering.lstrip('-')
+        return paginator, request
+
+    def follow(self, link):
+        """Cursor decoded by a new request for link"""
+        paginator, request = self.paginator_for(link)
+        return paginator, paginator.decode_cursor(request)
+
+    def test_ordering_falls_back_to_view_default(self):
+        paginator, _ = self.paginator_for('/api/listings/?ordering=title,-views')
+        self.assertEqual(paginator.ordering, '-views')
+        paginator, _ = self.paginator_for('/api/listings/?ordering=bogus')
+        self.assertEqual(paginator.ordering, '-createdat')
+
+    def test_next_cursor_round_trip(self):
+        paginator, _ = self.paginator_for('/api/listings/?pagination=cursor&ordering=-listing_price')
+        link = paginator.build_link(Listing(listing_id=42, listing_price=Decimal('1500.00')), reverse=False)
+
+        self.assertEqual(parse_qs(urlparse(link).query)['ordering'], ['-listing_price'])
+        paginator, cursor = self.follow(link)
+        self.assertEqual(cursor, {'o': '-listing_price', 'v': '1500.00', 'id': 42, 'r': False})
+        self.assertEqual(
+            paginator.get_seek_filter(Listing, cursor, descending=True),
+            Q(listing_price__lte=Decimal('1500.00'))
+            & (Q(listing_price__lt=Decimal('1500.00')) | Q(listing_price=Decimal('1500.00'), listing_id__lt=42))
+        )
+
+    def test_previous_cursor_round_trip(self):
+        paginator, _ = self.paginator_for('/api/listings/?pagination=cursor&ordering=views')
+        link = paginator.build_link(Listing(listing_id=7, views=12), reverse=True)
+
+        paginator, cursor = self.follow(link)
+        self.assertEqual(cursor, {'o': 'views', 'v': 12, 'id': 7, 'r': True})
+        self.assertEqual(
+            paginator.get_seek_filter(Listing, cursor, descending=True),
+            Q(views__lte=12) & (Q(views__lt=12) | Q(views=12, listing_id__lt=7))
+        )
+
+    def test_cursor_from_another_ordering_is_rejected(self):
+        paginator, _ = self.paginator_for('/api/listings/?pagination=cursor&ordering=views')
+        link = paginator.build_link(Listing(listing_id=7, views=12), reverse=False)
+
+        paginator, request = self.paginator_for(link.replace('ordering=views', 'ordering=-views'))
+        with self.assertRaises(NotFound):
+            paginator.decode_cursor(request)
+
+    def test_malformed_cursor_is_rejected(self):
+        for cursor in ('not-base64!', 'e30=', 'bnVsbA=='):
+            paginator, request = self.paginator_for(f'/api/listings/?pagination=cursor&cursor={cursor}')
+            with self.assertRaises(NotFound):
+                paginator.decode_cursor(request)
+
+
+# ============================================================================
+# SUGGESTIONS
+# ============================================================================
+
+class SuggestIndexTests(SimpleTestCase):
+    """The suggest lookups compile to the UPPER() expressions their indexes are built on"""
+
+    def assert_indexed(self, model, index_name, lookup):
+        index = next(index for index in model._meta.indexes if index.name == index_name)
+        [upper] = index.expressions[0].get_source_expressions()
+        self.assertIsInstance(upper, Upper)
+        field = upper.get_source_expressions()[0].name
+        column = model._meta.get_field(field).column
+        query = str(model.objects.filter(**{f'{field}__{lookup}': 'q'}).query)
+        self.assertIn(f'WHERE UPPER("{model._meta.db_table}"."{column}"::text) LIKE', query)
+
+    def test_trigram_indexes_serve_icontains(self):
+        self.assert_indexed(Listing, 'listings_title_trgm', 'icontains')
+        self.assert_indexed(Listing, 'listings_location_trgm', 'icontains')
+        self.assert_indexed(Category, 'categories_name_trgm', 'icontains')
+
+    def test_prefix_indexes_serve_istartswith(self):
+        self.assert_indexed(Listing, 'listings_title_prefix_idx', 'istartswith')
+        self.assert_indexed(Listing, 'listings_location_prefix_idx', 'istartswith')
+
+
+# ============================================================================
+# EXPIRY SWEEPS
+# ============================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class ExpireListingsCacheTests(SimpleTestCase):
+    row = {
+        'listing_id': 7, 'userid': 1, 'cat_id': 3, 'is_featured': True,
+        'listing_title': 'Bike', 'geohash': 'kxm0qvpf2',
+    }
+
+    def setUp(self):
+        tiered_cache.shared.clear()
+        tiered_cache.local = LocalLRU(100)
+
+    def sweep(self, queryset, fields, expire, build_notifications, chunk_size):
+        """_sweep over one chunk, without the row locks"""
+        expire([{field: self.row[field] for field in fields}])
+        return 1
+
+    def test_expired_listings_leave_cached_pages(self):
+        facets = {'categories': [{'cat_id': 3}]}
+        featured = [{'listing_id': 8}]
+        tiered_cache.set('tests', 'facets', facets, 60, tags=listing_facets_tags(None, facets))
+        tiered_cache.set('tests', 'featured', featured, 60, tags=featured_listings_tags(None, featured))
+        tiered_cache.set('tests', 'category', [], 60, tags=[category_listings_tag(3)])
+        tiered_cache.set('tests', 'tile', [], 60, tags=[geo_tile_tag('kxm')])
+
+        with mock.patch.object(expiry, '_sweep', self.sweep), mock.patch.object(expiry, 'Listing'), \
+                mock.patch('django.db.transaction.on_commit', lambda func: func()):
+            self.assertEqual(expiry.expire_listings(), 1)
+
+        for key in ('facets', 'featured', 'category', 'tile'):
+            self.assertIsNone(tiered_cache.get('tests', key), key)
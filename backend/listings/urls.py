@@ -6,11 +6,17 @@ urlpatterns = [
     path('categories/', views.category_list, name='category-list'),
     path('categories/<int:pk>/', views.category_detail, name='category-detail'),
     
+    # Locations
+    path('locations/', views.location_list, name='location-list'),
+    
     # Listings
     path('listings/', views.ListingListView.as_view(), name='listing-list'),
     path('listings/create/', views.listing_create, name='listing-create'),
     path('listings/my-listings/', views.my_listings, name='my-listings'),
     path('listings/featured/', views.featured_listings, name='featured-listings'),
+    path('listings/facets/', views.ListingFacetsView.as_view(), name='listing-facets'),
+    path('listings/suggest/', views.listing_suggest, name='listing-suggest'),
+    path('listings/clusters/', views.ListingClustersView.as_view(), name='listing-clusters'),
     path('listings/<int:pk>/', views.listing_detail, name='listing-detail'),
     path('listings/<int:pk>/update/', views.listing_update, name='listing-update'),
     path('listings/<int:pk>/update-status/', views.listing_update_status, name='listing-update-status'),
@@ -40,5 +46,6 @@ urlpatterns = [
     path('listings/<int:listing_id>/upload-image/', views.upload_listing_image, name='upload-image'),
     path('listings/<int:listing_id>/images/<int:image_id>/', views.delete_listing_image, name='delete-image'),
     path('listings/<int:listing_id>/images/<int:image_id>/set-primary/', views.set_primary_image, name='set-primary-image'),
+    path('listings/<int:listing_id>/images/<int:image_id>/status/', views.listing_image_status, name='image-status'),
 
 ]
\ No newline at end of file
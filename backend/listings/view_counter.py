@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from umuhuza_api.buffers import PeriodicFlusher
+from umuhuza_api.middleware import get_client_ip
+from .models import Listing
+
+
+def get_viewer_key(request):
+    """Identify a viewer: user id when logged in, else IP + user agent"""
+    if request.user.is_authenticated:
+        return f"u{request.user.pk}"
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    digest = hashlib.md5(user_agent.encode(), usedforsecurity=False).hexdigest()[:12]
+    return f"a{get_client_ip(request)}:{digest}"
+
+
+class ListingViewCounter:
+    """
+    Buffered, deduplicated listing view counts.
+
+    record() drops repeat views by the same viewer within
+    LISTING_VIEW_DEDUP_SECONDS (tracked in the cache) and adds the rest to an
+    in-memory tally. A background flusher writes the tally every
+    LISTING_VIEW_FLUSH_SECONDS as `views = views + n` UPDATEs, one per
+    distinct n, so a GET on a listing never writes to the LISTINGS row.
+    """
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flusher = PeriodicFlusher(
+            self.flush,
+            interval=settings.LISTING_VIEW_FLUSH_SECONDS,
+            name='listing-view-counter'
+        )
+
+    def record(self, listing_id, viewer_key):
+        """Count a view unless this viewer was already counted recently"""
+        dedup_key = f"listing-view:{listing_id}:{viewer_key}"
+        if not cache.add(dedup_key, 1, timeout=settings.LISTING_VIEW_DEDUP_SECONDS):
+            return False
+
+        with self._lock:
+            self._pending[listing_id] += 1
+            buffered = len(self._pending)
+
+        self._flusher.start()
+        if buffered >= settings.LISTING_VIEW_MAX_PENDING:
+            self._flusher.wake()
+        return True
+
+    def pending(self, listing_id):
+        """Views recorded in this process but not yet written"""
+        with self._lock:
+            return self._pending.get(listing_id, 0)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+        if not batch:
+            return 0
+
+        # Group listings by increment so each distinct n is a single UPDATE
+        by_increment = defaultdict(list)
+        for listing_id, count in batch.items():
+            by_increment[count].append(listing_id)
+
+        try:
+            with transaction.atomic():
+                for count, listing_ids in by_increment.items():
+                    Listing.objects.filter(pk__in=sorted(listing_ids)).update(
+                        views=F('views') + count
+                    )
+        except Exception:
+            # Put the tally back so a transient DB error doesn't lose views
+            with self._lock:
+                self._pending.update(batch)
+            raise
+
+        return sum(batch.values())
+
+
+view_counter = ListingViewCounter()
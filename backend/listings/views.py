@@ -1,30 +1,44 @@
 from django.shortcuts import render
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-import os
-import uuid
-from PIL import Image
-from io import BytesIO
 from rest_framework import status, generics, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Avg
+from django.utils.decorators import method_decorator
+from django.db import transaction
+from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
-
-from .models import Category, Listing, ListingImage, PricingPlan, RatingReview, Favorite, ReportMisconduct, UserSubscription
+from django_filters.utils import translate_validation
+
+from . import cache_tags
+from .clusters import MAX_TILES as MAX_CLUSTER_TILES, count_tiles, listing_clusters
+from .facets import listing_facets
+from .filters import (
+    ListingFacetSelectionFilterSet, ListingGeoFilter, ListingLocationFilter, ListingSearchFilter,
+    price_range_filter
+)
+from .geo import parse_bbox
+from .suggest import suggest
+from .images import (
+    delete_image_files, image_pipeline, refresh_image_summary, store_upload, validate_upload
+)
+from .pagination import ListingKeysetPagination
+from .view_counter import get_viewer_key, view_counter
+from .models import Category, Location, Listing, ListingImage, PricingPlan, RatingReview, Favorite, ReportMisconduct, UserSubscription
 from .serializers import (
-    CategorySerializer, ListingSerializer, ListingCreateSerializer,
+    CategorySerializer, LocationSerializer, ListingCardSerializer, ListingCreateSerializer, ListingImageSerializer,
     ListingDetailSerializer, PricingPlanSerializer, RatingReviewSerializer,
     RatingReviewCreateSerializer, FavoriteSerializer, ReportMisconductSerializer, ReportCreateSerializer,
     UserSubscriptionSerializer
 )
 from django.utils import timezone
 from datetime import timedelta
+from urllib.parse import urlencode
 
 from notifications.utils import create_notification
+from umuhuza_api.cache import cache_response
+from users.models import User
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -38,6 +52,7 @@ class StandardResultsSetPagination(PageNumberPagination):
 # ============================================================================
 
 @api_view(['GET'])
+@cache_response('categories', timeout=3600, tags=cache_tags.category_list_tags)
 def category_list(request):
     """
     Get all active categories
@@ -49,6 +64,7 @@ def category_list(request):
 
 
 @api_view(['GET'])
+@cache_response('categories', timeout=3600, tags=cache_tags.category_detail_tags)
 def category_detail(request, pk):
     """
     Get category details
@@ -59,39 +75,192 @@ def category_detail(request, pk):
     return Response(serializer.data)
 
 
+# ============================================================================
+# LOCATIONS
+# ============================================================================
+
+@api_view(['GET'])
+@cache_response('locations', timeout=3600, tags=cache_tags.location_list_tags)
+def location_list(request):
+    """
+    Get the places under a location (provinces without ?parent=)
+    GET /api/locations/?parent={id}
+    """
+    parent = request.query_params.get('parent')
+    locations = Location.objects.filter(is_active=True)
+    if parent:
+        if not parent.isdigit():
+            return Response({'error': 'parent must be a location id'}, status=status.HTTP_400_BAD_REQUEST)
+        locations = locations.filter(parent_id=parent)
+    else:
+        locations = locations.filter(parent__isnull=True)
+    serializer = LocationSerializer(locations.order_by('name'), many=True)
+    return Response(serializer.data)
+
+
 # ============================================================================
 # LISTINGS
 # ============================================================================
 
+def is_first_browse_page(request):
+    """
+    Only first pages of browse results are cached; deeper pages, and map or
+    "near me" searches (one set of coordinates per user), are rarely shared
+    """
+    params = request.query_params
+    return (params.get('page', '1') == '1' and not params.get('cursor')
+            and not params.get('near') and not params.get('bbox'))
+
+
 class ListingListView(generics.ListAPIView):
     """
     List all listings with filters
     GET /api/listings/?category=1&min_price=1000&max_price=50000&location=Bujumbura&search=house
+
+    Add ?pagination=cursor for keyset pages (next/previous cursors, no count).
+    Cursor pages follow ?ordering= rather than search relevance.
     """
-    queryset = Listing.objects.filter(listing_status='active').select_related('userid', 'cat_id').prefetch_related('images')
-    serializer_class = ListingSerializer
+    queryset = Listing.objects.filter(listing_status='active').select_related('userid', 'cat_id', 'primary_image')
+    serializer_class = ListingCardSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    cursor_pagination_class = ListingKeysetPagination
+    # Search runs last so it can apply relevance ordering when no ?ordering= is given
+    filter_backends = [
+        DjangoFilterBackend, ListingLocationFilter, filters.OrderingFilter, ListingGeoFilter, ListingSearchFilter
+    ]
     
     filterset_fields = ['cat_id', 'listing_status', 'is_featured', 'list_location']
-    search_fields = ['listing_title', 'list_description', 'list_location']
     ordering_fields = ['listing_price', 'createdat', 'views']
     ordering = ['-createdat']
+
+    @property
+    def paginator(self):
+        """Page-number pagination by default, keyset when ?pagination=cursor"""
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
+    @method_decorator(cache_response(
+        'listings', timeout=60,
+        tags=cache_tags.listing_browse_tags,
+        condition=is_first_browse_page
+    ))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
     
     def get_queryset(self):
-        queryset = super().get_queryset()
-        
         # Filter by price range
-        min_price = self.request.query_params.get('min_price')
-        max_price = self.request.query_params.get('max_price')
-        
-        if min_price:
-            queryset = queryset.filter(listing_price__gte=min_price)
-        if max_price:
-            queryset = queryset.filter(listing_price__lte=max_price)
-        
-        return queryset
+        return super().get_queryset().filter(price_range_filter(self.request.query_params))
+
+
+# Query parameters that page or sort results without changing which listings match
+BROWSE_ONLY_PARAMS = {'page', 'page_size', 'ordering', 'pagination', 'cursor', 'format'}
+
+
+def facet_filter_signature(request, ignored=BROWSE_ONLY_PARAMS):
+    """Facets depend only on the filters, not on paging or ordering"""
+    filters = sorted(
+        (name, value)
+        for name, values in request.query_params.lists() if name not in ignored
+        for value in values
+    )
+    return f'{request.path}?{urlencode(filters)}'
+
+
+class ListingFacetsView(ListingListView):
+    """
+    Browse sidebar counts for the same filters as ListingListView
+    GET /api/listings/facets/?cat_id=1&min_price=1000&search=maison
+
+    Returns the total plus counts per category, location (most common
+    first), featured flag and price band, from one grouped query. Each
+    facet counts the listings matching every filter but its own, so with
+    ?cat_id=1 the other categories keep their counts.
+    """
+    # cat_id, list_location, is_featured and the price range are applied
+    # per facet (get_facet_selections), not to the whole queryset
+    filterset_fields = ['listing_status']
+    facet_fields = {'categories': 'cat_id', 'locations': 'list_location', 'featured': 'is_featured'}
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_facet_selections(self, queryset):
+        """{facet: Q of the listings its own filter selects}"""
+        filterset = ListingFacetSelectionFilterSet(self.request.query_params, queryset=queryset)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        selections = {'price_ranges': price_range_filter(self.request.query_params)}
+        for facet, field in self.facet_fields.items():
+            value = filterset.form.cleaned_data.get(field)
+            selections[facet] = Q() if value in (None, '') else Q(**{field: value})
+        return selections
+
+    @method_decorator(cache_response(
+        'listings', timeout=120,
+        tags=cache_tags.listing_facets_tags,
+        key=facet_filter_signature
+    ))
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(listing_facets(queryset, self.get_facet_selections(queryset)))
+
+
+class ListingClustersView(ListingListView):
+    """
+    Map markers for the visible area, grouped server-side
+    GET /api/listings/clusters/?bbox=29.30,-3.42,29.40,-3.34&zoom=13&cat_id=1
+
+    bbox is min_lng,min_lat,max_lng,max_lat; zoom is the map zoom (0-22).
+    Accepts the ListingListView filters. Returns per cluster its count,
+    centroid and price range (and listing_id for single listings), most
+    populated first. Tiles are cached per zoom (X-Cache: HIT/PARTIAL/MISS).
+    """
+    # No ordering, and the map area is applied per tile
+    filter_backends = [DjangoFilterBackend, ListingLocationFilter, ListingSearchFilter]
+
+    def list(self, request, *args, **kwargs):
+        try:
+            bbox = parse_bbox(request.query_params.get('bbox', ''))
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            return Response({
+                'error': 'bbox (min_lng,min_lat,max_lng,max_lat) and zoom are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= zoom <= 22:
+            return Response({'error': 'zoom must be between 0 and 22'}, status=status.HTTP_400_BAD_REQUEST)
+        if count_tiles(bbox, zoom) > MAX_CLUSTER_TILES:
+            return Response({
+                'error': 'The area is too large for this zoom level'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        signature = facet_filter_signature(request, ignored=BROWSE_ONLY_PARAMS | {'bbox', 'zoom'})
+        data, cached_tiles, tiles = listing_clusters(queryset, bbox, zoom, signature)
+
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if cached_tiles == tiles else 'PARTIAL' if cached_tiles else 'MISS'
+        return response
+
+
+@api_view(['GET'])
+def listing_suggest(request):
+    """
+    Search-as-you-type completions
+    GET /api/listings/suggest/?q=toy&limit=8
+
+    Returns matching listing titles, locations and categories, prefix
+    matches first. Queries shorter than 2 characters return nothing.
+    """
+    try:
+        limit = min(max(int(request.query_params.get('limit', 8)), 1), 20)
+    except ValueError:
+        limit = 8
+    return Response(suggest(request.query_params.get('q', ''), limit))
 
 
 @api_view(['POST'])
@@ -115,11 +284,76 @@ def listing_create(request):
             'verification_required': True
         }, status=status.HTTP_403_FORBIDDEN)
 
-    # STEP 2: Check subscription quota
+    # Quota reservation, listing, image rows and the seller flag (post_save
+    # signal) commit or roll back together. Raw uploads stored on the way are
+    # deleted if the transaction does not commit.
+    pending_images = []
+    try:
+        with transaction.atomic():
+            # STEP 2: Reserve a slot from the subscription quota; a user
+            # without quota gets the 403 whatever the payload
+            quota = UserSubscription.reserve_listing(request.user)
+            if quota is None:
+                return quota_unavailable_response(request.user)
+
+            # STEP 3: Validate listing data, giving the slot back if invalid
+            serializer = ListingCreateSerializer(data=request.data)
+            if not serializer.is_valid():
+                transaction.set_rollback(True)
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            # STEP 4: Create the listing already active, with its expiration
+            listing = serializer.save(
+                userid=request.user,
+                listing_status='active',
+                expiration_date=timezone.now() + timedelta(days=quota['duration_days'])
+            )
+
+            # STEP 5: Limit images based on subscription plan and store raw
+            # uploads only; optimisation runs in the image pipeline
+            images = request.FILES.getlist('images')
+            for image_file in images[:quota['max_images_per_listing']]:
+                if validate_upload(image_file):
+                    continue
+                try:
+                    pending_images.append(store_upload(
+                        listing,
+                        image_file,
+                        display_order=len(pending_images),
+                        is_primary=not pending_images  # First image is primary
+                    ))
+                except Exception as e:
+                    # Log error but don't fail the entire request
+                    print(f"Error storing image {image_file.name}: {str(e)}")
+
+            if pending_images:
+                ListingImage.objects.bulk_create(pending_images)
+                refresh_image_summary(listing.listing_id)
+                image_pipeline.enqueue(pending_images)
+    except Exception:
+        for image in pending_images:
+            delete_image_files(image)
+        raise
+
+    return Response({
+        'message': 'Listing created and activated successfully!',
+        'listing': ListingDetailSerializer(listing).data,
+        'images_uploaded': len(pending_images),
+        'subscription_info': {
+            'plan': quota['pricing_name'],
+            'listings_used': quota['listings_used'],
+            'listings_remaining': max(0, quota['max_listings'] - quota['listings_used']),
+            'max_listings': quota['max_listings']
+        }
+    }, status=status.HTTP_201_CREATED)
+
+
+def quota_unavailable_response(user):
+    """403 explaining why reserve_listing() found no listing slot"""
     active_subscription = UserSubscription.objects.filter(
-        userid=request.user,
+        userid=user,
         subscription_status='active'
-    ).select_related('pricing_id').first()
+    ).select_related('pricing_id').order_by('subscription_id').first()
 
     if not active_subscription:
         return Response({
@@ -127,127 +361,13 @@ def listing_create(request):
             'needs_subscription': True
         }, status=status.HTTP_403_FORBIDDEN)
 
-    # Check if user has quota available
-    if not active_subscription.has_quota:
-        return Response({
-            'error': f'You have reached your listing limit ({active_subscription.pricing_id.max_listings} listings). Upgrade your plan to create more listings.',
-            'quota_exceeded': True,
-            'current_plan': active_subscription.pricing_id.pricing_name,
-            'max_listings': active_subscription.pricing_id.max_listings,
-            'listings_used': active_subscription.listings_used
-        }, status=status.HTTP_403_FORBIDDEN)
-
-    # STEP 3: Validate and create listing
-    serializer = ListingCreateSerializer(data=request.data)
-
-    if serializer.is_valid():
-        # Create listing with status='pending' initially
-        listing = serializer.save(userid=request.user)
-
-        # STEP 4: Automatically activate listing and set expiration
-        listing.listing_status = 'active'
-        listing.expiration_date = timezone.now() + timedelta(days=active_subscription.pricing_id.duration_days)
-        listing.save(update_fields=['listing_status', 'expiration_date', 'updatedat'])
-
-        # STEP 5: Increment subscription usage
-        active_subscription.listings_used += 1
-        active_subscription.save(update_fields=['listings_used', 'updatedat'])
-
-        # STEP 6: Set is_seller flag if first listing
-        if not request.user.is_seller:
-            request.user.is_seller = True
-            request.user.save(update_fields=['is_seller'])
-
-        # Handle image uploads if provided
-        images = request.FILES.getlist('images')
-        uploaded_images = []
-
-        # STEP 7: Limit images based on subscription plan
-        max_images = active_subscription.pricing_id.max_images_per_listing
-
-        for index, image_file in enumerate(images[:max_images]):
-            img = None  # Initialize for cleanup
-            try:
-                # Validate file type
-                allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp']
-                if image_file.content_type not in allowed_types:
-                    continue
-
-                # Validate file size (5MB max)
-                if image_file.size > 5 * 1024 * 1024:
-                    continue
-
-                # Open and optimize image
-                # NOTE: Original uploaded file remains in memory only and is never saved to disk
-                # Only the converted/optimized JPEG version is saved
-                img = Image.open(image_file)
-
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-
-                # Resize if too large
-                max_width = 1920
-                if img.width > max_width:
-                    ratio = max_width / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-
-                # Save optimized image to BytesIO buffer
-                output = BytesIO()
-                img.save(output, format='JPEG', quality=85, optimize=True)
-                output.seek(0)
-
-                # Close PIL image to free memory
-                img.close()
-                img = None
-
-                # Generate unique filename (always .jpg after conversion)
-                filename = f"listings/{listing.listing_id}/{uuid.uuid4().hex}.jpg"
-
-                # Save ONLY the converted file to storage
-                path = default_storage.save(filename, ContentFile(output.read()))
-                url = default_storage.url(path)
-
-                # Close buffer
-                output.close()
-
-                # Create image record
-                listing_image = ListingImage.objects.create(
-                    listing_id=listing,
-                    image_url=url,
-                    is_primary=(index == 0),  # First image is primary
-                    display_order=index
-                )
-
-                uploaded_images.append({
-                    'listimage_id': listing_image.listimage_id,
-                    'image_url': listing_image.image_url,
-                    'is_primary': listing_image.is_primary
-                })
-
-            except Exception as e:
-                # Log error but don't fail the entire request
-                print(f"Error uploading image {index}: {str(e)}")
-                continue
-            finally:
-                # Ensure PIL image is closed even if error occurs
-                if img:
-                    img.close()
-
-        return Response({
-            'message': 'Listing created and activated successfully!',
-            'listing': ListingDetailSerializer(listing).data,
-            'images_uploaded': len(uploaded_images),
-            'subscription_info': {
-                'plan': active_subscription.pricing_id.pricing_name,
-                'listings_used': active_subscription.listings_used,
-                'listings_remaining': active_subscription.remaining_listings,
-                'max_listings': active_subscription.pricing_id.max_listings
-            }
-        }, status=status.HTTP_201_CREATED)
-
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'error': f'You have reached your listing limit ({active_subscription.pricing_id.max_listings} listings). Upgrade your plan to create more listings.',
+        'quota_exceeded': True,
+        'current_plan': active_subscription.pricing_id.pricing_name,
+        'max_listings': active_subscription.pricing_id.max_listings,
+        'listings_used': active_subscription.listings_used
+    }, status=status.HTTP_403_FORBIDDEN)
 
 
 @api_view(['GET'])
@@ -257,13 +377,14 @@ def listing_detail(request, pk):
     GET /api/listings/{id}/
     """
     listing = get_object_or_404(
-        Listing.objects.select_related('userid', 'cat_id').prefetch_related('images'),
+        Listing.objects.select_related('userid', 'cat_id', 'location').prefetch_related('images'),
         pk=pk
     )
     
-    # Increment view count (don't count owner's views)
+    # Count the view (not the owner's); written later in a batch by the view counter
     if not request.user.is_authenticated or request.user != listing.userid:
-        listing.increment_views()
+        view_counter.record(listing.pk, get_viewer_key(request))
+    listing.views += view_counter.pending(listing.pk)
     
     serializer = ListingDetailSerializer(listing, context={'request': request})
     return Response(serializer.data)
@@ -402,12 +523,13 @@ def my_listings(request):
             'error': 'Authentication required'
         }, status=status.HTTP_401_UNAUTHORIZED)
 
-    listings = Listing.objects.filter(userid=request.user).select_related('userid', 'cat_id').prefetch_related('images').order_by('-createdat')
-    serializer = ListingSerializer(listings, many=True, context={'request': request})
+    listings = Listing.objects.filter(userid=request.user).select_related('userid', 'cat_id', 'primary_image').order_by('-createdat')
+    serializer = ListingCardSerializer(listings, many=True, context={'request': request})
     return Response(serializer.data)
 
 
 @api_view(['GET'])
+@cache_response('listings', timeout=300, tags=cache_tags.featured_listings_tags)
 def featured_listings(request):
     """
     Get featured listings
@@ -416,13 +538,14 @@ def featured_listings(request):
     listings = Listing.objects.filter(
         listing_status='active',
         is_featured=True
-    ).select_related('userid', 'cat_id').prefetch_related('images').order_by('-createdat')[:10]
+    ).select_related('userid', 'cat_id', 'primary_image').order_by('-createdat')[:10]
 
-    serializer = ListingSerializer(listings, many=True, context={'request': request})
+    serializer = ListingCardSerializer(listings, many=True, context={'request': request})
     return Response(serializer.data)
 
 
 @api_view(['GET'])
+@cache_response('listings', timeout=600, tags=cache_tags.similar_listings_tags)
 def similar_listings(request, pk):
     """
     Get similar listings (same category, similar price)
@@ -441,9 +564,9 @@ def similar_listings(request, pk):
         listing_status='active',
         listing_price__gte=min_price,
         listing_price__lte=max_price
-    ).exclude(pk=pk).select_related('userid', 'cat_id').prefetch_related('images').order_by('-createdat')[:6]
+    ).exclude(pk=pk).select_related('userid', 'cat_id', 'primary_image').order_by('-createdat')[:6]
 
-    serializer = ListingSerializer(similar, many=True, context={'request': request})
+    serializer = ListingCardSerializer(similar, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -458,8 +581,10 @@ def favorite_list(request):
     Get user's favorite listings
     GET /api/favorites/
     """
-    favorites = Favorite.objects.filter(userid=request.user).select_related('listing_id')
-    serializer = FavoriteSerializer(favorites, many=True)
+    favorites = Favorite.objects.filter(userid=request.user).select_related(
+        'listing_id__cat_id', 'listing_id__userid', 'listing_id__primary_image'
+    )
+    serializer = FavoriteSerializer(favorites, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -505,13 +630,15 @@ def review_list(request, user_id):
         is_visible=True
     ).select_related('userid').order_by('-createdat')
     
-    # Calculate average rating
-    avg_rating = reviews.aggregate(Avg('rating'))['rating__avg'] or 0
+    # Aggregates are maintained on the user row (listings/ratings.py)
+    rating = User.objects.filter(pk=user_id).values('rating_avg', 'rating_count').first()
+    if rating is None:
+        rating = {'rating_avg': 0, 'rating_count': 0}
     
     serializer = RatingReviewSerializer(reviews, many=True)
     return Response({
-        'average_rating': round(avg_rating, 1),
-        'total_reviews': reviews.count(),
+        'average_rating': round(float(rating['rating_avg']), 1),
+        'total_reviews': rating['rating_count'],
         'reviews': serializer.data
     })
 
@@ -538,7 +665,9 @@ def review_create(request):
                 'error': 'You cannot review yourself'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        review = serializer.save(userid=request.user)
+        # The review and the reviewed user's rating aggregates commit together
+        with transaction.atomic():
+            review = serializer.save(userid=request.user)
         
         return Response({
             'message': 'Review posted successfully',
@@ -553,6 +682,7 @@ def review_create(request):
 # ============================================================================
 
 @api_view(['GET'])
+@cache_response('pricing', timeout=3600, tags=cache_tags.pricing_plans_tags)
 def pricing_plans_list(request):
     """
     Get all active pricing plans
@@ -688,75 +818,36 @@ def upload_listing_image(request, listing_id):
     
     image_file = request.FILES['image']
     
-    # Validate file type
-    allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp']
-    if image_file.content_type not in allowed_types:
-        return Response({
-            'error': 'Invalid file type. Only JPEG, PNG, and WebP are allowed'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Validate file size (5MB max)
-    if image_file.size > 5 * 1024 * 1024:
+    # Validate file type and size (5MB max)
+    error = validate_upload(image_file)
+    if error:
         return Response({
-            'error': 'File too large. Maximum size is 5MB'
+            'error': error
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    img = None
-    output = None
-
     try:
-        # Open and optimize image
-        img = Image.open(image_file)
-
-        # Convert to RGB if necessary
-        if img.mode in ('RGBA', 'P'):
-            img = img.convert('RGB')
-
-        # Resize if too large (max 1920px width)
-        max_width = 1920
-        if img.width > max_width:
-            ratio = max_width / img.width
-            new_height = int(img.height * ratio)
-            img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-
-        # Save optimized image to BytesIO buffer
-        output = BytesIO()
-        img.save(output, format='JPEG', quality=85, optimize=True)
-        output.seek(0)
-
-        # Close PIL image immediately to free memory
-        img.close()
-        img = None
-
-        # Generate unique filename (always .jpg after conversion)
-        filename = f"listings/{listing.listing_id}/{uuid.uuid4().hex}.jpg"
-
-        # Save ONLY the converted file to storage
-        path = default_storage.save(filename, ContentFile(output.read()))
-        url = default_storage.url(path)
-
-        # Close buffer
-        output.close()
-        output = None
-
         # Get next display order
         max_order = ListingImage.objects.filter(listing_id=listing).count()
 
-        # Create image record
-        listing_image = ListingImage.objects.create(
-            listing_id=listing,
-            image_url=url,
-            is_primary=(max_order == 0),  # First image is primary
-            display_order=max_order
+        # Store the raw upload; the image pipeline optimises it in the background
+        listing_image = store_upload(
+            listing,
+            image_file,
+            display_order=max_order,
+            is_primary=(max_order == 0)  # First image is primary
         )
+        listing_image.save()
+        refresh_image_summary(listing.listing_id)
+        image_pipeline.enqueue([listing_image])
 
         return Response({
-            'message': 'Image uploaded successfully',
+            'message': 'Image uploaded, processing',
             'image': {
                 'listimage_id': listing_image.listimage_id,
                 'image_url': listing_image.image_url,
                 'is_primary': listing_image.is_primary,
-                'display_order': listing_image.display_order
+                'display_order': listing_image.display_order,
+                'processing_status': listing_image.processing_status
             }
         }, status=status.HTTP_201_CREATED)
 
@@ -764,14 +855,30 @@ def upload_listing_image(request, listing_id):
         return Response({
             'error': f'Error processing image: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    finally:
-        # Ensure cleanup of resources
-        if img:
-            img.close()
-        if output:
-            output.close()
-        # Django will automatically clean up temporary files from request.FILES
-        # after the request completes, so no manual deletion needed
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def listing_image_status(request, listing_id, image_id):
+    """
+    Get processing status of an uploaded image
+    GET /api/listings/{listing_id}/images/{image_id}/status/
+    """
+    listing = get_object_or_404(Listing, pk=listing_id)
+
+    # Check ownership
+    if listing.userid != request.user:
+        return Response({
+            'error': 'You do not have permission to view images of this listing'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    image = get_object_or_404(ListingImage, pk=image_id, listing_id=listing)
+    return Response({
+        'listimage_id': image.listimage_id,
+        'processing_status': image.processing_status,
+        'image': ListingImageSerializer(image, context={'request': request}).data,
+        'error': image.processing_error if image.processing_status == 'failed' else None
+    })
 
 
 @api_view(['DELETE'])
@@ -791,10 +898,9 @@ def delete_listing_image(request, listing_id, image_id):
     
     image = get_object_or_404(ListingImage, pk=image_id, listing_id=listing)
     
-    # Delete file from storage
+    # Delete files from storage
     try:
-        if default_storage.exists(image.image_url):
-            default_storage.delete(image.image_url)
+        delete_image_files(image)
     except Exception as e:
         print(f"Error deleting file: {e}")
     
@@ -807,6 +913,8 @@ def delete_listing_image(request, listing_id, image_id):
         if first_image:
             first_image.is_primary = True
             first_image.save()
+
+    refresh_image_summary(listing.listing_id)
     
     return Response({
         'message': 'Image deleted successfully'
@@ -835,6 +943,7 @@ def set_primary_image(request, listing_id, image_id):
     image = get_object_or_404(ListingImage, pk=image_id, listing_id=listing)
     image.is_primary = True
     image.save()
+    refresh_image_summary(listing.listing_id)
     
     return Response({
         'message': 'Primary image updated'
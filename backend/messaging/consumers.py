@@ -0,0 +1,68 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.db.models import Q
+
+from .models import Chat
+from .realtime import user_group
+from .utils import get_unread_total, mark_chat_read
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Real-time chat events for the authenticated user
+    WS /ws/chats/?token=<access token>
+
+    Server -> client events (JSON, keyed by "type"):
+        message.new    {chat_id, message}
+        message.read   {chat_id, reader_id, count, read_at}
+        unread.count   {unread_count, chat_id?, chat_unread_count?}
+    Client -> server:
+        {"type": "mark_read", "chat_id": 1}
+        {"type": "ping"}
+    """
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.user = user
+        self.group_name = user_group(user.pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        await self.send_json({
+            'type': 'unread.count',
+            'unread_count': await database_sync_to_async(get_unread_total)(user),
+        })
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        event_type = content.get('type')
+
+        if event_type == 'ping':
+            await self.send_json({'type': 'pong'})
+        elif event_type == 'mark_read':
+            marked = await self.mark_read(content.get('chat_id'))
+            if marked is None:
+                await self.send_json({'type': 'error', 'error': 'Chat not found'})
+        else:
+            await self.send_json({'type': 'error', 'error': f'Unknown event type: {event_type}'})
+
+    async def chat_event(self, event):
+        """Handler for events sent to the user's group by messaging.realtime"""
+        await self.send_json(event['payload'])
+
+    @database_sync_to_async
+    def mark_read(self, chat_id):
+        """Same as PUT /api/chats/{chat_id}/mark-read/; None if not a participant"""
+        try:
+            chat = Chat.objects.filter(
+                Q(userid=self.user) | Q(userid_as_seller=self.user)
+            ).get(pk=chat_id)
+        except (Chat.DoesNotExist, ValueError, TypeError):
+            return None
+        return mark_chat_read(chat, self.user)
@@ -0,0 +1,42 @@
+"""
+Django management command to rebuild the unread message counters.
+
+Usage:
+    python manage.py rebuild_unread_counters [--user 42]
+
+Recounts unread messages from MESSAGES and overwrites Chat.buyer_unread_count,
+Chat.seller_unread_count and User.unread_message_count, in case the
+incrementally maintained values drifted (manual edits, restored backups).
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from messaging.models import Chat
+from messaging.utils import rebuild_unread_counters
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-chat and per-user unread message counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='Only rebuild the counters of this user id and their chats',
+        )
+
+    def handle(self, *args, **options):
+        chats = users = None
+        if options['user']:
+            user_id = options['user']
+            chats = Chat.objects.filter(Q(userid=user_id) | Q(userid_as_seller=user_id))
+            users = User.objects.filter(pk=user_id)
+
+        self.stdout.write('🔄 Rebuilding unread counters...')
+        chat_count, user_count = rebuild_unread_counters(chats=chats, users=users)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rebuilt counters for {chat_count} chats and {user_count} users'
+        ))
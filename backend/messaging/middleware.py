@@ -0,0 +1,45 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from users.authentication import CachedJWTAuthentication
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    """Resolve a SimpleJWT access token to its user, or AnonymousUser"""
+    authentication = CachedJWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticate WebSocket connections with the same access tokens as the API.
+
+    Browsers can't set an Authorization header on a WebSocket handshake, so
+    the token is passed as ws://.../ws/chats/?token=<access token>. An
+    "Authorization: Bearer" header is accepted too, for non-browser clients.
+    """
+    async def __call__(self, scope, receive, send):
+        raw_token = self.get_raw_token(scope)
+        scope['user'] = await get_user_for_token(raw_token) if raw_token else AnonymousUser()
+        return await super().__call__(scope, receive, send)
+
+    def get_raw_token(self, scope):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        if query.get('token'):
+            return query['token'][0]
+
+        headers = dict(scope.get('headers', []))
+        auth = headers.get(b'authorization', b'').decode().split()
+        if len(auth) == 2 and auth[0] == 'Bearer':
+            return auth[1]
+        return None
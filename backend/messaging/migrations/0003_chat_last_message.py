@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_last_message(apps, schema_editor):
+    """Point every chat at its newest message"""
+    Chat = apps.get_model('messaging', 'Chat')
+    Message = apps.get_model('messaging', 'Message')
+
+    latest = Message.objects.filter(chat_id=OuterRef('pk')).order_by('-sentat', '-message_id')
+    Chat.objects.update(
+        last_message=Subquery(latest.values('message_id')[:1]),
+        last_message_at=Subquery(latest.values('sentat')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat',
+            name='last_message',
+            field=models.ForeignKey(blank=True, db_column='LAST_MESSAGE_ID', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.RunPython(backfill_last_message, migrations.RunPython.noop),
+    ]
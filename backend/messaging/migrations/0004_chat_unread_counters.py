@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+BACKFILL_UNREAD_COUNTERS = '''
+UPDATE "CHATS" c SET
+    "BUYER_UNREAD_COUNT" = (
+        SELECT COUNT(*) FROM "MESSAGES" m
+        WHERE m."CHAT_ID" = c."CHAT_ID" AND NOT m."IS_READ" AND m."USERID" <> c."USERID"
+    ),
+    "SELLER_UNREAD_COUNT" = (
+        SELECT COUNT(*) FROM "MESSAGES" m
+        WHERE m."CHAT_ID" = c."CHAT_ID" AND NOT m."IS_READ" AND m."USERID" <> c."USERID_AS_SELLER"
+    );
+
+UPDATE "USERS" u SET "UNREAD_MESSAGE_COUNT" =
+    COALESCE((SELECT SUM(c."BUYER_UNREAD_COUNT") FROM "CHATS" c WHERE c."USERID" = u."USERID"), 0)
+    + COALESCE((SELECT SUM(c."SELLER_UNREAD_COUNT") FROM "CHATS" c WHERE c."USERID_AS_SELLER" = u."USERID"), 0);
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_chat_last_message'),
+        ('users', '0003_user_unread_message_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat',
+            name='buyer_unread_count',
+            field=models.IntegerField(db_column='BUYER_UNREAD_COUNT', default=0),
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='seller_unread_count',
+            field=models.IntegerField(db_column='SELLER_UNREAD_COUNT', default=0),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['chat_id', 'userid'], name='messages_unread_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_UNREAD_COUNTERS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_chat_unread_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='MESSAGES_CHAT_ID_97a675_idx',
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat_id', 'sentat', 'message_id'], name='messages_chat_sentat_idx'),
+        ),
+    ]
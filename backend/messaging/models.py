@@ -27,6 +27,18 @@ class Chat(models.Model):
         related_name='chats_as_seller'
     )
     last_message_at = models.DateTimeField(null=True, blank=True, db_column='LAST_MESSAGE_AT')
+    # Denormalized so the inbox can join the latest message instead of querying per chat
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_column='LAST_MESSAGE_ID',
+        related_name='+'
+    )
+    # Unread messages for each participant, maintained by messaging.utils
+    buyer_unread_count = models.IntegerField(default=0, db_column='BUYER_UNREAD_COUNT')
+    seller_unread_count = models.IntegerField(default=0, db_column='SELLER_UNREAD_COUNT')
     is_active = models.BooleanField(default=True, db_column='IS_ACTIVE')
     createdat = models.DateTimeField(auto_now_add=True, db_column='CREATEDAT')
     
@@ -40,6 +52,12 @@ class Chat(models.Model):
     def __str__(self):
         return f"Chat between {self.userid.full_name} and {self.userid_as_seller.full_name}"
 
+    def unread_count_for(self, user):
+        """Unread messages waiting for the given participant"""
+        if user.pk == self.userid_id:
+            return self.buyer_unread_count
+        return self.seller_unread_count
+
 
 # ============================================================================
 # MESSAGES
@@ -65,8 +83,15 @@ class Message(models.Model):
     class Meta:
         db_table = 'MESSAGES'
         indexes = [
-            models.Index(fields=['chat_id']),
+            # History pages seek on (sentat, message_id) within a chat
+            models.Index(fields=['chat_id', 'sentat', 'message_id'], name='messages_chat_sentat_idx'),
             models.Index(fields=['sentat']),
+            # Unread lookups (mark-read, counter rebuild) only touch this small set
+            models.Index(
+                fields=['chat_id', 'userid'],
+                name='messages_unread_idx',
+                condition=models.Q(is_read=False)
+            ),
         ]
         ordering = ['sentat']
     
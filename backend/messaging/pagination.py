@@ -0,0 +1,148 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from users.serializers import UserPublicSerializer
+
+
+class MessageCursorPagination(BasePagination):
+    """
+    Cursor pagination for a chat's message history
+    GET /api/chats/{chat_id}/messages/?limit=50              newest page
+    GET /api/chats/{chat_id}/messages/?before=<cursor>       older messages
+    GET /api/chats/{chat_id}/messages/?after=<cursor>        newer messages
+    GET /api/chats/{chat_id}/messages/?after_id=<message_id> incremental fetch
+
+    Pages seek on (sentat, message_id) using the (chat_id, sentat, message_id)
+    index and are always returned oldest first. `previous` points at older
+    messages, `next` at newer ones. Each sender is serialized once per page
+    in `senders`, and messages only carry sender_id.
+    """
+    before_query_param = 'before'
+    after_query_param = 'after'
+    after_id_query_param = 'after_id'
+    limit_query_param = 'limit'
+    invalid_cursor_message = 'Invalid cursor'
+    page_size = 50
+    max_page_size = 200
+
+    @classmethod
+    def is_requested(cls, request):
+        """Plain-list responses stay the default for existing clients"""
+        params = (
+            cls.before_query_param, cls.after_query_param,
+            cls.after_id_query_param, cls.limit_query_param
+        )
+        return any(param in request.query_params for param in params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        for param in (self.before_query_param, self.after_query_param, self.after_id_query_param):
+            self.base_url = remove_query_param(self.base_url, param)
+        page_size = self.get_page_size(request)
+
+        before = self.decode_cursor(request.query_params.get(self.before_query_param))
+        after = self.decode_cursor(request.query_params.get(self.after_query_param))
+        after_id = request.query_params.get(self.after_id_query_param)
+
+        if after_id is not None:
+            try:
+                after_id = int(after_id)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(message_id__gt=after_id)
+            newer = True
+        elif after:
+            queryset = queryset.filter(self.get_seek_filter(after, 'gt'))
+            newer = True
+        else:
+            if before:
+                queryset = queryset.filter(self.get_seek_filter(before, 'lt'))
+            newer = False
+
+        if newer:
+            queryset = queryset.order_by('sentat', 'message_id')
+        else:
+            queryset = queryset.order_by('-sentat', '-message_id')
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+
+        if newer:
+            self.has_next = has_more
+            self.has_previous = True
+        else:
+            results.reverse()
+            self.has_next = before is not None
+            self.has_previous = has_more
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        senders = {}
+        for message in self.page:
+            senders.setdefault(message.userid_id, message.userid)
+
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'senders': UserPublicSerializer(list(senders.values()), many=True).data,
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_seek_filter(self, cursor, op):
+        sentat, message_id = cursor
+        # The redundant inclusive bound keeps the (chat_id, sentat, message_id) index range scan
+        return Q(**{f'sentat__{op}e': sentat}) & (
+            Q(**{f'sentat__{op}': sentat})
+            | Q(sentat=sentat, **{f'message_id__{op}': message_id})
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.after_query_param, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.build_link(self.before_query_param, self.page[0])
+
+    def build_link(self, param, message):
+        payload = {'t': message.sentat.isoformat(), 'id': message.message_id}
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode()
+        ).decode()
+        return replace_query_param(self.base_url, param, encoded)
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            sentat = parse_datetime(payload['t'])
+            message_id = int(payload['id'])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if sentat is None:
+            raise NotFound(self.invalid_cursor_message)
+        return sentat, message_id
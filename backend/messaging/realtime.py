@@ -0,0 +1,82 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from users.models import User
+from .models import Chat
+from .serializers import MessageSerializer
+
+
+def user_group(user_id):
+    """Channel layer group every open socket of a user joins"""
+    return f'user_{user_id}'
+
+
+def push(user_ids, payload):
+    """
+    Send an event to all of the users' open sockets once the current
+    transaction commits. Delivery is best effort: a missing or unreachable
+    channel layer must never fail the request that produced the event.
+    """
+    def send():
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        for user_id in user_ids:
+            try:
+                async_to_sync(channel_layer.group_send)(
+                    user_group(user_id),
+                    {'type': 'chat.event', 'payload': payload}
+                )
+            except Exception as e:
+                print(f"Error pushing {payload['type']} to user {user_id}: {e}")
+
+    transaction.on_commit(send)
+
+
+def unread_payload(user_id, chat_id):
+    """Current unread counters of a user, read from the database"""
+    total = User.objects.values_list('unread_message_count', flat=True).get(pk=user_id)
+    chat = Chat.objects.values('userid', 'buyer_unread_count', 'seller_unread_count').get(pk=chat_id)
+    chat_unread = chat['buyer_unread_count'] if chat['userid'] == user_id else chat['seller_unread_count']
+    return {
+        'type': 'unread.count',
+        'unread_count': total,
+        'chat_id': chat_id,
+        'chat_unread_count': chat_unread,
+    }
+
+
+def push_unread_count(user_id, chat_id):
+    """Push a user's unread counters after the current transaction commits"""
+    def send():
+        try:
+            payload = unread_payload(user_id, chat_id)
+        except (User.DoesNotExist, Chat.DoesNotExist):
+            return
+        push([user_id], payload)
+
+    transaction.on_commit(send)
+
+
+def push_new_message(chat, message, recipient_id):
+    """New message: to both participants (other tabs of the sender too)"""
+    push([chat.userid_id, chat.userid_as_seller_id], {
+        'type': 'message.new',
+        'chat_id': chat.chat_id,
+        'message': MessageSerializer(message).data,
+    })
+    push_unread_count(recipient_id, chat.chat_id)
+
+
+def push_messages_read(chat, reader, count, read_at):
+    """Read receipt to the sender, updated counters to the reader"""
+    sender_id = chat.userid_as_seller_id if reader.pk == chat.userid_id else chat.userid_id
+    push([sender_id, reader.pk], {
+        'type': 'message.read',
+        'chat_id': chat.chat_id,
+        'reader_id': reader.pk,
+        'count': count,
+        'read_at': read_at.isoformat(),
+    })
+    push_unread_count(reader.pk, chat.chat_id)
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
-from listings.serializers import ListingSerializer
+from listings.serializers import ListingCardSerializer
 from users.serializers import UserPublicSerializer
 from .models import (
     User, Chat, Message
@@ -25,10 +25,23 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['message_id', 'sentat', 'read_at']
 
 
+class MessagePageSerializer(serializers.ModelSerializer):
+    """Message in a paginated history page; senders are listed once per page"""
+    sender_id = serializers.IntegerField(source='userid_id', read_only=True)
+    
+    class Meta:
+        model = Message
+        fields = [
+            'message_id', 'sender_id', 'content', 'message_type',
+            'file_url', 'is_read', 'sentat', 'read_at'
+        ]
+        read_only_fields = fields
+
+
 class ChatSerializer(serializers.ModelSerializer):
     buyer = UserPublicSerializer(source='userid', read_only=True)
     seller = UserPublicSerializer(source='userid_as_seller', read_only=True)
-    listing = ListingSerializer(source='listing_id', read_only=True)
+    listing = ListingCardSerializer(source='listing_id', read_only=True)
     last_message = serializers.SerializerMethodField()
     unread_count = serializers.SerializerMethodField()
     
@@ -40,15 +53,13 @@ class ChatSerializer(serializers.ModelSerializer):
         ]
     
     def get_last_message(self, obj):
-        last_msg = obj.messages.last()
-        if last_msg:
-            return MessageSerializer(last_msg).data
+        # chat_list select_related()s last_message__userid
+        if obj.last_message:
+            return MessageSerializer(obj.last_message).data
         return None
     
     def get_unread_count(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.messages.filter(
-                is_read=False
-            ).exclude(userid=request.user).count()
-        return 0
\ No newline at end of file
+            return obj.unread_count_for(request.user)
+        return 0
@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from users.models import User
+from .models import Chat, Message
+from .realtime import push_messages_read, push_new_message
+
+
+def _unread_field(chat, user):
+    """Chat counter column holding the given participant's unread messages"""
+    return 'buyer_unread_count' if user.pk == chat.userid_id else 'seller_unread_count'
+
+
+def send_message(chat, sender, content, message_type='text'):
+    """
+    Create a message and bump the recipient's unread counters in the same
+    transaction, so a reader can never mark (and decrement for) a message
+    whose increment is not yet committed. Both participants' sockets get the
+    message once it commits.
+    """
+    recipient_id = chat.userid_as_seller_id if sender.pk == chat.userid_id else chat.userid_id
+    unread_field = 'seller_unread_count' if sender.pk == chat.userid_id else 'buyer_unread_count'
+
+    with transaction.atomic():
+        message = Message.objects.create(
+            userid=sender,
+            chat_id=chat,
+            content=content,
+            message_type=message_type
+        )
+        Chat.objects.filter(pk=chat.pk).update(
+            last_message=message,
+            last_message_at=message.sentat,
+            **{unread_field: F(unread_field) + 1}
+        )
+        User.objects.filter(pk=recipient_id).update(
+            unread_message_count=F('unread_message_count') + 1
+        )
+        push_new_message(chat, message, recipient_id)
+
+    chat.last_message = message
+    chat.last_message_at = message.sentat
+    return message
+
+
+def mark_chat_read(chat, user):
+    """
+    Mark the other participant's messages as read for user and take exactly
+    that many off the counters. Returns the number of messages marked.
+    Participants' sockets get a read receipt and the new counts.
+    """
+    unread_field = _unread_field(chat, user)
+    read_at = timezone.now()
+
+    with transaction.atomic():
+        updated = Message.objects.filter(
+            chat_id=chat,
+            is_read=False
+        ).exclude(userid=user).update(
+            is_read=True,
+            read_at=read_at
+        )
+        if updated:
+            Chat.objects.filter(pk=chat.pk).update(
+                **{unread_field: Greatest(F(unread_field) - updated, 0)}
+            )
+            User.objects.filter(pk=user.pk).update(
+                unread_message_count=Greatest(F('unread_message_count') - updated, 0)
+            )
+            push_messages_read(chat, user, updated, read_at)
+
+    if updated:
+        setattr(chat, unread_field, max(getattr(chat, unread_field) - updated, 0))
+    return updated
+
+
+def get_unread_total(user):
+    """Read the user's unread total from the database, not the cached instance"""
+    return User.objects.values_list('unread_message_count', flat=True).get(pk=user.pk)
+
+
+def rebuild_unread_counters(chats=None, users=None):
+    """
+    Recount unread messages from MESSAGES and overwrite the denormalized
+    counters. Returns (chats updated, users updated).
+    """
+    chats = Chat.objects.all() if chats is None else chats
+    users = User.objects.all() if users is None else users
+
+    def unread_from_other(participant):
+        return Coalesce(Subquery(
+            Message.objects.filter(
+                chat_id=OuterRef('pk'),
+                is_read=False
+            ).exclude(userid=OuterRef(participant)).order_by().values('chat_id').annotate(
+                total=Count('*')
+            ).values('total')
+        ), Value(0))
+
+    with transaction.atomic():
+        chat_count = chats.update(
+            buyer_unread_count=unread_from_other('userid'),
+            seller_unread_count=unread_from_other('userid_as_seller')
+        )
+
+        def chat_total(participant, field):
+            return Coalesce(Subquery(
+                Chat.objects.filter(**{participant: OuterRef('pk')}).order_by().values(participant).annotate(
+                    total=Sum(field)
+                ).values('total')
+            ), Value(0))
+
+        user_count = users.update(
+            unread_message_count=chat_total('userid', 'buyer_unread_count')
+            + chat_total('userid_as_seller', 'seller_unread_count')
+        )
+
+    return chat_count, user_count
@@ -5,11 +5,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Max
-from django.utils import timezone
+from django.db.models import F, Q
 
 from .models import Chat, Message
-from .serializers import ChatSerializer, MessageSerializer
+from .pagination import MessageCursorPagination
+from .serializers import ChatSerializer, MessagePageSerializer, MessageSerializer
+from .utils import get_unread_total, mark_chat_read, send_message
 from listings.models import Listing
 from users.serializers import UserPublicSerializer
 
@@ -21,15 +22,14 @@ def chat_list(request):
     Get all chats for current user
     GET /api/chats/
     """
-    # Get chats where user is either buyer or seller
+    # Get chats where user is either buyer or seller; the whole inbox is one query
     chats = Chat.objects.filter(
         Q(userid=request.user) | Q(userid_as_seller=request.user),
         is_active=True
     ).select_related(
-        'userid', 'userid_as_seller', 'listing_id'
-    ).annotate(
-        latest_message=Max('messages__sentat')
-    ).order_by('-latest_message')
+        'userid', 'userid_as_seller', 'listing_id__cat_id', 'listing_id__userid',
+        'listing_id__primary_image', 'last_message__userid'
+    ).order_by(F('last_message_at').desc(), '-createdat')
     
     serializer = ChatSerializer(chats, many=True, context={'request': request})
     return Response(serializer.data)
@@ -107,6 +107,9 @@ def chat_messages(request, chat_id):
     """
     Get all messages in a chat
     GET /api/chats/{chat_id}/messages/
+
+    Pass ?limit=, ?before=, ?after= or ?after_id= for cursor pages
+    (see MessageCursorPagination) instead of the full history.
     """
     chat = get_object_or_404(Chat, pk=chat_id)
     
@@ -116,18 +119,18 @@ def chat_messages(request, chat_id):
             'error': 'You do not have permission to view these messages'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    messages = chat.messages.all().select_related('userid').order_by('sentat')
-    serializer = MessageSerializer(messages, many=True)
-    
     # Mark messages as read (for the other user's messages)
-    Message.objects.filter(
-        chat_id=chat,
-        is_read=False
-    ).exclude(userid=request.user).update(
-        is_read=True,
-        read_at=timezone.now()
-    )
+    mark_chat_read(chat, request.user)
     
+    messages = chat.messages.all().select_related('userid')
+
+    if MessageCursorPagination.is_requested(request):
+        paginator = MessageCursorPagination()
+        page = paginator.paginate_queryset(messages, request)
+        serializer = MessagePageSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    serializer = MessageSerializer(messages.order_by('sentat'), many=True)
     return Response(serializer.data)
 
 
@@ -158,13 +161,8 @@ def message_send(request, chat_id):
             'error': 'Message content is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Create message
-    message = Message.objects.create(
-        userid=request.user,
-        chat_id=chat,
-        content=content,
-        message_type=message_type
-    )
+    # Create message, update the chat's last message and the unread counters
+    message = send_message(chat, request.user, content, message_type)
     
     # Notify the other user
     recipient = chat.userid_as_seller if request.user == chat.userid else chat.userid
@@ -175,13 +173,6 @@ def message_send(request, chat_id):
         chat_id=chat.chat_id
     )
     
-    # Update chat's last_message_at
-    chat.last_message_at = message.sentat
-    chat.save(update_fields=['last_message_at'])
-    
-    # TODO: Send notification to other user
-    # TODO: Send real-time update via WebSocket
-    
     serializer = MessageSerializer(message)
     return Response({
         'message': 'Message sent successfully',
@@ -205,13 +196,7 @@ def mark_messages_read(request, chat_id):
         }, status=status.HTTP_403_FORBIDDEN)
     
     # Mark all unread messages from other user as read
-    updated = Message.objects.filter(
-        chat_id=chat,
-        is_read=False
-    ).exclude(userid=request.user).update(
-        is_read=True,
-        read_at=timezone.now()
-    )
+    updated = mark_chat_read(chat, request.user)
     
     return Response({
         'message': f'{updated} messages marked as read'
@@ -225,15 +210,9 @@ def unread_count(request):
     Get total unread messages count for current user
     GET /api/chats/unread-count/
     """
-    count = Message.objects.filter(
-        chat_id__in=Chat.objects.filter(
-            Q(userid=request.user) | Q(userid_as_seller=request.user)
-        ),
-        is_read=False
-    ).exclude(userid=request.user).count()
-    
+    # Maintained incrementally on the user row; see messaging.utils
     return Response({
-        'unread_count': count
+        'unread_count': get_unread_total(request.user)
     })
 
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, OutboxMessage
 
 
 @admin.register(Notification)
@@ -21,3 +21,12 @@ class NotificationAdmin(admin.ModelAdmin):
             'fields': ('createdat',)
         }),
     )
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['outbox_id', 'channel', 'recipient', 'subject', 'status',
+                    'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['channel', 'status', 'createdat']
+    search_fields = ['recipient', 'subject', 'provider_message_id']
+    readonly_fields = ['createdat', 'sent_at', 'attempts', 'last_error', 'provider_message_id']
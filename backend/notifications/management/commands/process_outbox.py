@@ -0,0 +1,74 @@
+"""
+Django management command to deliver queued SMS and email messages.
+
+Usage:
+    python manage.py process_outbox                 # run as a worker
+    python manage.py process_outbox --once          # deliver what is due, then exit
+    python manage.py process_outbox --batch-size 200 --interval 2
+
+Run one or more workers alongside the web processes; rows are claimed with
+SKIP LOCKED, so workers never send the same message twice concurrently.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notifications.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued SMS and email messages from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Deliver everything currently due, then exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help='Messages claimed per batch',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to sleep when nothing is due',
+        )
+
+    def handle(self, *args, **options):
+        # One worker keeps one SMS gateway client for its whole lifetime
+        worker = OutboxWorker()
+        batch_size = options['batch_size']
+
+        if options['once']:
+            total = 0
+            while True:
+                claimed = worker.process_batch(batch_size)
+                total += claimed
+                if claimed < batch_size:
+                    break
+            self.stdout.write(self.style.SUCCESS(f'✅ Processed {total} outbox messages'))
+            return
+
+        self.stdout.write(f'📤 Outbox worker started (batch size {batch_size})')
+        try:
+            while True:
+                try:
+                    claimed = worker.process_batch(batch_size)
+                except Exception as e:
+                    self.stderr.write(f'Error processing outbox: {e}')
+                    claimed = 0
+                finally:
+                    close_old_connections()
+                if claimed:
+                    self.stdout.write(f'  ✓ Processed {claimed} messages')
+                if claimed < batch_size:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('✅ Outbox worker stopped'))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:57
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('outbox_id', models.AutoField(db_column='OUTBOX_ID', primary_key=True, serialize=False)),
+                ('channel', models.CharField(choices=[('sms', 'SMS'), ('email', 'Email')], db_column='CHANNEL', max_length=10)),
+                ('recipient', models.CharField(db_column='RECIPIENT', max_length=255)),
+                ('subject', models.CharField(blank=True, db_column='SUBJECT', max_length=255, null=True)),
+                ('body', models.TextField(db_column='BODY')),
+                ('html_template', models.CharField(blank=True, db_column='HTML_TEMPLATE', max_length=100, null=True)),
+                ('context', models.JSONField(blank=True, db_column='CONTEXT', default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], db_column='STATUS', default='pending', max_length=10)),
+                ('attempts', models.IntegerField(db_column='ATTEMPTS', default=0)),
+                ('next_attempt_at', models.DateTimeField(db_column='NEXT_ATTEMPT_AT', default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, db_column='LAST_ERROR', null=True)),
+                ('provider_message_id', models.CharField(blank=True, db_column='PROVIDER_MESSAGE_ID', max_length=100, null=True)),
+                ('createdat', models.DateTimeField(auto_now_add=True, db_column='CREATEDAT')),
+                ('sent_at', models.DateTimeField(blank=True, db_column='SENT_AT', null=True)),
+            ],
+            options={
+                'db_table': 'OUTBOX_MESSAGES',
+                'indexes': [models.Index(condition=models.Q(('status__in', ['pending', 'sending'])), fields=['next_attempt_at'], name='outbox_due_idx'), models.Index(fields=['recipient'], name='OUTBOX_MESS_RECIPIE_180221_idx'), models.Index(fields=['createdat'], name='OUTBOX_MESS_CREATED_b05d71_idx')],
+            },
+        ),
+    ]
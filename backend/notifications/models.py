@@ -1,5 +1,6 @@
 
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -46,3 +47,56 @@ class Notification(models.Model):
         return f"{self.notif_title} for {self.userid.full_name}"
 
 
+# ============================================================================
+# OUTBOX (SMS / EMAIL DELIVERY)
+# ============================================================================
+
+class OutboxMessage(models.Model):
+    """
+    An SMS or email waiting to be delivered. Requests only insert rows;
+    notifications.outbox delivers them from the process_outbox worker.
+    """
+    CHANNELS = [
+        ('sms', 'SMS'),
+        ('email', 'Email'),
+    ]
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    outbox_id = models.AutoField(primary_key=True, db_column='OUTBOX_ID')
+    channel = models.CharField(max_length=10, choices=CHANNELS, db_column='CHANNEL')
+    recipient = models.CharField(max_length=255, db_column='RECIPIENT')
+    subject = models.CharField(max_length=255, null=True, blank=True, db_column='SUBJECT')
+    # SMS text, or the plain-text part of an email
+    body = models.TextField(db_column='BODY')
+    # Email HTML is rendered by the worker, not the request
+    html_template = models.CharField(max_length=100, null=True, blank=True, db_column='HTML_TEMPLATE')
+    context = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, db_column='CONTEXT')
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending', db_column='STATUS')
+    attempts = models.IntegerField(default=0, db_column='ATTEMPTS')
+    # Earliest time the worker may (re)try; also the lease expiry while 'sending'
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_column='NEXT_ATTEMPT_AT')
+    last_error = models.TextField(null=True, blank=True, db_column='LAST_ERROR')
+    provider_message_id = models.CharField(max_length=100, null=True, blank=True, db_column='PROVIDER_MESSAGE_ID')
+    createdat = models.DateTimeField(auto_now_add=True, db_column='CREATEDAT')
+    sent_at = models.DateTimeField(null=True, blank=True, db_column='SENT_AT')
+
+    class Meta:
+        db_table = 'OUTBOX_MESSAGES'
+        indexes = [
+            # The worker only ever scans undelivered rows
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outbox_due_idx',
+                condition=models.Q(status__in=['pending', 'sending'])
+            ),
+            models.Index(fields=['recipient']),
+            models.Index(fields=['createdat']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.recipient} ({self.status})"
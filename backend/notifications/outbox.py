@@ -0,0 +1,241 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+# Africa's Talking per-recipient status codes that mean the gateway accepted the SMS
+SMS_ACCEPTED_CODES = {100, 101, 102}
+
+
+# ============================================================================
+# ENQUEUEING (request path)
+# ============================================================================
+
+def enqueue_sms(phone_number, message):
+    """Queue an SMS; the process_outbox worker delivers it"""
+    return _enqueue(OutboxMessage(channel='sms', recipient=phone_number, body=message))
+
+
+def enqueue_email(recipient, subject, body, html_template=None, context=None):
+    """Queue an email; html_template is rendered with context by the worker"""
+    return _enqueue(OutboxMessage(
+        channel='email',
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        html_template=html_template,
+        context=context or {}
+    ))
+
+
+def _enqueue(message):
+    message.save()
+    if settings.OUTBOX_EAGER:
+        transaction.on_commit(lambda: OutboxWorker().deliver([message]))
+    return message
+
+
+# ============================================================================
+# DELIVERY (worker)
+# ============================================================================
+
+class SmsGateway:
+    """
+    Africa's Talking client, initialised once per worker. Without
+    credentials (or in DEBUG) messages are printed to the console instead.
+    """
+    def __init__(self):
+        self._sms = None
+
+    @property
+    def console(self):
+        return settings.DEBUG or not settings.AFRICAS_TALKING_USERNAME
+
+    def get_client(self):
+        if self._sms is None:
+            import africastalking
+
+            africastalking.initialize(
+                username=settings.AFRICAS_TALKING_USERNAME,
+                api_key=settings.AFRICAS_TALKING_API_KEY
+            )
+            self._sms = africastalking.SMS
+        return self._sms
+
+    def send(self, messages):
+        """
+        Send SMS rows, one API call per distinct text. Returns
+        {outbox_id: (provider_message_id, error)}.
+        """
+        results = {}
+        messages = sorted(messages, key=lambda message: message.body)
+        for body, group in groupby(messages, key=lambda message: message.body):
+            group = list(group)
+            if self.console:
+                for message in group:
+                    self.print_sms(message)
+                    results[message.outbox_id] = (None, None)
+                continue
+
+            try:
+                response = self.get_client().send(
+                    message=body,
+                    recipients=[message.recipient for message in group],
+                    sender_id=settings.AFRICAS_TALKING_SENDER_ID or None
+                )
+                recipients = {
+                    entry['number']: entry
+                    for entry in response['SMSMessageData']['Recipients']
+                }
+            except Exception as e:
+                for message in group:
+                    results[message.outbox_id] = (None, str(e))
+                continue
+
+            for message in group:
+                entry = recipients.get(message.recipient)
+                if entry is None:
+                    results[message.outbox_id] = (None, 'Recipient missing from gateway response')
+                elif entry.get('statusCode') in SMS_ACCEPTED_CODES:
+                    results[message.outbox_id] = (entry.get('messageId'), None)
+                else:
+                    results[message.outbox_id] = (None, entry.get('status') or 'Rejected by gateway')
+        return results
+
+    def print_sms(self, message):
+        print(f"\n{'='*60}")
+        print(f"📱 SMS MESSAGE")
+        print(f"{'='*60}")
+        print(f"To: {message.recipient}")
+        print(f"Message: {message.body}")
+        print(f"{'='*60}\n")
+
+
+class EmailSender:
+    """Sends a batch of email rows over one connection to the email backend"""
+
+    def send(self, messages):
+        """Returns {outbox_id: (provider_message_id, error)}"""
+        results = {}
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            return {message.outbox_id: (None, str(e)) for message in messages}
+
+        try:
+            for message in messages:
+                try:
+                    email = EmailMultiAlternatives(
+                        subject=message.subject or '',
+                        body=message.body,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        to=[message.recipient],
+                        connection=connection
+                    )
+                    if message.html_template:
+                        email.attach_alternative(
+                            render_to_string(message.html_template, message.context),
+                            'text/html'
+                        )
+                    email.send()
+                    results[message.outbox_id] = (None, None)
+                except Exception as e:
+                    results[message.outbox_id] = (None, str(e))
+        finally:
+            connection.close()
+        return results
+
+
+class OutboxWorker:
+    """
+    Claims due outbox rows in batches and delivers them.
+
+    Rows are claimed by moving them to 'sending' with a lease
+    (next_attempt_at in the future) under SELECT ... FOR UPDATE SKIP LOCKED,
+    so several workers can run side by side and a row abandoned by a crashed
+    worker becomes due again when its lease expires. Failures are retried
+    with exponential backoff until OUTBOX_MAX_ATTEMPTS.
+    """
+    lease = timedelta(minutes=5)
+
+    def __init__(self):
+        self.senders = {
+            'sms': SmsGateway(),
+            'email': EmailSender(),
+        }
+
+    def claim(self, batch_size):
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                    status__in=['pending', 'sending'],
+                    next_attempt_at__lte=now
+                ).order_by('next_attempt_at').values_list('outbox_id', flat=True)[:batch_size]
+            )
+            if ids:
+                OutboxMessage.objects.filter(outbox_id__in=ids).update(
+                    status='sending',
+                    attempts=F('attempts') + 1,
+                    next_attempt_at=now + self.lease
+                )
+        return list(OutboxMessage.objects.filter(outbox_id__in=ids))
+
+    def process_batch(self, batch_size=None):
+        """Deliver one batch of due messages; returns how many were claimed"""
+        messages = self.claim(batch_size or settings.OUTBOX_BATCH_SIZE)
+        self.deliver(messages, claimed=True)
+        return len(messages)
+
+    def deliver(self, messages, claimed=False):
+        if not claimed:
+            # Eager delivery of freshly queued rows skips the claim step
+            OutboxMessage.objects.filter(
+                outbox_id__in=[message.outbox_id for message in messages]
+            ).update(status='sending', attempts=F('attempts') + 1,
+                     next_attempt_at=timezone.now() + self.lease)
+            for message in messages:
+                message.attempts += 1
+
+        messages = sorted(messages, key=lambda message: message.channel)
+        for channel, group in groupby(messages, key=lambda message: message.channel):
+            group = list(group)
+            try:
+                results = self.senders[channel].send(group)
+            except Exception as e:
+                results = {message.outbox_id: (None, str(e)) for message in group}
+            for message in group:
+                provider_message_id, error = results.get(message.outbox_id, (None, 'No result'))
+                self.record(message, provider_message_id, error)
+
+    def record(self, message, provider_message_id, error):
+        now = timezone.now()
+        if error is None:
+            OutboxMessage.objects.filter(pk=message.pk).update(
+                status='sent',
+                sent_at=now,
+                provider_message_id=provider_message_id,
+                last_error=None
+            )
+        elif message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            OutboxMessage.objects.filter(pk=message.pk).update(
+                status='failed',
+                last_error=error[:1000]
+            )
+            print(f"Outbox {message.channel} to {message.recipient} failed: {error}")
+        else:
+            delay = settings.OUTBOX_RETRY_SECONDS * 2 ** (message.attempts - 1)
+            OutboxMessage.objects.filter(pk=message.pk).update(
+                status='pending',
+                next_attempt_at=now + timedelta(seconds=min(delay, 3600)),
+                last_error=error[:1000]
+            )
@@ -2,6 +2,9 @@
 ASGI config for umuhuza_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; WebSocket connections (ws/chats/) are
+authenticated with SimpleJWT access tokens and routed to the messaging
+consumers.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +16,23 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'umuhuza_api.settings')
 
-application = get_asgi_application()
+# Initialise Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import OriginValidator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from messaging.middleware import JWTAuthMiddleware  # noqa: E402
+from messaging.routing import websocket_urlpatterns  # noqa: E402
+
+# The React frontend connects cross-origin, so accept the CORS origins too
+allowed_origins = list(settings.CORS_ALLOWED_ORIGINS) + list(settings.ALLOWED_HOSTS)
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': OriginValidator(
+        JWTAuthMiddleware(URLRouter(websocket_urlpatterns)),
+        allowed_origins
+    ),
+})
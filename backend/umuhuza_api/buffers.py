@@ -0,0 +1,58 @@
+import atexit
+import threading
+
+from django.db import close_old_connections
+
+
+class PeriodicFlusher:
+    """
+    Calls flush() from a daemon thread every `interval` seconds, on demand via
+    wake(), and one last time at interpreter exit.
+
+    In-process write buffers use this so request threads only touch memory
+    and the database sees a few batched writes instead of one per request.
+    The thread starts lazily, after any pre-fork in the app server.
+    """
+    def __init__(self, flush, interval, name='flusher'):
+        self.flush = flush
+        self.interval = interval
+        self.name = name
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def wake(self):
+        """Flush now instead of waiting for the interval (size threshold hit)"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        self._flush_safely()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stopped.is_set():
+                self._flush_safely()
+
+    def _flush_safely(self):
+        try:
+            self.flush()
+        except Exception as e:
+            # Never let a failed flush kill the thread; the buffer retries next time
+            print(f"{self.name} flush error: {e}")
+        finally:
+            close_old_connections()
@@ -0,0 +1,410 @@
+import copy
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+from rest_framework.response import Response
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+
+class LocalLRU:
+    """
+    Small per-process LRU with per-entry expiry. Values are kept as-is (no
+    pickling), so callers must treat what they get back as read-only.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    """
+    Two-tier cache: a per-process LRU in front of the 'shared' Django cache
+    (Redis, or the file-based cache without CACHE_REDIS_URL).
+
+    Invalidation is versioned. Namespaces and tags each have a version
+    number stored in the shared tier. A namespace version is baked into its
+    keys, so invalidate(namespace) drops the whole namespace; each entry also
+    records the versions of its tags when it was stored, and
+    invalidate_tags() bumps those so only the entries carrying them go stale.
+    Versions are values of one shared generation counter, incremented by
+    every invalidation: set(since=generation()) refuses a value computed
+    before one of its tags was bumped.
+    Every process sees a bump at once in the shared tier and re-reads
+    versions at most every RESPONSE_CACHE_VERSION_SECONDS, which bounds how
+    long other processes may keep serving entries from before it. The local
+    copies are an LRU of RESPONSE_CACHE_VERSION_MAX_ENTRIES tags.
+
+    Entries outlive their timeout by RESPONSE_CACHE_STALE_SECONDS: past it
+    they are served stale while one background refresh recomputes them.
+    acquire()/release() give single-flight per key, across threads (an
+    in-process event) and processes (a lock key in the shared tier), so a
+    hot miss or refresh queries the database once.
+    """
+    def __init__(self, alias='shared'):
+        self.alias = alias
+        self.local = LocalLRU(settings.RESPONSE_CACHE_LOCAL_MAX_ENTRIES)
+        self._versions = LocalLRU(settings.RESPONSE_CACHE_VERSION_MAX_ENTRIES)
+        self._inflight = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {
+            'local_hits': 0, 'shared_hits': 0, 'stale_hits': 0,
+            'misses': 0, 'coalesced': 0, 'invalidated': 0, 'refreshes': 0, 'discarded': 0,
+        })
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def version_key(self, name):
+        return f'ns:{name}:version'
+
+    generation_key = 'ns:generation'
+
+    def generation(self):
+        """Current invalidation generation; read it before computing a value to set()"""
+        generation = self.shared.get(self.generation_key)
+        if generation is None:
+            # Time-based so a lost counter never repeats versions handed out before
+            self.shared.add(self.generation_key, int(time.time() * 1000000), timeout=None)
+            generation = self.shared.get(self.generation_key)
+        return generation
+
+    def get_versions(self, names):
+        """{name: version} for namespaces/tags, from the local copy while it is fresh"""
+        versions, missing = {}, []
+        for name in names:
+            version = self._versions.get(name)
+            if version is not None:
+                versions[name] = version
+            else:
+                missing.append(name)
+        if not missing:
+            return versions
+
+        keys = {self.version_key(name): name for name in missing}
+        found = self.shared.get_many(list(keys))
+        for key, name in keys.items():
+            version = found.get(key)
+            if version is None:
+                # Never invalidated (or evicted). Negative so it never refuses a
+                # set(), and unlike any version handed out before
+                self.shared.add(key, -self.generation(), timeout=None)
+                version = self.shared.get(key)
+            versions[name] = version
+
+        for name in missing:
+            self._versions.set(name, versions[name], settings.RESPONSE_CACHE_VERSION_SECONDS)
+        return versions
+
+    def make_key(self, namespace, key):
+        return f'{namespace}:v{self.get_versions([namespace])[namespace]}:{key}'
+
+    def is_current(self, entry):
+        tags = entry['tags']
+        return not tags or self.get_versions(tags) == tags
+
+    def lookup(self, namespace, key):
+        """
+        (entry, tier) for a stored entry that no tag invalidated, fresh or
+        stale (see is_fresh), with tier 'local' or 'shared'; (None, None) if absent
+        """
+        full_key = self.make_key(namespace, key)
+
+        entry = self.local.get(full_key)
+        tier = 'local'
+        if entry is None:
+            entry = self.shared.get(full_key)
+            tier = 'shared'
+
+        if entry is not None and not self.is_current(entry):
+            self.local.delete(full_key)
+            self.record(namespace, 'invalidated')
+            return None, None
+        if entry is None:
+            return None, None
+
+        if tier == 'shared':
+            remaining = entry['fresh_until'] + settings.RESPONSE_CACHE_STALE_SECONDS - time.time()
+            if remaining > 0:
+                self.local.set(full_key, entry, min(remaining, settings.RESPONSE_CACHE_LOCAL_SECONDS))
+        return entry, tier
+
+    def is_fresh(self, entry):
+        return entry['fresh_until'] > time.time()
+
+    def get(self, namespace, key):
+        """Fresh value or None"""
+        entry, tier = self.lookup(namespace, key)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry['value']
+
+    def set(self, namespace, key, value, timeout, tags=(), since=None):
+        """
+        Store value unless, with since=generation() taken before computing
+        it, the namespace or one of tags was invalidated in the meantime
+        (value may predate the change). Returns whether it was stored.
+        """
+        versions = self.get_versions(set(tags) | {namespace})
+        if since is not None and any(version > since for version in versions.values()):
+            self.record(namespace, 'discarded')
+            return False
+
+        full_key = f'{namespace}:v{versions.pop(namespace)}:{key}'
+        entry = {
+            'value': value,
+            'tags': versions,
+            'fresh_until': time.time() + timeout,
+        }
+        lifetime = timeout + settings.RESPONSE_CACHE_STALE_SECONDS
+        self.shared.set(full_key, entry, lifetime)
+        self.local.set(full_key, entry, min(lifetime, settings.RESPONSE_CACHE_LOCAL_SECONDS))
+        return True
+
+    # ------------------------------------------------------------------
+    # Single-flight
+    # ------------------------------------------------------------------
+
+    def lock_key(self, name):
+        return f'lock:{name}'
+
+    def acquire(self, name):
+        """True if the caller is now the only one computing `name`"""
+        with self._lock:
+            if name in self._inflight:
+                return False
+            self._inflight[name] = threading.Event()
+
+        if self.shared.add(self.lock_key(name), 1, timeout=settings.RESPONSE_CACHE_LOCK_SECONDS):
+            return True
+        # Another process holds it
+        self._finish(name)
+        return False
+
+    def release(self, name):
+        self.shared.delete(self.lock_key(name))
+        self._finish(name)
+
+    def _finish(self, name):
+        with self._lock:
+            event = self._inflight.pop(name, None)
+        if event is not None:
+            event.set()
+
+    def wait(self, name, timeout):
+        """Block until this process's computation of `name` ends, or poll briefly"""
+        timeout = max(0, timeout)
+        event = self._inflight.get(name)
+        if event is not None:
+            event.wait(timeout)
+        else:
+            time.sleep(min(timeout, 0.05))
+
+    def refresh_in_background(self, name, job):
+        """Run job() once on the refresh pool unless `name` is being computed already"""
+        if not self.acquire(name):
+            return False
+
+        def run():
+            try:
+                job()
+            except Exception as e:
+                print(f"Cache refresh error for {name}: {e}")
+            finally:
+                self.release(name)
+                close_old_connections()
+
+        self.get_executor().submit(run)
+        return True
+
+    def get_executor(self):
+        # Created lazily so the threads start after any pre-fork in the app server
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.RESPONSE_CACHE_REFRESH_WORKERS,
+                        thread_name_prefix='cache-refresh'
+                    )
+        return self._executor
+
+    def invalidate(self, namespace):
+        """Drop every entry in namespace, in all processes"""
+        self.invalidate_tags([namespace])
+
+    def invalidate_tags(self, tags):
+        """Make every entry stored with any of these tags stale, in all processes"""
+        try:
+            version = self.shared.incr(self.generation_key)
+        except ValueError:
+            # Never read yet (or evicted)
+            self.generation()
+            version = self.shared.incr(self.generation_key)
+
+        for tag in set(tags):
+            self.shared.set(self.version_key(tag), version, timeout=None)
+            self._versions.set(tag, version, settings.RESPONSE_CACHE_VERSION_SECONDS)
+
+    def record(self, namespace, counter):
+        with self._lock:
+            self._stats[namespace][counter] += 1
+
+    def stats(self):
+        """Hit/miss counters of this process, per namespace"""
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._stats.items()}
+
+
+tiered_cache = TieredCache()
+
+
+def plain_data(data):
+    """Serializer output without its .serializer backlink (kept in the local tier)"""
+    if isinstance(data, ReturnList):
+        return list(data)
+    if isinstance(data, ReturnDict):
+        return dict(data)
+    return data
+
+
+def refresh_request(request):
+    """
+    Copy of a GET's HttpRequest marked as a background refresh. Dispatching
+    it again builds a new Request and view instance, so the refresh shares
+    no per-request state (such as a view's paginator) with the request
+    that was answered stale.
+    """
+    http_request = copy.copy(request._request)
+    http_request.is_cache_refresh = True
+    return http_request
+
+
+def cache_response(namespace, timeout, tags=None, condition=None, key=None):
+    """
+    Cache successful GET responses of a DRF view in tiered_cache.
+    Goes under @api_view (or method_decorator on a view method); entries
+    are keyed by absolute URL (cards embed absolute image URLs) and the
+    X-Cache header reports how the request was answered. `tags(request,
+    data, **view_kwargs)` names the tags the response depends on, and
+    `condition(request)` can limit caching to some requests, and
+    `key(request)` replace the URL as the cache key.
+
+    Stale entries are served while one background refresh rebuilds them,
+    by dispatching a copy of the request (refresh_request) through the URL's
+    view again. On a miss, concurrent requests for the same URL wait for the one
+    that computes it instead of all querying the database.
+
+        @api_view(['GET'])
+        @cache_response('categories', timeout=600, tags=category_tags)
+        def category_detail(request, pk): ...
+    """
+    def decorator(view):
+        def compute(request, args, kwargs, cache_key):
+            generation = tiered_cache.generation()
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                data = plain_data(response.data)
+                entry_tags = tags(request, data, **kwargs) if tags else ()
+                tiered_cache.set(namespace, cache_key, data, timeout, tags=entry_tags, since=generation)
+            return response
+
+        def refresh(request, args, kwargs, cache_key):
+            match = request.resolver_match
+            if match is None:
+                # Called outside URL routing: recompute with this request
+                compute(request, args, kwargs, cache_key)
+            else:
+                match.func(refresh_request(request), *match.args, **match.kwargs)
+
+        def cached_response(entry, label):
+            response = Response(entry['value'])
+            response['X-Cache'] = label
+            return response
+
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if (request.method != 'GET' or not settings.RESPONSE_CACHE_ENABLED
+                    or (condition and not condition(request))):
+                return view(request, *args, **kwargs)
+
+            raw_key = key(request) if key else request.build_absolute_uri()
+            cache_key = hashlib.md5(raw_key.encode()).hexdigest()
+            if getattr(request, 'is_cache_refresh', False):
+                # Dispatched by refresh(), which holds the key's lock
+                return compute(request, args, kwargs, cache_key)
+
+            entry, tier = tiered_cache.lookup(namespace, cache_key)
+            if entry is not None and tiered_cache.is_fresh(entry):
+                tiered_cache.record(namespace, f'{tier}_hits')
+                return cached_response(entry, f'HIT-{tier.upper()}')
+
+            name = tiered_cache.make_key(namespace, cache_key)
+            if entry is not None:
+                if tiered_cache.refresh_in_background(name, lambda: refresh(request, args, kwargs, cache_key)):
+                    tiered_cache.record(namespace, 'refreshes')
+                tiered_cache.record(namespace, 'stale_hits')
+                return cached_response(entry, 'STALE')
+
+            tiered_cache.record(namespace, 'misses')
+            deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_SECONDS
+            while True:
+                if tiered_cache.acquire(name):
+                    try:
+                        response = compute(request, args, kwargs, cache_key)
+                    finally:
+                        tiered_cache.release(name)
+                    response['X-Cache'] = 'MISS'
+                    return response
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Someone else is computing it: wait for their result
+                tiered_cache.wait(name, remaining)
+                entry, tier = tiered_cache.lookup(namespace, cache_key)
+                if entry is not None and tiered_cache.is_fresh(entry):
+                    tiered_cache.record(namespace, 'coalesced')
+                    return cached_response(entry, 'HIT-COALESCED')
+
+            # They failed or gave a non-cacheable answer; compute it here
+            response = view(request, *args, **kwargs)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapped
+    return decorator
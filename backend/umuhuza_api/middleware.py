@@ -1,4 +1,10 @@
-from users.models import ActivityLog
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+from users.models import ActivityLog, User
+from .buffers import PeriodicFlusher
 
 
 def get_client_ip(request):
@@ -11,52 +17,102 @@ def get_client_ip(request):
     return ip
 
 
+class ActivityLogWriter:
+    """
+    Buffered ActivityLog writer.
+
+    add() only appends an unsaved ActivityLog to an in-memory list. A
+    background flusher bulk_create()s the list every ACTIVITY_LOG_FLUSH_SECONDS,
+    as soon as ACTIVITY_LOG_MAX_PENDING records are waiting, and at shutdown.
+    """
+    def __init__(self):
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flusher = PeriodicFlusher(
+            self.flush,
+            interval=settings.ACTIVITY_LOG_FLUSH_SECONDS,
+            name='activity-log-writer'
+        )
+
+    def add(self, log):
+        with self._lock:
+            self._pending.append(log)
+            buffered = len(self._pending)
+
+        self._flusher.start()
+        if buffered >= settings.ACTIVITY_LOG_MAX_PENDING:
+            self._flusher.wake()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        try:
+            # A user deleted since the request would fail the whole insert
+            user_ids = {log.userid_id for log in batch if log.userid_id}
+            existing = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+            for log in batch:
+                if log.userid_id not in existing:
+                    log.userid_id = None
+            ActivityLog.objects.bulk_create(batch, batch_size=500)
+        except Exception:
+            # Put the records back so a transient DB error doesn't lose them,
+            # unless the buffer has grown past any reasonable backlog
+            with self._lock:
+                if len(self._pending) + len(batch) <= settings.ACTIVITY_LOG_MAX_PENDING * 10:
+                    self._pending[:0] = batch
+            raise
+
+        return len(batch)
+
+
+activity_log_writer = ActivityLogWriter()
+
+
 class ActivityLogMiddleware:
     """
     Middleware to log important user actions
     """
+    # URL name -> logged action
+    actions = {
+        'login': 'user_login',
+        'register': 'user_register',
+        'listing-create': 'listing_create',
+        'payment-initiate': 'payment_initiate',
+        'dealer-application-create': 'dealer_application',
+        'report-create': 'report_submit',
+    }
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
+
     def __call__(self, request):
         response = self.get_response(request)
-        
+
         # Log specific actions after response
         if request.user.is_authenticated and request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
             self.log_action(request, response)
-        
+
         return response
-    
+
     def log_action(self, request, response):
-        """Log user actions"""
-        path = request.path
-        
-        # Define loggable actions
-        actions = {
-            '/api/auth/login/': 'user_login',
-            '/api/auth/register/': 'user_register',
-            '/api/listings/create/': 'listing_create',
-            '/api/payments/initiate/': 'payment_initiate',
-            '/api/dealer-applications/create/': 'dealer_application',
-            '/api/reports/create/': 'report_submit',
-        }
-        
-        action_type = None
-        for pattern, action in actions.items():
-            if pattern in path:
-                action_type = action
-                break
-        
+        """Queue a log record for tracked, successful actions"""
+        resolver_match = request.resolver_match
+        action_type = self.actions.get(resolver_match.url_name) if resolver_match else None
+
         # Log if it's a tracked action and response is successful
         if action_type and 200 <= response.status_code < 300:
             try:
-                ActivityLog.objects.create(
-                    userid=request.user,
+                activity_log_writer.add(ActivityLog(
+                    userid_id=request.user.pk,
                     action_type=action_type,
-                    description=f"{request.method} {path}",
+                    description=f"{request.method} {request.path}",
                     ip_address=get_client_ip(request),
-                    user_agent=request.META.get('HTTP_USER_AGENT', '')[:500]
-                )
+                    user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
+                    createdat=timezone.now()
+                ))
             except Exception as e:
                 # Don't let logging errors break the app
-                print(f"Activity log error: {e}")
\ No newline at end of file
+                print(f"Activity log error: {e}")
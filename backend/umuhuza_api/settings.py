@@ -3,6 +3,7 @@ Django settings for umuhuza_api project.
 """
 
 import os
+import tempfile
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
@@ -20,18 +21,21 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1').split(','
 
 # Application definition
 INSTALLED_APPS = [
+    'daphne',  # ASGI runserver (HTTP + WebSockets); must come before staticfiles
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
     'django_filters',
+    'channels',
     
     # Local apps
     'users.apps.UsersConfig',
@@ -72,6 +76,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'umuhuza_api.wsgi.application'
+ASGI_APPLICATION = 'umuhuza_api.asgi.application'
 
 # Database
 DATABASES = {
@@ -127,7 +132,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -226,6 +231,97 @@ AFRICAS_TALKING_SENDER_ID = os.environ.get('AFRICAS_TALKING_SENDER_ID', 'UMUHUZA
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 
+# Listing view counter: repeat views by the same viewer inside the dedup
+# window are ignored, and buffered counts are written every flush interval
+# (or sooner once that many listings are pending).
+LISTING_VIEW_DEDUP_SECONDS = config('LISTING_VIEW_DEDUP_SECONDS', default=1800, cast=int)
+LISTING_VIEW_FLUSH_SECONDS = config('LISTING_VIEW_FLUSH_SECONDS', default=10, cast=int)
+LISTING_VIEW_MAX_PENDING = config('LISTING_VIEW_MAX_PENDING', default=1000, cast=int)
+
+# Listing image pipeline: uploads are optimised by a pool of worker
+# processes after the request returns. EAGER processes them inline on commit
+# (useful for tests and single-process debugging).
+IMAGE_PIPELINE_WORKERS = config('IMAGE_PIPELINE_WORKERS', default=2, cast=int)
+IMAGE_PIPELINE_EAGER = config('IMAGE_PIPELINE_EAGER', default=False, cast=bool)
+
+# Caches: 'default' is per-process memory (JWT users, listing view dedup).
+# 'shared' is seen by every process: Redis when CACHE_REDIS_URL is set,
+# otherwise files under CACHE_DIR (fine for a single server).
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'umuhuza-local',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+        'KEY_PREFIX': 'umuhuza',
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'umuhuza-cache')),
+        'KEY_PREFIX': 'umuhuza',
+    },
+}
+
+# Response cache (umuhuza_api/cache.py): a per-process LRU of up to
+# LOCAL_MAX_ENTRIES responses, each kept LOCAL_SECONDS at most, in front of
+# the 'shared' cache. Processes re-check invalidations every VERSION_SECONDS,
+# keeping the versions of up to VERSION_MAX_ENTRIES tags in between.
+# Expired responses are still served for STALE_SECONDS while one of
+# REFRESH_WORKERS background threads rebuilds them; a key is computed by one
+# request at a time, others wait up to LOCK_SECONDS for its result.
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_LOCAL_MAX_ENTRIES = config('RESPONSE_CACHE_LOCAL_MAX_ENTRIES', default=1000, cast=int)
+RESPONSE_CACHE_LOCAL_SECONDS = config('RESPONSE_CACHE_LOCAL_SECONDS', default=30, cast=int)
+RESPONSE_CACHE_VERSION_SECONDS = config('RESPONSE_CACHE_VERSION_SECONDS', default=2, cast=int)
+RESPONSE_CACHE_VERSION_MAX_ENTRIES = config('RESPONSE_CACHE_VERSION_MAX_ENTRIES', default=10000, cast=int)
+RESPONSE_CACHE_STALE_SECONDS = config('RESPONSE_CACHE_STALE_SECONDS', default=300, cast=int)
+RESPONSE_CACHE_REFRESH_WORKERS = config('RESPONSE_CACHE_REFRESH_WORKERS', default=2, cast=int)
+RESPONSE_CACHE_LOCK_SECONDS = config('RESPONSE_CACHE_LOCK_SECONDS', default=10, cast=int)
+
+# Search-as-you-type: each process keeps the completions of up to
+# MAX_ENTRIES recent queries for SUGGEST_CACHE_SECONDS.
+SUGGEST_CACHE_MAX_ENTRIES = config('SUGGEST_CACHE_MAX_ENTRIES', default=5000, cast=int)
+SUGGEST_CACHE_SECONDS = config('SUGGEST_CACHE_SECONDS', default=60, cast=int)
+
+# Authenticated requests reuse the JWT's user from the local cache for this
+# long; saving or deleting a user bumps its auth version in the 'shared'
+# cache, which every process notices within RESPONSE_CACHE_VERSION_SECONDS.
+JWT_USER_CACHE_SECONDS = config('JWT_USER_CACHE_SECONDS', default=60, cast=int)
+
+# Activity log: tracked actions are buffered in memory and bulk inserted
+# every flush interval (or sooner once that many records are pending).
+ACTIVITY_LOG_FLUSH_SECONDS = config('ACTIVITY_LOG_FLUSH_SECONDS', default=5, cast=int)
+ACTIVITY_LOG_MAX_PENDING = config('ACTIVITY_LOG_MAX_PENDING', default=500, cast=int)
+
+# SMS/email outbox: requests queue messages and `manage.py process_outbox`
+# delivers them in batches, retrying failures with exponential backoff
+# (RETRY_SECONDS, doubled per attempt, capped at an hour). EAGER delivers
+# inline on commit instead (tests, debugging without a worker).
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=100, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOX_RETRY_SECONDS = config('OUTBOX_RETRY_SECONDS', default=60, cast=int)
+OUTBOX_EAGER = config('OUTBOX_EAGER', default=False, cast=bool)
+
+# Channel layer for WebSocket pushes (ws/chats/). The in-memory layer only
+# reaches sockets served by the same process: fine for tests and single-node
+# deploys. Set CHANNEL_REDIS_URL to fan out across processes/servers.
+CHANNEL_REDIS_URL = config('CHANNEL_REDIS_URL', default='')
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_REDIS_URL]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
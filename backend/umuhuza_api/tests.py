@@ -0,0 +1,130 @@
+import hashlib
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from .cache import LocalLRU, cache_response, tiered_cache
+
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-shared'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES, RESPONSE_CACHE_ENABLED=True, RESPONSE_CACHE_LOCK_SECONDS=5)
+class CacheResponseTests(SimpleTestCase):
+    def setUp(self):
+        tiered_cache.shared.clear()
+        tiered_cache.local = LocalLRU(100)
+        tiered_cache._versions = LocalLRU(100)
+        self.factory = APIRequestFactory()
+        self.calls = 0
+        self.compute_seconds = 0
+
+    def make_view(self, **options):
+        @api_view(['GET'])
+        @cache_response('tests', timeout=60, **options)
+        def view(request):
+            self.calls += 1
+            time.sleep(self.compute_seconds)
+            return Response({'calls': self.calls})
+        return view
+
+    def get(self, view, path='/api/things/'):
+        return view(self.factory.get(path))
+
+    def cache_key(self, path):
+        return hashlib.md5(f'http://testserver{path}'.encode()).hexdigest()
+
+    def wait_until_fresh(self, path='/api/things/'):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            entry, _ = tiered_cache.lookup('tests', self.cache_key(path))
+            if entry is not None and tiered_cache.is_fresh(entry):
+                return entry
+            time.sleep(0.01)
+        self.fail('background refresh did not store a fresh entry')
+
+    def expire(self, path='/api/things/'):
+        """Make the stored entry stale in both tiers"""
+        full_key = tiered_cache.make_key('tests', self.cache_key(path))
+        entry = dict(tiered_cache.shared.get(full_key), fresh_until=time.time() - 1)
+        tiered_cache.shared.set(full_key, entry, 60)
+        tiered_cache.local.set(full_key, entry, 60)
+
+    def test_miss_then_hit(self):
+        view = self.make_view()
+        first = self.get(view)
+        second = self.get(view)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT-LOCAL')
+        self.assertEqual(second.data, {'calls': 1})
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_misses_compute_once(self):
+        view = self.make_view()
+        self.compute_seconds = 0.2
+        results = []
+
+        def request():
+            results.append(self.get(view)['X-Cache'])
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(results), ['HIT-COALESCED'] * 3 + ['MISS'])
+
+    def test_stale_entry_served_while_refreshed(self):
+        view = self.make_view()
+        self.get(view)
+        self.expire()
+
+        stale = self.get(view)
+        self.assertEqual(stale['X-Cache'], 'STALE')
+        self.assertEqual(stale.data, {'calls': 1})
+
+        entry = self.wait_until_fresh()
+        self.assertEqual(entry['value'], {'calls': 2})
+        self.assertEqual(self.get(view)['X-Cache'], 'HIT-LOCAL')
+
+    def test_invalidated_tag_is_recomputed(self):
+        view = self.make_view(tags=lambda request, data: ['things'])
+        self.get(view)
+        tiered_cache.invalidate_tags(['things'])
+
+        response = self.get(view)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data, {'calls': 2})
+
+    def test_set_refused_after_invalidation_during_compute(self):
+        generation = tiered_cache.generation()
+        tiered_cache.invalidate_tags(['things'])
+
+        self.assertFalse(tiered_cache.set('tests', 'key', 1, 60, tags=['things'], since=generation))
+        self.assertIsNone(tiered_cache.get('tests', 'key'))
+        self.assertTrue(tiered_cache.set('tests', 'key', 1, 60, tags=['other'], since=generation))
+        self.assertEqual(tiered_cache.get('tests', 'key'), 1)
+
+    def test_local_versions_are_bounded(self):
+        tiered_cache._versions = LocalLRU(2)
+        tiered_cache.get_versions(['a', 'b', 'c'])
+        self.assertIsNone(tiered_cache._versions.get('a'))
+        self.assertIsNotNone(tiered_cache._versions.get('c'))
+
+    @override_settings(RESPONSE_CACHE_VERSION_SECONDS=0)
+    def test_expired_local_versions_are_dropped(self):
+        tiered_cache.get_versions(['a'])
+        self.assertIsNone(tiered_cache._versions.get('a'))
+        self.assertEqual(len(tiered_cache._versions._entries), 0)
+
+    def test_wait_accepts_expired_deadline(self):
+        tiered_cache.wait('nothing', -1)
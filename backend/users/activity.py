@@ -0,0 +1,175 @@
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ActivityDailyRollup, ActivityLog
+
+
+# ============================================================================
+# ACTIVITY_LOGS PARTITIONS
+# ============================================================================
+# ACTIVITY_LOGS is range-partitioned by CREATEDAT, one partition per UTC month
+# named ACTIVITY_LOGS_YYYY_MM, plus ACTIVITY_LOGS_DEFAULT for stray rows
+# (see users/migrations/0005_partition_activity_logs.py).
+
+PARENT_TABLE = 'ACTIVITY_LOGS'
+DEFAULT_PARTITION = 'ACTIVITY_LOGS_DEFAULT'
+PARTITION_NAME_RE = re.compile(r'^ACTIVITY_LOGS_(\d{4})_(\d{2})$')
+
+
+def month_start(value):
+    """First instant (UTC) of the month containing value"""
+    value = value.astimezone(dt_timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    return f'{PARENT_TABLE}_{month:%Y_%m}'
+
+
+def list_partitions():
+    """{month start: partition name} for the monthly partitions currently attached"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            '''
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            ''',
+            [PARENT_TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            month = datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)
+            partitions[month] = name
+    return partitions
+
+
+def create_partition(month):
+    """
+    Create the partition for month. Rows for that month already sitting in
+    the default partition are moved into it first (PostgreSQL refuses to
+    create an overlapping partition otherwise). Returns rows moved.
+    """
+    name = partition_name(month)
+    bounds = [month, add_months(month, 1)]
+    quoted = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT COUNT(*) FROM {quoted(DEFAULT_PARTITION)} '
+            f'WHERE "CREATEDAT" >= %s AND "CREATEDAT" < %s',
+            bounds
+        )
+        stray = cursor.fetchone()[0]
+
+        if not stray:
+            cursor.execute(
+                f'CREATE TABLE {quoted(name)} PARTITION OF {quoted(PARENT_TABLE)} '
+                f'FOR VALUES FROM (%s) TO (%s)',
+                bounds
+            )
+            return 0
+
+        cursor.execute(
+            f'CREATE TABLE {quoted(name)} '
+            f'(LIKE {quoted(PARENT_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'INSERT INTO {quoted(name)} SELECT * FROM {quoted(DEFAULT_PARTITION)} '
+            f'WHERE "CREATEDAT" >= %s AND "CREATEDAT" < %s',
+            bounds
+        )
+        cursor.execute(
+            f'DELETE FROM {quoted(DEFAULT_PARTITION)} '
+            f'WHERE "CREATEDAT" >= %s AND "CREATEDAT" < %s',
+            bounds
+        )
+        cursor.execute(
+            f'ALTER TABLE {quoted(PARENT_TABLE)} ATTACH PARTITION {quoted(name)} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            bounds
+        )
+        return stray
+
+
+def ensure_partitions(months_ahead=3, now=None):
+    """Create missing partitions from this month to months_ahead; returns names created"""
+    current = month_start(now or timezone.now())
+    existing = list_partitions()
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            create_partition(month)
+            created.append(partition_name(month))
+    return created
+
+
+def detach_old_partitions(retain_months, drop=False, now=None):
+    """
+    Detach partitions older than retain_months full months. Detached
+    partitions stay behind as plain tables (for pg_dump/archiving) unless
+    drop is set. Returns names detached.
+    """
+    cutoff = add_months(month_start(now or timezone.now()), -retain_months)
+    quoted = connection.ops.quote_name
+    detached = []
+
+    for month, name in sorted(list_partitions().items()):
+        if month >= cutoff:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {quoted(PARENT_TABLE)} DETACH PARTITION {quoted(name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {quoted(name)}')
+        detached.append(name)
+    return detached
+
+
+# ============================================================================
+# DAILY ROLLUPS
+# ============================================================================
+
+def rollup_activity(since):
+    """
+    Recompute ActivityDailyRollup for every day from `since` (a date, in the
+    site timezone) through today with one grouped query. Returns rows upserted.
+    """
+    start = timezone.make_aware(datetime.combine(since, time.min))
+    counts = ActivityLog.objects.filter(createdat__gte=start).annotate(
+        day=TruncDate('createdat')
+    ).order_by().values('day', 'action_type').annotate(total=Count('*'))
+
+    rollups = [
+        ActivityDailyRollup(day=row['day'], action_type=row['action_type'], action_count=row['total'])
+        for row in counts
+    ]
+    ActivityDailyRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=['day', 'action_type'],
+        update_fields=['action_count', 'updatedat'],
+        batch_size=1000
+    )
+    return len(rollups)
+
+
+def default_rollup_start(days=2):
+    """Today and the previous days-1 days, in the site timezone"""
+    return timezone.localdate() - timedelta(days=days - 1)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import ActivityLog
+from .models import ActivityLog, ActivityDailyRollup
 from .models import User
 from .models import User, VerificationCode
 from .models import User, VerificationCode, UserBadge
@@ -55,4 +55,15 @@ class ActivityLogAdmin(admin.ModelAdmin):
     readonly_fields = ['createdat']
     
     def has_add_permission(self, request):
-        return False  # Logs are created automatically
\ No newline at end of file
+        return False  # Logs are created automatically
+
+
+@admin.register(ActivityDailyRollup)
+class ActivityDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'action_type', 'action_count', 'updatedat']
+    list_filter = ['action_type']
+    date_hierarchy = 'day'
+    readonly_fields = ['day', 'action_type', 'action_count', 'updatedat']
+    
+    def has_add_permission(self, request):
+        return False  # Rollups are computed from ActivityLog
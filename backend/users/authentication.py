@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from umuhuza_api.cache import tiered_cache
+
+
+def auth_version_tag(user_id):
+    return f'auth-user:{user_id}'
+
+
+def user_cache_key(user_id):
+    """Local cache key for a user at its current auth version"""
+    tag = auth_version_tag(user_id)
+    return f'jwt-user:{user_id}:v{tiered_cache.get_versions([tag])[tag]}'
+
+
+def evict_cached_user(user_id):
+    """Bump a user's auth version so no process serves its cached copy (see users.signals)"""
+    tiered_cache.invalidate_tags([auth_version_tag(user_id)])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps resolved users in the local cache for
+    JWT_USER_CACHE_SECONDS instead of loading the USERS row on every request.
+
+    Entries are keyed on the user's auth version, kept in the shared cache
+    and bumped whenever the user is saved or deleted: deactivation and
+    password changes apply immediately in the process that made them and
+    within RESPONSE_CACHE_VERSION_SECONDS everywhere else. The is_active and revoked-token
+    (password hash) checks still run against the cached user on every
+    request. The cache pickles values, so each request gets its own copy.
+
+    Only safe (read) requests use cached users: write views save
+    request.user, and a stale copy must never be written back.
+    """
+    use_cache = True
+
+    def authenticate(self, request):
+        self.use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        key = user_cache_key(user_id)
+        user = cache.get(key) if self.use_cache else None
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                ) from e
+            cache.set(key, user, timeout=settings.JWT_USER_CACHE_SECONDS)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
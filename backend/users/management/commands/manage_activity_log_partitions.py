@@ -0,0 +1,56 @@
+"""
+Django management command to maintain the monthly ACTIVITY_LOGS partitions.
+
+Usage:
+    python manage.py manage_activity_log_partitions [--ahead 3]
+    python manage.py manage_activity_log_partitions --retain-months 12 [--drop]
+
+Creates partitions for the current month and the next --ahead months (run it
+at least monthly, e.g. from cron). With --retain-months, partitions older
+than that many full months are detached from ACTIVITY_LOGS and left as plain
+tables to archive, or dropped with --drop.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.activity import detach_old_partitions, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming ACTIVITY_LOGS partitions and detach old ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=3,
+            help='Number of future months to create partitions for',
+        )
+        parser.add_argument(
+            '--retain-months',
+            type=int,
+            help='Detach partitions older than this many full months',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop detached partitions instead of keeping them as tables',
+        )
+
+    def handle(self, *args, **options):
+        if options['drop'] and options['retain_months'] is None:
+            raise CommandError('--drop requires --retain-months')
+        if options['retain_months'] is not None and options['retain_months'] < 1:
+            raise CommandError('--retain-months must be at least 1')
+
+        created = ensure_partitions(options['ahead'])
+        for name in created:
+            self.stdout.write(f'  ✓ Created {name}')
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(created)} partitions created'))
+
+        if options['retain_months'] is not None:
+            detached = detach_old_partitions(options['retain_months'], drop=options['drop'])
+            action = 'Dropped' if options['drop'] else 'Detached'
+            for name in detached:
+                self.stdout.write(f'  ✓ {action} {name}')
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(detached)} partitions {action.lower()}'))
@@ -0,0 +1,45 @@
+"""
+Django management command to refresh the daily activity rollups.
+
+Usage:
+    python manage.py rollup_activity_logs                     # today and yesterday
+    python manage.py rollup_activity_logs --days 7
+    python manage.py rollup_activity_logs --since 2025-01-01  # backfill
+
+Counts ACTIVITY_LOGS rows per action type and day into ACTIVITY_DAILY_ROLLUPS.
+Days are recomputed, not incremented, so re-running is always safe.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.activity import default_rollup_start, rollup_activity
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily ActivityLog counts per action type'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Recompute this many days, ending today',
+        )
+        parser.add_argument(
+            '--since',
+            help='Recompute every day from this date (YYYY-MM-DD)',
+        )
+
+    def handle(self, *args, **options):
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date like 2025-01-31')
+        else:
+            since = default_rollup_start(max(options['days'], 1))
+
+        rows = rollup_activity(since)
+        self.stdout.write(self.style.SUCCESS(f'✅ {rows} daily rollups refreshed since {since}'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_add_role_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_message_count',
+            field=models.IntegerField(db_column='UNREAD_MESSAGE_COUNT', default=0),
+        ),
+    ]
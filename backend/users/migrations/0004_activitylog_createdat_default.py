@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_unread_message_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activitylog',
+            name='createdat',
+            field=models.DateTimeField(db_column='CREATEDAT', default=django.utils.timezone.now, editable=False),
+        ),
+    ]
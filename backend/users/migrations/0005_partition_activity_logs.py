@@ -0,0 +1,103 @@
+# Rebuild ACTIVITY_LOGS as a table range-partitioned by CREATEDAT month.
+#
+# PostgreSQL requires the partition key in the primary key, so the table's
+# PK becomes (LOG_ID, CREATEDAT); LOG_ID stays unique through its identity
+# sequence and Django keeps treating it as the primary key. Monthly
+# partitions (ACTIVITY_LOGS_YYYY_MM, UTC months) are created for the
+# existing rows and the next three months; ACTIVITY_LOGS_DEFAULT catches
+# anything outside them. Future partitions come from the
+# manage_activity_log_partitions command.
+
+from django.db import migrations
+
+
+PARTITION_ACTIVITY_LOGS = '''
+ALTER TABLE "ACTIVITY_LOGS" RENAME TO "ACTIVITY_LOGS_UNPARTITIONED";
+
+-- Free the identity sequence name for the new table
+DO $$
+BEGIN
+    EXECUTE format(
+        'ALTER SEQUENCE %s RENAME TO %I',
+        pg_get_serial_sequence('"ACTIVITY_LOGS_UNPARTITIONED"', 'LOG_ID'),
+        'ACTIVITY_LOGS_UNPARTITIONED_LOG_ID_seq'
+    );
+END $$;
+
+CREATE TABLE "ACTIVITY_LOGS" (
+    "LOG_ID" integer GENERATED BY DEFAULT AS IDENTITY,
+    "ACTION_TYPE" varchar(100) NOT NULL,
+    "ENTITY_TYPE" varchar(50) NULL,
+    "ENTITY_ID" integer NULL,
+    "DESCRIPTION" text NULL,
+    "IP_ADDRESS" inet NULL,
+    "USER_AGENT" text NULL,
+    "CREATEDAT" timestamp with time zone NOT NULL,
+    "USERID" integer NULL
+) PARTITION BY RANGE ("CREATEDAT");
+
+CREATE TABLE "ACTIVITY_LOGS_DEFAULT" PARTITION OF "ACTIVITY_LOGS" DEFAULT;
+
+DO $$
+DECLARE
+    month timestamptz;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', COALESCE(
+                (SELECT MIN("CREATEDAT") FROM "ACTIVITY_LOGS_UNPARTITIONED"), now()
+            ) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+            date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' + interval '3 months',
+            interval '1 month'
+        )
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF "ACTIVITY_LOGS" FOR VALUES FROM (%L) TO (%L)',
+            'ACTIVITY_LOGS_' || to_char(month AT TIME ZONE 'UTC', 'YYYY_MM'),
+            month,
+            month + interval '1 month'
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO "ACTIVITY_LOGS" (
+    "LOG_ID", "ACTION_TYPE", "ENTITY_TYPE", "ENTITY_ID", "DESCRIPTION",
+    "IP_ADDRESS", "USER_AGENT", "CREATEDAT", "USERID"
+)
+SELECT
+    "LOG_ID", "ACTION_TYPE", "ENTITY_TYPE", "ENTITY_ID", "DESCRIPTION",
+    "IP_ADDRESS", "USER_AGENT", "CREATEDAT", "USERID"
+FROM "ACTIVITY_LOGS_UNPARTITIONED";
+
+SELECT setval(
+    pg_get_serial_sequence('"ACTIVITY_LOGS"', 'LOG_ID'),
+    COALESCE((SELECT MAX("LOG_ID") FROM "ACTIVITY_LOGS"), 0) + 1,
+    false
+);
+
+DROP TABLE "ACTIVITY_LOGS_UNPARTITIONED";
+
+ALTER TABLE "ACTIVITY_LOGS" ADD CONSTRAINT "ACTIVITY_LOGS_pkey" PRIMARY KEY ("LOG_ID", "CREATEDAT");
+
+-- Same names as the indexes Django created, so later migrations still find them
+CREATE INDEX "ACTIVITY_LOGS_USERID_9704599d" ON "ACTIVITY_LOGS" ("USERID");
+CREATE INDEX "ACTIVITY_LO_USERID_778fcd_idx" ON "ACTIVITY_LOGS" ("USERID");
+CREATE INDEX "ACTIVITY_LO_ACTION__0642b9_idx" ON "ACTIVITY_LOGS" ("ACTION_TYPE");
+CREATE INDEX "ACTIVITY_LO_ENTITY__c6dadb_idx" ON "ACTIVITY_LOGS" ("ENTITY_TYPE", "ENTITY_ID");
+CREATE INDEX "ACTIVITY_LO_CREATED_2f8afa_idx" ON "ACTIVITY_LOGS" ("CREATEDAT");
+
+ALTER TABLE "ACTIVITY_LOGS"
+    ADD CONSTRAINT "ACTIVITY_LOGS_USERID_9704599d_fk_USERS_USERID"
+    FOREIGN KEY ("USERID") REFERENCES "USERS" ("USERID") DEFERRABLE INITIALLY DEFERRED;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_activitylog_createdat_default'),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_ACTIVITY_LOGS, migrations.RunSQL.noop),
+    ]
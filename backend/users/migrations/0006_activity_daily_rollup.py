@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_partition_activity_logs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityDailyRollup',
+            fields=[
+                ('rollup_id', models.AutoField(db_column='ROLLUP_ID', primary_key=True, serialize=False)),
+                ('day', models.DateField(db_column='DAY')),
+                ('action_type', models.CharField(db_column='ACTION_TYPE', max_length=100)),
+                ('action_count', models.IntegerField(db_column='ACTION_COUNT', default=0)),
+                ('updatedat', models.DateTimeField(auto_now=True, db_column='UPDATEDAT')),
+            ],
+            options={
+                'db_table': 'ACTIVITY_DAILY_ROLLUPS',
+                'ordering': ['-day', 'action_type'],
+                'indexes': [models.Index(fields=['action_type', 'day'], name='ACTIVITY_DA_ACTION__93de58_idx')],
+                'unique_together': {('day', 'action_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:03
+
+from django.db import migrations, models
+
+
+BACKFILL_RATING_AGGREGATES = '''
+UPDATE "USERS" u SET
+    "RATING_COUNT" = r.rating_count,
+    "RATING_SUM" = r.rating_sum,
+    "RATING_AVG" = ROUND(r.rating_sum::numeric / r.rating_count, 2)
+FROM (
+    SELECT "REVIEWED_USERID", COUNT(*) AS rating_count, SUM("RATING") AS rating_sum
+    FROM "RATINGS_N_REVIEWS"
+    WHERE "IS_VISIBLE"
+    GROUP BY "REVIEWED_USERID"
+) r
+WHERE r."REVIEWED_USERID" = u."USERID";
+'''
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_activity_daily_rollup'),
+        ('listings', '0011_listing_image_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='rating_avg',
+            field=models.DecimalField(db_column='RATING_AVG', decimal_places=2, default=0, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating_count',
+            field=models.IntegerField(db_column='RATING_COUNT', default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating_sum',
+            field=models.IntegerField(db_column='RATING_SUM', default=0),
+        ),
+        migrations.RunSQL(BACKFILL_RATING_AGGREGATES, migrations.RunSQL.noop),
+    ]
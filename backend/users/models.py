@@ -85,6 +85,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     reset_password_token = models.CharField(max_length=100, null=True, blank=True, db_column='RESET_PASSWORD_TOKEN')
     reset_password_expires = models.DateTimeField(null=True, blank=True, db_column='RESET_PASSWORD_EXPIRES')
     
+    # Unread messages across all chats, maintained by messaging.utils
+    unread_message_count = models.IntegerField(default=0, db_column='UNREAD_MESSAGE_COUNT')
+    
+    # Visible reviews received, maintained by listings.ratings
+    rating_count = models.IntegerField(default=0, db_column='RATING_COUNT')
+    rating_sum = models.IntegerField(default=0, db_column='RATING_SUM')
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0, db_column='RATING_AVG')
+    
     # Timestamps
     last_login = models.DateTimeField(null=True, blank=True, db_column='LAST_LOGIN')
     date_joined = models.DateTimeField(auto_now_add=True, db_column='DATE_JOINED')
@@ -107,9 +115,21 @@ class User(AbstractBaseUser, PermissionsMixin):
             models.Index(fields=['is_verified']),
         ]
     
+    # Counters changed with F() updates by other requests; a plain save() of a
+    # stale instance must not write them back
+    COUNTER_FIELDS = ('unread_message_count', 'rating_count', 'rating_sum', 'rating_avg')
+    
     def __str__(self):
         return f"{self.user_firstname} {self.user_lastname} ({self.email})"
     
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
     @property
     def full_name(self):
         return f"{self.user_firstname} {self.user_lastname}"
@@ -220,7 +240,8 @@ class ActivityLog(models.Model):
     description = models.TextField(null=True, blank=True, db_column='DESCRIPTION')
     ip_address = models.GenericIPAddressField(null=True, blank=True, db_column='IP_ADDRESS')
     user_agent = models.TextField(null=True, blank=True, db_column='USER_AGENT')
-    createdat = models.DateTimeField(auto_now_add=True, db_column='CREATEDAT')
+    # Set by the caller (not auto_now_add) so buffered logs keep the request time
+    createdat = models.DateTimeField(default=timezone.now, editable=False, db_column='CREATEDAT')
     
     class Meta:
         db_table = 'ACTIVITY_LOGS'
@@ -234,3 +255,26 @@ class ActivityLog(models.Model):
     def __str__(self):
         user = self.userid.full_name if self.userid else "Anonymous"
         return f"{user} - {self.action_type} at {self.createdat}"
+
+
+class ActivityDailyRollup(models.Model):
+    """
+    Number of ActivityLog rows per action type and day, so analytics never
+    scan the raw (partitioned) log. Refreshed by `manage.py rollup_activity_logs`.
+    """
+    rollup_id = models.AutoField(primary_key=True, db_column='ROLLUP_ID')
+    day = models.DateField(db_column='DAY')
+    action_type = models.CharField(max_length=100, db_column='ACTION_TYPE')
+    action_count = models.IntegerField(default=0, db_column='ACTION_COUNT')
+    updatedat = models.DateTimeField(auto_now=True, db_column='UPDATEDAT')
+    
+    class Meta:
+        db_table = 'ACTIVITY_DAILY_ROLLUPS'
+        unique_together = [['day', 'action_type']]
+        indexes = [
+            models.Index(fields=['action_type', 'day']),
+        ]
+        ordering = ['-day', 'action_type']
+    
+    def __str__(self):
+        return f"{self.action_type} on {self.day}: {self.action_count}"
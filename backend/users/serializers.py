@@ -77,7 +77,8 @@ class UserPublicSerializer(serializers.ModelSerializer):
         model = User
         fields = [
             'userid', 'full_name', 'user_firstname', 'user_lastname',
-            'profile_photo', 'user_role', 'is_verified', 'date_joined'
+            'profile_photo', 'user_role', 'is_verified', 'date_joined',
+            'rating_count', 'rating_sum', 'rating_avg'
         ]
 
 
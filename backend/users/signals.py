@@ -1,11 +1,19 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 
+from .authentication import evict_cached_user
 from .models import User
 
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_jwt_user_cache(sender, instance, **kwargs):
+    """Saved/deleted users must not be served from the JWT user cache"""
+    evict_cached_user(instance.pk)
+
+
 @receiver(post_save, sender=User)
 def assign_free_tier_to_new_user(sender, instance, created, **kwargs):
     """
@@ -1,8 +1,8 @@
 from django.utils import timezone
 from datetime import timedelta
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.conf import settings
+
+from notifications.outbox import enqueue_email, enqueue_sms
 from .models import UserBadge
 
 
@@ -32,8 +32,7 @@ def check_and_award_badges(user):
     """
     Check user activity and award appropriate badges
     """
-    from listings.models import Listing, RatingReview
-    from django.db.models import Avg
+    from listings.models import Listing
     
     # Verified Badge (both email and phone verified)
     if user.email_verified and user.phone_verified and not user.is_verified:
@@ -42,14 +41,11 @@ def check_and_award_badges(user):
         award_badge(user, 'verified')
     
     # Trusted Seller Badge (5+ listings, avg rating 4+)
-    if user.user_role == 'seller':
+    # (the rating is read from the user row; listings are only counted if it qualifies)
+    if user.user_role == 'seller' and user.rating_avg >= 4:
         listing_count = Listing.objects.filter(userid=user, listing_status='active').count()
-        avg_rating = RatingReview.objects.filter(
-            reviewed_userid=user,
-            is_visible=True
-        ).aggregate(Avg('rating'))['rating__avg'] or 0
         
-        if listing_count >= 5 and avg_rating >= 4.0:
+        if listing_count >= 5:
             award_badge(user, 'trusted_seller', expires_days=365)
     
     # Top Dealer Badge (10+ active listings, dealer role)
@@ -72,45 +68,13 @@ def revoke_badge(user, badge_type):
 
 def send_sms(phone_number, message):
     """
-    Send SMS using Africa's Talking API
+    Queue an SMS for delivery via Africa's Talking
 
-    For development, SMS content is printed to console.
-    For production, configure Africa's Talking credentials.
+    The process_outbox worker sends it (printed to the console in
+    development or without Africa's Talking credentials).
     """
-    # Development mode - print to console
-    if settings.DEBUG or not hasattr(settings, 'AFRICAS_TALKING_USERNAME'):
-        print(f"\n{'='*60}")
-        print(f"📱 SMS MESSAGE")
-        print(f"{'='*60}")
-        print(f"To: {phone_number}")
-        print(f"Message: {message}")
-        print(f"{'='*60}\n")
-        return True
-
-    # Production mode - use Africa's Talking
-    try:
-        import africastalking
-
-        # Initialize SDK
-        africastalking.initialize(
-            username=settings.AFRICAS_TALKING_USERNAME,
-            api_key=settings.AFRICAS_TALKING_API_KEY
-        )
-
-        # Get SMS service
-        sms = africastalking.SMS
-
-        # Send SMS
-        response = sms.send(
-            message=message,
-            recipients=[phone_number],
-            sender_id=getattr(settings, 'AFRICAS_TALKING_SENDER_ID', None)
-        )
-
-        return True
-    except Exception as e:
-        print(f"Error sending SMS: {str(e)}")
-        return False
+    enqueue_sms(phone_number, message)
+    return True
 
 
 def send_phone_verification_sms(user, code):
@@ -174,6 +138,7 @@ Login to view and reply: umuhuza.bi/messages
 # ============================================================================
 # EMAIL UTILITIES
 # ============================================================================
+# Emails are queued in the outbox; the worker renders the HTML template.
 
 def send_welcome_email(user, verification_url):
     """
@@ -185,15 +150,12 @@ def send_welcome_email(user, verification_url):
         'base_url': settings.FRONTEND_URL or 'http://localhost:5173',
     }
 
-    html_message = render_to_string('emails/welcome.html', context)
-
-    send_mail(
+    enqueue_email(
+        recipient=user.email,
         subject='Welcome to Umuhuza!',
-        message=f'Welcome {user.full_name}! Please verify your email: {verification_url}',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-        html_message=html_message,
-        fail_silently=False,
+        body=f'Welcome {user.full_name}! Please verify your email: {verification_url}',
+        html_template='emails/welcome.html',
+        context=context,
     )
 
 
@@ -208,15 +170,12 @@ def send_verification_email(user, verification_url, verification_code):
         'base_url': settings.FRONTEND_URL or 'http://localhost:5173',
     }
 
-    html_message = render_to_string('emails/verify_email.html', context)
-
-    send_mail(
+    enqueue_email(
+        recipient=user.email,
         subject='Verify Your Email - Umuhuza',
-        message=f'Hi {user.full_name}, please verify your email: {verification_url}',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-        html_message=html_message,
-        fail_silently=False,
+        body=f'Hi {user.full_name}, please verify your email: {verification_url}',
+        html_template='emails/verify_email.html',
+        context=context,
     )
 
 
@@ -230,15 +189,12 @@ def send_password_reset_email(user, reset_url):
         'base_url': settings.FRONTEND_URL or 'http://localhost:5173',
     }
 
-    html_message = render_to_string('emails/password_reset.html', context)
-
-    send_mail(
+    enqueue_email(
+        recipient=user.email,
         subject='Reset Your Password - Umuhuza',
-        message=f'Hi {user.full_name}, reset your password: {reset_url}',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-        html_message=html_message,
-        fail_silently=False,
+        body=f'Hi {user.full_name}, reset your password: {reset_url}',
+        html_template='emails/password_reset.html',
+        context=context,
     )
 
 
@@ -260,15 +216,12 @@ def send_new_message_email(recipient, sender, message_content, listing=None, cha
         'base_url': settings.FRONTEND_URL or 'http://localhost:5173',
     }
 
-    html_message = render_to_string('emails/new_message.html', context)
-
-    send_mail(
+    enqueue_email(
+        recipient=recipient.email,
         subject=f'New message from {sender.full_name} - Umuhuza',
-        message=f'{sender.full_name} sent you a message: {message_content[:100]}...',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[recipient.email],
-        html_message=html_message,
-        fail_silently=True,  # Don't break if email fails
+        body=f'{sender.full_name} sent you a message: {message_content[:100]}...',
+        html_template='emails/new_message.html',
+        context=context,
     )
 
 
@@ -294,13 +247,10 @@ def send_new_review_email(recipient, reviewer, rating, comment, average_rating,
         'base_url': settings.FRONTEND_URL or 'http://localhost:5173',
     }
 
-    html_message = render_to_string('emails/new_review.html', context)
-
-    send_mail(
+    enqueue_email(
+        recipient=recipient.email,
         subject=f'New {rating}-star review from {reviewer.full_name} - Umuhuza',
-        message=f'{reviewer.full_name} left you a {rating}-star review!',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[recipient.email],
-        html_message=html_message,
-        fail_silently=True,  # Don't break if email fails
+        body=f'{reviewer.full_name} left you a {rating}-star review!',
+        html_template='emails/new_review.html',
+        context=context,
     )
\ No newline at end of file